@@ -0,0 +1,215 @@
+"""
+
+Benchmark
+
+Runs representative workloads and writes their timings as JSON, to compare the performance of the interpreter across
+commits. Every workload is loaded once, searched (for all of its solutions, or for the first ones) a few times to warm
+up, and then timed a number of times. The inferences of a workload (cases of predicates searched, counted by the budget
+of the timed runs themselves, see Budget.py) give the inferences per second of the median time.
+
+    python Benchmarks/benchmark.py [--warmup 1] [--repeat 5] [--output results.json] [--only sort,sets]
+    python Benchmarks/benchmark.py --compare before.json [--threshold 0.1]
+
+With --compare, the results are compared with the results of an earlier run, and the run fails (exit code 1) if a
+workload got slower by more than the threshold.
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Budget import Budget
+from Interpreter import Interpreter
+from batch import load
+from main import version, imports
+
+
+DEPTH = 1000000  # Recursion limit of the searches
+
+# Workloads: name, program (relative to the repository), query (formatted with the size), sizes, most solutions
+WORKLOADS = [
+    ("einstein", "NewRules/EinsteinRiddle.lcl",
+     "EinsteinRiddle(" + ",".join(f"?{v}{i}" for i in range(1, 6) for v in "cnbsp") + ")", (None,), None),
+    ("zebra", "Benchmarks/Zebra.lcl",
+     "EinsteinRiddle(" + ",".join(f"?{v}{i}" for i in range(1, 6) for v in "cnbsp") + ")", (None,), None),
+    ("jugs", "NewRules/JugFilling.lcl", "goal(?g)&start(?s)&search(?s,?g,?a)", (None,), 1),
+    ("turing", "NewRules/TuringMachine.lcl", "FromList({tape},?m)&Perform(A,?m,?s,?f)", (8, 32, 128), None),
+    ("treesort", "NewRules/TreeSort.lcl", "TreeSort({list},?ys)", (25, 50, 100), None),
+    ("sort", "Benchmarks/Lists.lcl", "Sort({list},?s)", (25, 50, 100), None),
+    ("union", "Benchmarks/Lists.lcl", "Union({list},{other},?s)", (40, 80, 160), 1),
+    ("intersection", "Benchmarks/Lists.lcl", "Intersection({list},{other},?s)", (40, 80, 160), 1),
+]
+
+
+# The query of a workload of a size
+def instance(query, size):
+    """
+    Formats the query of a workload with inputs of a size (the same inputs every run).
+
+    :param query: str
+    :param size: int, None (queries without inputs)
+    :return: str
+    """
+    if size is None:
+        return query
+    numbers = list(range(size))
+    random.Random(size).shuffle(numbers)
+    others = list(range(size // 2, size + size // 2))
+    random.Random(-size).shuffle(others)
+    tape = ["a"] * (size // 2) + ["b"] * (size - size // 2)
+    return query.format(list="[" + ",".join(map(str, numbers)) + "]",
+                        other="[" + ",".join(map(str, others)) + "]",
+                        tape="[" + ",".join(tape) + "]")
+
+
+# Searches a query once
+def search(interpreter, query, solutions_limit):
+    """
+    :param interpreter: Interpreter
+    :param query: str
+    :param solutions_limit: int, None
+    :return: tuple[int, int] (number of solutions, inferences)
+    """
+    found = 0
+    budget = Budget(DEPTH)
+    for solution in interpreter.mixed_query(query, 0, budget, True):
+        if type(solution) == dict:
+            found += 1
+            if solutions_limit is not None and found >= solutions_limit:
+                break
+    interpreter.messageLoad = []
+    return found, budget.inferences
+
+
+# Runs a workload
+def measure(name, program, query, size, solutions_limit, warmup, repeat):
+    """
+    Loads the program of a workload, and times its query.
+
+    :param name: str
+    :param program: str
+    :param query: str
+    :param size: int, None
+    :param solutions_limit: int, None
+    :param warmup: int (untimed runs)
+    :param repeat: int (timed runs)
+    :return: dict (the result)
+    """
+    result = {"name": name if size is None else f"{name}[{size}]", "program": program, "size": size}
+
+    interpreter = Interpreter(DEPTH, imports, path=ROOT)
+    start = time.perf_counter()
+    errors = load(interpreter, os.path.join(ROOT, program), cache=False)
+    result["load"] = time.perf_counter() - start
+    if errors:
+        result["errors"] = errors
+        return result
+
+    query = instance(query, size)
+    for _ in range(warmup):
+        search(interpreter, query, solutions_limit)
+
+    times = []
+    counts = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result["solutions"], inferences = search(interpreter, query, solutions_limit)
+        times.append(time.perf_counter() - start)
+        counts.append(inferences)
+
+    result["times"] = times
+    result["min"] = min(times)
+    result["median"] = statistics.median(times)
+    result["inferences"] = statistics.median_low(counts)
+    result["inferences_per_second"] = inferences / result["median"] if result["median"] else None
+    result["errors"] = list(interpreter.errorLoad)
+    return result
+
+
+# The commit of the repository
+def commit():
+    """
+    :return: str, None (None outside of a git repository)
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Compares results with earlier results
+def compare(results, before, threshold):
+    """
+    Prints the change of the median time of every workload that was run both times.
+
+    :param results: list[dict]
+    :param before: list[dict]
+    :param threshold: float (a slowdown larger than it is a regression, 0.1 for 10%)
+    :return: list[str] (names of the workloads that regressed)
+    """
+    medians = {result["name"]: result.get("median", None) for result in before}
+    regressions = []
+    for result in results:
+        old, new = medians.get(result["name"], None), result.get("median", None)
+        if not old or not new:
+            continue
+        change = new / old - 1
+        mark = "  REGRESSION" if change > threshold else ""
+        print(f"{result['name']:20} {old:10.4f}s -> {new:10.4f}s  {change:+.1%}{mark}", file=sys.stderr)
+        if change > threshold:
+            regressions.append(result["name"])
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=f"Local {version} - benchmarks of representative workloads.")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs of every workload")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs of every workload")
+    parser.add_argument("--only", help="comma separated names of workloads to run (all by default)")
+    parser.add_argument("--quick", action="store_true", help="run only the smallest size of every workload")
+    parser.add_argument("--output", "-o", help="file to write the results to (the standard output by default)")
+    parser.add_argument("--compare", help="results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown that fails --compare (0.1 is 10%%)")
+    args = parser.parse_args(arguments)
+
+    sys.setrecursionlimit(200000)
+
+    names = args.only.split(",") if args.only else None
+    results = []
+    for name, program, query, sizes, solutions_limit in WORKLOADS:
+        if names is not None and name not in names:
+            continue
+        for size in sizes[:1] if args.quick else sizes:
+            result = measure(name, program, query, size, solutions_limit, max(args.warmup, 0), max(args.repeat, 1))
+            print(f"{result['name']:20} {result.get('median', 0):10.4f}s", file=sys.stderr)
+            results.append(result)
+
+    report = {"version": version, "commit": commit(), "python": platform.python_version(),
+              "machine": platform.machine(), "warmup": args.warmup, "repeat": args.repeat, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            before = json.load(f)["results"]
+        if compare(results, before, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
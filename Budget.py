@@ -0,0 +1,98 @@
+"""
+
+Budget
+
+Resource limits of a query, checked by the search itself. A Budget is the Counter of the recursion depth of a search
+(passed through Query.search, see util.Counter), that also counts the inferences (cases of predicates and packages that
+were searched, every depth.sub), keeps the bindings the search holds (set by Engine.solve: the bindings of the solutions
+kept by its frames and choicepoints, which go down on backtracking), and checks the time. Once the query used more
+inferences or time than it was given, or held more bindings, or the search was cancelled (see cancel), the budget
+stays exhausted: its count is negative, so every search (Query.search, domain searches) returns at once, and the
+generator of the query stops by itself, in the thread that searches it.
+
+"""
+
+import time
+
+from util import Counter
+
+
+class Budget(Counter):
+    """
+    Limits of a query (None for no limit), and what the query used so far.
+    """
+
+    def __init__(self, count, inferences=None, seconds=None, bindings=None):
+        """
+        :param count: int (the recursion limit)
+        :param inferences: int, None (most inferences)
+        :param seconds: float, None (most time)
+        :param bindings: int, None (most bindings held by the search at once)
+        """
+        self.exhausted = None  # Why the search stopped (inferences, time, bindings or cancelled), None while searching
+        super().__init__(count)
+        self.max_inferences = inferences
+        self.max_bindings = bindings
+        self.start = time.perf_counter()
+        self.deadline = None if seconds is None else self.start + seconds
+        self.inferences = 0
+        self.held = 0  # Bindings the search holds (see Engine.solve)
+        self.peak = 0  # Most bindings the search held
+
+    @property
+    def count(self):
+        if self.exhausted is None and self.deadline is not None and time.perf_counter() > self.deadline:
+            self.exhausted = "time"
+        return -1 if self.exhausted else self._count
+
+    @count.setter
+    def count(self, count):
+        self._count = count
+
+    def sub(self, other):
+        """
+        Subtracts from the count, for an inference, and checks the limits.
+
+        :param other: a number to subtract from counter
+        """
+        self._count -= other
+        self.inferences += 1
+        if self.held > self.peak:
+            self.peak = self.held
+        if self.exhausted:
+            return
+        if self.max_inferences is not None and self.inferences > self.max_inferences:
+            self.exhausted = "inferences"
+        elif self.max_bindings is not None and self.held > self.max_bindings:
+            self.exhausted = "bindings"
+
+    def limit(self, seconds):
+        """
+        Gives the search time from now (for the next solution, see util.next_solution).
+
+        :param seconds: float, None (no limit)
+        """
+        self.deadline = None if seconds is None else time.perf_counter() + seconds
+
+    def cancel(self, reason="cancelled"):
+        """
+        Stops the search (from any thread), it stops the next time it checks the budget.
+
+        :param reason: str
+        """
+        self.exhausted = reason
+
+    def bindings(self):
+        """
+        :return: int (bindings the search holds now)
+        """
+        return self.held
+
+    def statistics(self):
+        """
+        What the query used so far.
+
+        :return: dict
+        """
+        return {"inferences": self.inferences, "time": round(time.perf_counter() - self.start, 6),
+                "bindings": self.peak, "exhausted": self.exhausted}
@@ -1,6 +1,17 @@
+"""
+
+BuiltIns
+
+Builtin predicates (many different libraries).
+Every builtin is registered by name, with the library flag of the interpreter that enables it (e.g. 'math_added') and the
+number of components it accepts, so finding the builtin of a query is a single dictionary lookup.
+Applications can register their own builtins (from python) with register.
+
+"""
 
 import hashlib
 import re
+from functools import partial
 from io import UnsupportedOperation
 from random import randint, random
 
@@ -10,10 +21,102 @@ from Domain import Domain
 from Match import MatchDictionary
 from OnlineRequest import url_opener
 from Predicate import Predicate
+from Profiler import Profiler
+from Term import symbol, find
 from util import processParen, remove_whitespace, splitWithoutParen, match_type, outString, smart_replace, formatPrint, joinPrint, get_all_basics, \
     independent
 
 
+# A registered builtin
+class Builtin:
+    """
+    A builtin predicate: its handler, the libraries that enable it and the number of components it accepts.
+    """
+
+    __slots__ = ("name", "symbol", "handler", "flags", "arity")
+
+    def __init__(self, name, handler, flags, arity):
+        """
+        :param name: str
+        :param handler: function (interpreter, query_pat, parts, depth) -> Generator
+        :param flags: tuple[str] (interpreter flags, any of them enables the builtin; empty if always enabled)
+        :param arity: int, None (None for any number of components)
+        """
+        self.name = name
+        self.symbol = symbol(name)  # Keeps the id of the name in use while the builtin is registered
+        self.handler = handler
+        self.flags = flags
+        self.arity = arity
+
+    def enabled(self, interpreter):
+        """
+        Whether the builtin is enabled for the interpreter (one of its libraries was imported).
+
+        :param interpreter: Interpreter
+        :return: boolean
+        """
+        if not self.flags:
+            return True
+        for flag in self.flags:
+            if getattr(interpreter, flag, False):
+                return True
+        return False
+
+
+builtins = {}  # Builtin registry, id of the name (see Term.symbol) -> Builtin
+
+
+# Registers a builtin
+def register(name, handler=None, flag=None, arity=None):
+    """
+    Registers a builtin predicate (replacing a builtin with the same name).
+    The handler is called with the interpreter, the pattern of the query (str), its components (list of str) and the
+    depth (Counter), and generates solutions (dict[str, str]), or "Print"/"Request".
+    Without a handler, returns a decorator that registers the function it decorates.
+
+    :param name: str
+    :param handler: function
+    :param flag: str, tuple[str], None (interpreter flags that enable the builtin, e.g. 'list_added')
+    :param arity: int, None (number of components, queries with a different number of components fail)
+    :return: function
+    """
+    if handler is None:
+        return lambda function: register(name, function, flag, arity)
+
+    if flag is None:
+        flags = ()
+    elif type(flag) is str:
+        flags = (flag,)
+    else:
+        flags = tuple(flag)
+
+    registered = Builtin(name, handler, flags, arity)
+    builtins[registered.symbol.id] = registered
+    return handler
+
+
+# Unregisters a builtin
+def unregister(name):
+    """
+    Removes a registered builtin predicate, queries with its name are searched as usual again.
+
+    :param name: str
+    :return: boolean, whether a builtin was removed
+    """
+    sym = find(name)
+    return sym is not None and builtins.pop(sym.id, None) is not None
+
+
+# The builtin of a name
+def lookup_builtin(name):
+    """
+    :param name: str
+    :return: Builtin, None (if no builtin is registered with the name)
+    """
+    sym = find(name)
+    return None if sym is None else builtins.get(sym.id, None)
+
+
 def builtin(interpreter, query_name, query_pat, depth, found):
     """
     Builtin predicates (many different libraries).
@@ -26,606 +129,649 @@ def builtin(interpreter, query_name, query_pat, depth, found):
     :return: Generator
     """
 
+    registered = lookup_builtin(query_name)
+    if registered is None or not registered.enabled(interpreter):
+        found[0] = False
+        return
+
     found[0] = True
 
-    # checks for terminal match
-    if query_name == "GuaranteeUnify":
-        comps = splitWithoutParen(query_pat)
-        if len(comps) != 2:
-            return
-        comp1, comp2 = comps
-        m = MatchDictionary.match(interpreter, comp1, comp2)
-        if m and not m[2]:
-            yield {}
+    parts = splitWithoutParen(query_pat)
+    if registered.arity is not None and len(parts) != registered.arity:
         return
 
-    # Can be unified
-    if query_name == "CanUnify":
-        comps = splitWithoutParen(query_pat)
-        if len(comps) != 2:
-            return
-        comp1, comp2 = comps
-        m = MatchDictionary.match(interpreter, comp1, comp2)
-        if m:
-            yield {}
-        return
+    yield from registered.handler(interpreter, query_pat, parts, depth)
 
-    # Exact copy of a pattern
-    if query_name == "ExactCopy":
-        comps = splitWithoutParen(query_pat)
-        if len(comps) != 2:
-            return
-        comp1, comp2 = comps
-        bs = get_all_basics(comp1)
-        copy = MatchDictionary.transform(comp1, bs, {})
-        m = MatchDictionary.match(interpreter, comp2, copy)
-        if m:
-            print(m[1])
-            yield m[1]
-        return
 
-    # Online Request
-    if query_name == "Request":
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 2:
-            return
-        try:
-            inLcl = url_opener(parts[0][1:-1])
-            if inLcl is None:
-                return
-            m = MatchDictionary.match(interpreter, parts[1], inLcl)
-            if m:
-                yield m[1]
-        except Exception as e:
-            print(e)
-        finally:
-            return
+# checks for terminal match
+@register("GuaranteeUnify", arity=2)
+def guarantee_unify(interpreter, query_pat, parts, depth):
+    comp1, comp2 = parts
+    m = MatchDictionary.match(interpreter, comp1, comp2)
+    if m and not m[2]:
+        yield {}
 
-    # Ref.new - Create reference
-    if query_name == "Ref.new":
-        comps = splitWithoutParen(query_pat)
-        if len(comps) != 1:
-            return
-        comp1, = comps
-        if match_type(comp1) != "var":
-            return
-        rand = hex(randint(10000, 10000000))
-        while rand in interpreter.references:
-            rand = hex(randint(100, 100000))
-        interpreter.references[rand] = "nil"
-        yield {comp1: rand}
-        return
 
-    # Ref.del - delete a reference
-    if query_name == "Ref.del":
-        comps = splitWithoutParen(query_pat)
-        if len(comps) != 1:
-            return
-        comp1, = comps
-        if comp1 not in interpreter.references:
-            return
-        del interpreter.references[comp1]
+# Can be unified
+@register("CanUnify", arity=2)
+def can_unify(interpreter, query_pat, parts, depth):
+    comp1, comp2 = parts
+    m = MatchDictionary.match(interpreter, comp1, comp2)
+    if m:
         yield {}
-        return
 
-    if query_name == "SecIns":
-        print(">> ", end="")
-        inspect = input()
-        try:
-            print(eval(inspect))
-            yield {}
-        except Exception as e:
-            print(e)
-        return
 
-    # Break predicate
-    if query_name == 'hBreak' and (interpreter.list_added or interpreter.types_added):
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 2 or "[" in parts[0] or "?" in parts[0]:
-            return
-        broken = list(parts[0])
-        if len(broken) == 0:
+# Exact copy of a pattern
+@register("ExactCopy", arity=2)
+def exact_copy(interpreter, query_pat, parts, depth):
+    comp1, comp2 = parts
+    bs = get_all_basics(comp1)
+    copy = MatchDictionary.transform(comp1, bs, {})
+    m = MatchDictionary.match(interpreter, comp2, copy)
+    if m:
+        print(m[1])
+        yield m[1]
+
+
+# Online Request
+@register("Request", arity=2)
+def request(interpreter, query_pat, parts, depth):
+    try:
+        inLcl = url_opener(parts[0][1:-1])
+        if inLcl is None:
             return
-        inLcl = '['
-        for broke in broken:
-            inLcl += broke + ","
-        inLcl = inLcl[:-1] + "]"
         m = MatchDictionary.match(interpreter, parts[1], inLcl)
         if m:
             yield m[1]
+    except Exception as e:
+        print(e)
+    finally:
         return
 
-    # domain generator
-    if query_name == "Domain-Generator":
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 4 or any(match_type(part) != "list" for part in parts):
-            return
-        variables = splitWithoutParen(parts[0][1:-1])
-        if any(match_type(pattern) != "var" for pattern in variables):
-            return
-        ranges = splitWithoutParen(parts[1][1:-1])
-        if len(ranges) != len(variables):
-            return
-        constraints = splitWithoutParen(parts[2][1:-1])
-        elims = splitWithoutParen(parts[3][1:-1])
-        D = Domain(interpreter, "~~Anon")
-        D.variables = variables
-        D.raw_vars = parts[0][1:-1]
-        for i, var in enumerate(variables):
-            D.range_searches[var] = ranges[i]
-        for const in constraints:
-            D.insert_constraint(const, "", -1)
-        for elim in elims:
-            D.insert_elimination(elim, "", -1)
-        yield from D.search(depth, parts[0][1:-1])
-
-    # Input
-    if query_name == "hInput" and interpreter.strings_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
-        if parts[0][0] != "?":
-            return
-        yield "Request"
-        inp = interpreter.received_input
-        interpreter.received_input = False
-        yield {parts[0]: '"' + inp + '"'}
-
-    # isList predicate (checks if list)
-    if query_name == 'isList' and interpreter.types_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
-        if parts[0][0] == "[":
-            yield {}
-        return
 
-    # isVar predicate (checks if variable)
-    if query_name == 'isVar' and interpreter.types_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
-        if '?' == parts[0][0]:
-            yield {}
+# Ref.new - Create reference
+@register("Ref.new", arity=1)
+def ref_new(interpreter, query_pat, parts, depth):
+    comp1, = parts
+    if match_type(comp1) != "var":
         return
-
-    # Title predicate (checks if title)
-    if query_name == 'isTitle' and interpreter.types_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
-        try:
-            T_name, _, T_pat = parts[0].partition("(")
-            if T_name in interpreter.titles:
-                yield {}
-        except IndexError:
-            pass
-        except ValueError:
-            pass
-        return
-
-    # Integer predicate (checks if integer)
-    if query_name == 'isInteger' and interpreter.types_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
-        try:
-            a = int(parts[0])
-            yield {}
-        except IndexError:
-            pass
-        except ValueError:
-            pass
+    rand = hex(randint(10000, 10000000))
+    while rand in interpreter.references:
+        rand = hex(randint(100, 100000))
+    interpreter.references[rand] = "nil"
+    yield {comp1: rand}
+
+
+# Ref.del - delete a reference
+@register("Ref.del", arity=1)
+def ref_del(interpreter, query_pat, parts, depth):
+    comp1, = parts
+    if comp1 not in interpreter.references:
         return
+    del interpreter.references[comp1]
+    yield {}
 
-    # Floating predicate (checks if float)
-    if query_name == 'isFloating' and interpreter.types_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
-        try:
-            a = float(parts[0])
-            yield {}
-        except IndexError:
-            pass
-        except ValueError:
-            pass
-        return
 
-    # Known Predicate (checks if variables in predicate)
-    if query_name == 'isKnown' and interpreter.types_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
-        if outString(parts[0], "?"):
-            return
+@register("SecIns")
+def sec_ins(interpreter, query_pat, parts, depth):
+    print(">> ", end="")
+    inspect = input()
+    try:
+        print(eval(inspect))
         yield {}
+    except Exception as e:
+        print(e)
 
-    # Predicate predicate (is it a predicate)
-    if query_name == 'isPredicate' and interpreter.types_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
-        if parts[0] in interpreter.predicates or \
-                (parts[0] in ['Add', 'Sub', 'Mul', 'Div', 'Mod', 'Floor', 'Ceil', 'Power', 'Log', 'Sin', 'Cos', 'Tan',
-                              'LT'] and interpreter.math_added) \
-                or parts[0] == 'Print' or parts[0] == 'Predicate' or (parts[0] == 'Break' and interpreter.list_added):
-            yield {}
+
+# Break predicate
+@register("hBreak", flag=("list_added", "types_added"), arity=2)
+def h_break(interpreter, query_pat, parts, depth):
+    if "[" in parts[0] or "?" in parts[0]:
         return
+    broken = list(parts[0])
+    if len(broken) == 0:
+        return
+    inLcl = '['
+    for broke in broken:
+        inLcl += broke + ","
+    inLcl = inLcl[:-1] + "]"
+    m = MatchDictionary.match(interpreter, parts[1], inLcl)
+    if m:
+        yield m[1]
+
+
+# domain generator
+@register("Domain-Generator", arity=4)
+def domain_generator(interpreter, query_pat, parts, depth):
+    if any(match_type(part) != "list" for part in parts):
+        return
+    variables = splitWithoutParen(parts[0][1:-1])
+    if any(match_type(pattern) != "var" for pattern in variables):
+        return
+    ranges = splitWithoutParen(parts[1][1:-1])
+    if len(ranges) != len(variables):
+        return
+    constraints = splitWithoutParen(parts[2][1:-1])
+    elims = splitWithoutParen(parts[3][1:-1])
+    D = Domain(interpreter, "~~Anon")
+    D.variables = variables
+    D.raw_vars = parts[0][1:-1]
+    for i, var in enumerate(variables):
+        D.range_searches[var] = ranges[i]
+    for const in constraints:
+        D.insert_constraint(const, "", -1)
+    for elim in elims:
+        D.insert_elimination(elim, "", -1)
+    yield from D.search(depth, parts[0][1:-1])
+
+
+# Input
+@register("hInput", flag="strings_added", arity=1)
+def h_input(interpreter, query_pat, parts, depth):
+    if parts[0][0] != "?":
+        return
+    yield "Request"
+    inp = interpreter.received_input
+    interpreter.received_input = False
+    yield {parts[0]: '"' + inp + '"'}
 
-    # isPackage predicate (is it a package)
-    if query_name == 'isPackage' and interpreter.types_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
-        if parts[0] in interpreter.packages:
+
+# isList predicate (checks if list)
+@register("isList", flag="types_added", arity=1)
+def is_list(interpreter, query_pat, parts, depth):
+    if parts[0][0] == "[":
+        yield {}
+
+
+# isVar predicate (checks if variable)
+@register("isVar", flag="types_added", arity=1)
+def is_var(interpreter, query_pat, parts, depth):
+    if '?' == parts[0][0]:
+        yield {}
+
+
+# Title predicate (checks if title)
+@register("isTitle", flag="types_added", arity=1)
+def is_title(interpreter, query_pat, parts, depth):
+    try:
+        T_name, _, T_pat = parts[0].partition("(")
+        if T_name in interpreter.titles:
             yield {}
-        return
+    except IndexError:
+        pass
+    except ValueError:
+        pass
 
-    # Math Predicates
-    if query_name in ['hAdd', 'hSub', 'hMul', 'hDiv', 'hMod', 'hFloor', 'hCeil', 'hPower', 'hLog',
-                      'hSin', 'hCos', 'hTan', 'hLT', 'hE'] and interpreter.math_added:
-        yield from MathHelper.Reader(query_name, query_pat)
-        return
 
-    # Print 'predicate'
-    if query_name == 'Print':
-        parts = splitWithoutParen(query_pat)
-        printible = []
-        for part in parts:
-            printible.append(formatPrint(part))
-        printed = joinPrint(printible)
-        interpreter.message(printed)
-        yield "Print"
-        if len(query_pat) != 0 and query_pat[-1] == ",":
-            interpreter.newline = True
-        else:
-            interpreter.newline = False
+# Integer predicate (checks if integer)
+@register("isInteger", flag="types_added", arity=1)
+def is_integer(interpreter, query_pat, parts, depth):
+    try:
+        a = int(parts[0])
         yield {}
+    except IndexError:
+        pass
+    except ValueError:
+        pass
 
-    # AllSolutions predicate
-    if query_name == 'hAllSolutions' and interpreter.predicates_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 3:
-            return
-        if parts[0][0] == "?":
-            return
-        try:
-            n = int(parts[1])
-        except ValueError:
-            return
-        sols = []
-        pattern = ",".join([f"?x{j}" for j in range(n)])
-        q = f"{parts[0]}({pattern})"
-        for sol in interpreter.mixed_query(q, 0, depth.count, True):
-            sols.append(smart_replace(f"[{pattern}]", sol))
-        final = "[" + ",".join(sols) + "]"
-        m = MatchDictionary.match(interpreter, parts[2], final)
-        if m:
-            yield m[1]
+
+# Floating predicate (checks if float)
+@register("isFloating", flag="types_added", arity=1)
+def is_floating(interpreter, query_pat, parts, depth):
+    try:
+        a = float(parts[0])
+        yield {}
+    except IndexError:
+        pass
+    except ValueError:
+        pass
+
+
+# Known Predicate (checks if variables in predicate)
+@register("isKnown", flag="types_added", arity=1)
+def is_known(interpreter, query_pat, parts, depth):
+    if outString(parts[0], "?"):
         return
+    yield {}
 
-    # Save predicate
-    if query_name == 'hSave' and interpreter.save_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
-        if outString(parts[0], "?"):
-            return
-        to_save = parts[0]
-        interpreter.saved.insert(0, to_save)
+
+# Predicate predicate (is it a predicate)
+@register("isPredicate", flag="types_added", arity=1)
+def is_predicate(interpreter, query_pat, parts, depth):
+    if parts[0] in interpreter.predicates or \
+            (parts[0] in ['Add', 'Sub', 'Mul', 'Div', 'Mod', 'Floor', 'Ceil', 'Power', 'Log', 'Sin', 'Cos', 'Tan',
+                          'LT'] and interpreter.math_added) \
+            or parts[0] == 'Print' or parts[0] == 'Predicate' or (parts[0] == 'Break' and interpreter.list_added):
+        yield {}
+
+
+# isPackage predicate (is it a package)
+@register("isPackage", flag="types_added", arity=1)
+def is_package(interpreter, query_pat, parts, depth):
+    if parts[0] in interpreter.packages:
         yield {}
+
+
+# Math Predicates
+def math_helper(query_name, interpreter, query_pat, parts, depth):
+    yield from MathHelper.Reader(query_name, query_pat)
+
+
+for math_name in ['hAdd', 'hSub', 'hMul', 'hDiv', 'hMod', 'hFloor', 'hCeil', 'hPower', 'hLog',
+                  'hSin', 'hCos', 'hTan', 'hLT', 'hE', 'hSumList', 'hProductList']:
+    register(math_name, partial(math_helper, math_name), flag="math_added")
+
+
+# Print 'predicate'
+@register("Print")
+def print_builtin(interpreter, query_pat, parts, depth):
+    printible = []
+    for part in parts:
+        printible.append(formatPrint(part))
+    printed = joinPrint(printible)
+    interpreter.message(printed)
+    yield "Print"
+    if len(query_pat) != 0 and query_pat[-1] == ",":
+        interpreter.newline = True
+    else:
+        interpreter.newline = False
+    yield {}
+
+
+# AllSolutions predicate
+@register("hAllSolutions", flag="predicates_added", arity=3)
+def h_all_solutions(interpreter, query_pat, parts, depth):
+    if parts[0][0] == "?":
+        return
+    try:
+        n = int(parts[1])
+    except ValueError:
+        return
+    sols = []
+    pattern = ",".join([f"?x{j}" for j in range(n)])
+    q = f"{parts[0]}({pattern})"
+    for sol in interpreter.all_solutions(q, depth.count):
+        if type(sol) != dict:
+            continue
+        sols.append(smart_replace(f"[{pattern}]", sol))
+    final = "[" + ",".join(sols) + "]"
+    m = MatchDictionary.match(interpreter, parts[2], final)
+    if m:
+        yield m[1]
+
+
+# Workers predicate - number of processes that search for all the solutions of queries (AllSolutions)
+@register("Workers", flag="predicates_added", arity=1)
+def workers(interpreter, query_pat, parts, depth):
+    if match_type(parts[0]) == "var":
+        yield {parts[0]: str(interpreter.workers)}
+        return
+    try:
+        n = int(parts[0])
+    except ValueError:
         return
+    if n < 1:
+        return
+    interpreter.workers = n
+    yield {}
+
 
-    # helper Load predicate
-    if query_name == 'hLoad' and interpreter.save_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) == 1:
-            if len(interpreter.saved) == 0:
-                return
-            else:
-                to_load = interpreter.saved.popleft()
-                t = MatchDictionary.match(interpreter, parts[0], to_load)
-                if t:
-                    yield t[1]
+# Save predicate
+@register("hSave", flag="save_added", arity=1)
+def h_save(interpreter, query_pat, parts, depth):
+    if outString(parts[0], "?"):
         return
+    to_save = parts[0]
+    interpreter.saved.insert(0, to_save)
+    yield {}
 
-    # Chars predicate
-    if query_name == 'ToChars' and interpreter.strings_added:
 
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 2 or outString("[", parts[0]) or outString(parts[0], "?") or parts[0][0] != '"' or parts[0][-1] != '"':
-            return
-        broken = list(parts[0][1:-1])
-        inLcl = '[' + ",".join(list(map(lambda c: f'"{c}"', broken))) + "]"
-        m = MatchDictionary.match(interpreter, parts[1], inLcl)
-        if m:
-            yield m[1]
+# helper Load predicate
+@register("hLoad", flag="save_added", arity=1)
+def h_load(interpreter, query_pat, parts, depth):
+    if len(interpreter.saved) == 0:
         return
+    to_load = interpreter.saved.popleft()
+    t = MatchDictionary.match(interpreter, parts[0], to_load)
+    if t:
+        yield t[1]
 
-    # Chars to String
-    if query_name == 'ToString' and interpreter.strings_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 2 or outString(parts[0], "?") or "[" != parts[0][0] or "]" != parts[0][-1]:
-            return
 
-        broken = splitWithoutParen(parts[0][1:-1])
-        inLcl = '"'
-        for broke in broken:
-            if broke[0] != '"' or broke[-1] != '"':
-                return
-            inLcl += broke[1:-1]
-        inLcl += '"'
-        m = MatchDictionary.match(interpreter, parts[1], inLcl)
-        if m:
-            yield m[1]
+# Chars predicate
+@register("ToChars", flag="strings_added", arity=2)
+def to_chars(interpreter, query_pat, parts, depth):
+    if outString("[", parts[0]) or outString(parts[0], "?") or parts[0][0] != '"' or parts[0][-1] != '"':
         return
+    broken = list(parts[0][1:-1])
+    inLcl = '[' + ",".join(list(map(lambda c: f'"{c}"', broken))) + "]"
+    m = MatchDictionary.match(interpreter, parts[1], inLcl)
+    if m:
+        yield m[1]
 
-    # open file
-    if query_name == 'hOpen' and interpreter.filestream_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 3:
-            return
-        file_name, file_type, file_var = parts
-        if match_type(file_var) != "var":
-            return
-        file_name = file_name[1:-1]
-        print(file_name)
-        if file_type not in ["r", "w", "a", "rp"]:
-            if file_type == "rp":
-                file_type = "r+"
-            interpreter.raiseError(f"Error: Illegal file type '{file_type}'")
-            return
-        if ":" not in file_name:
-            try:
-                f = open(interpreter.filepath + "/" + file_name, file_type)
-            except FileNotFoundError:
-                interpreter.raiseError(f"Error: File not found, '{file_name}'")
-                return
-        else:
-            try:
-                f = open(file_name, file_type)
-            except FileNotFoundError:
-                interpreter.raiseError(f"Error: File not found, '{file_name}'")
-                return
-        file_hash = hashlib.md5((random().as_integer_ratio()[0] + random().as_integer_ratio()[1]).__str__().encode()).hexdigest()
-        interpreter.files[file_hash] = f
-        yield {file_var: file_hash}
-        return
-
-    # read file
-    if query_name == 'hRead' and interpreter.filestream_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 2:
-            return
-        file_name, char_to = parts
-        if match_type(char_to) != 'var':
-            return False
-        if file_name not in interpreter.files:
-            interpreter.raiseError(f"Error: File '{file_name}' not opened.")
-            return
-        file_read = interpreter.files[file_name]
-        try:
-            c = file_read.read(1)
-        except UnsupportedOperation:
-            interpreter.raiseError(f"Error: File '{file_name}' not readable.")
-            return
 
-        yield {char_to: '"' + c + '"'}
+# Chars to String
+@register("ToString", flag="strings_added", arity=2)
+def to_string(interpreter, query_pat, parts, depth):
+    if outString(parts[0], "?") or "[" != parts[0][0] or "]" != parts[0][-1]:
         return
 
-    # write in file
-    if query_name == 'hWrite' and interpreter.filestream_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 2:
-            return
-        file_name, write = parts
-        if write[0] == '"':
-            write = write[1:-1]
-        if file_name not in interpreter.files:
-            interpreter.raiseError(f"Error: File '{file_name}' not opened.")
+    broken = splitWithoutParen(parts[0][1:-1])
+    inLcl = '"'
+    for broke in broken:
+        if broke[0] != '"' or broke[-1] != '"':
             return
+        inLcl += broke[1:-1]
+    inLcl += '"'
+    m = MatchDictionary.match(interpreter, parts[1], inLcl)
+    if m:
+        yield m[1]
 
+
+# open file
+@register("hOpen", flag="filestream_added", arity=3)
+def h_open(interpreter, query_pat, parts, depth):
+    file_name, file_type, file_var = parts
+    if match_type(file_var) != "var":
+        return
+    file_name = file_name[1:-1]
+    print(file_name)
+    if file_type not in ["r", "w", "a", "rp"]:
+        if file_type == "rp":
+            file_type = "r+"
+        interpreter.raiseError(f"Error: Illegal file type '{file_type}'")
+        return
+    if ":" not in file_name:
         try:
-            interpreter.files[file_name].write(write)
-        except UnsupportedOperation:
-            interpreter.raiseError(f"Error: File '{file_name}' not writable.")
+            f = open(interpreter.filepath + "/" + file_name, file_type)
+        except FileNotFoundError:
+            interpreter.raiseError(f"Error: File not found, '{file_name}'")
             return
+    else:
+        try:
+            f = open(file_name, file_type)
+        except FileNotFoundError:
+            interpreter.raiseError(f"Error: File not found, '{file_name}'")
+            return
+    file_hash = hashlib.md5((random().as_integer_ratio()[0] + random().as_integer_ratio()[1]).__str__().encode()).hexdigest()
+    interpreter.files[file_hash] = f
+    yield {file_var: file_hash}
+
+
+# read file
+@register("hRead", flag="filestream_added", arity=2)
+def h_read(interpreter, query_pat, parts, depth):
+    file_name, char_to = parts
+    if match_type(char_to) != 'var':
+        return False
+    if file_name not in interpreter.files:
+        interpreter.raiseError(f"Error: File '{file_name}' not opened.")
+        return
+    file_read = interpreter.files[file_name]
+    try:
+        c = file_read.read(1)
+    except UnsupportedOperation:
+        interpreter.raiseError(f"Error: File '{file_name}' not readable.")
+        return
+
+    yield {char_to: '"' + c + '"'}
+
+
+# write in file
+@register("hWrite", flag="filestream_added", arity=2)
+def h_write(interpreter, query_pat, parts, depth):
+    file_name, write = parts
+    if write[0] == '"':
+        write = write[1:-1]
+    if file_name not in interpreter.files:
+        interpreter.raiseError(f"Error: File '{file_name}' not opened.")
+        return
+
+    try:
+        interpreter.files[file_name].write(write)
+    except UnsupportedOperation:
+        interpreter.raiseError(f"Error: File '{file_name}' not writable.")
+        return
+
+    yield {}
 
+
+# close file
+@register("hClose", flag="filestream_added", arity=1)
+def h_close(interpreter, query_pat, parts, depth):
+    file_name = parts[0]
+    if file_name in interpreter.files:
+        interpreter.files[file_name].close()
+        interpreter.files.pop(file_name)
         yield {}
+    else:
+        interpreter.raiseError(f"Error: file '{file_name}' not found.")
+
+
+# Tracing searching algorithm
+@register("Trace", flag="inspect_added")
+def trace(interpreter, query_pat, parts, depth):
+    if query_pat == "On":
+        interpreter.trace_on = True
+    elif query_pat == "Off":
+        interpreter.trace_on = False
+    elif query_pat == "OnOn":
+        interpreter.console_trace_on = True
+    elif query_pat == "OffOff":
+        interpreter.console_trace_on = False
+    else:
+        return
+    yield {}
+
+
+# Profiling searches of predicates
+@register("Profile", flag="inspect_added")
+def profile(interpreter, query_pat, parts, depth):
+    if query_pat == "On":
+        if interpreter.profiler is None:
+            interpreter.profiler = Profiler()
+    elif query_pat == "Off":
+        if interpreter.profiler is not None:
+            interpreter.profiled, interpreter.profiler = interpreter.profiler, None
+    elif query_pat == "Clear":
+        interpreter.profiled = None
+        if interpreter.profiler is not None:
+            interpreter.profiler = Profiler()
+    elif query_pat in ("Table", "Graph"):
+        profiler = interpreter.profiler or interpreter.profiled
+        if profiler is None:
+            return
+        interpreter.message(profiler.table() if query_pat == "Table" else profiler.graph())
+        yield "Print"
+    else:
+        return
+    yield {}
 
-    # close file
-    if query_name == 'hClose' and interpreter.filestream_added:
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
 
-        file_name = parts[0]
-        if file_name in interpreter.files:
-            interpreter.files[file_name].close()
-            interpreter.files.pop(file_name)
-            yield {}
-            return
-        else:
-            interpreter.raiseError(f"Error: file '{file_name}' not found.")
-            return
+# Show Memory
+@register("ShowMem", flag="inspect_added")
+def show_mem(interpreter, query_pat, parts, depth):
+    interpreter.message(f"{interpreter.memory}\n{interpreter.references}\n")
+    yield "Print"
+    yield {}
 
-    # Tracing searching algorithm
-    if query_name == "Trace" and interpreter.inspect_added:
-        if query_pat == "On":
-            interpreter.trace_on = True
-        elif query_pat == "Off":
-            interpreter.trace_on = False
-        elif query_pat == "OnOn":
-            interpreter.console_trace_on = True
-        elif query_pat == "OffOff":
-            interpreter.console_trace_on = False
-        else:
-            return
+
+# Listing - list all cases of predicate
+@register("Listing", flag="inspect_added")
+def listing(interpreter, query_pat, parts, depth):
+    p_name = query_pat
+
+    if p_name == "ALL":
+        for predicate in interpreter.predicates.values():
+            interpreter.message(predicate.__str__())
+        yield 'Print'
         yield {}
         return
 
-    # Show Memory
-    if query_name == "ShowMem" and interpreter.inspect_added:
-        interpreter.message(f"{interpreter.memory}\n{interpreter.references}\n")
+    if p_name not in interpreter.predicates:
+        return
+    else:
+        predicate_match = interpreter.predicates[p_name]
+        interpreter.message(predicate_match.__str__())
         yield "Print"
         yield {}
+
+
+# Show Tables - answer tables of tabled predicates
+@register("ShowTables", flag="inspect_added")
+def show_tables(interpreter, query_pat, parts, depth):
+    p_name = query_pat
+
+    if p_name == "ALL":
+        interpreter.message(interpreter.tables.show())
+    elif p_name in interpreter.predicates:
+        interpreter.message(interpreter.tables.show(p_name))
+    else:
         return
+    yield "Print"
+    yield {}
 
-    # Listing - list all cases of predicate
-    if query_name == "Listing" and interpreter.inspect_added:
-        p_name = query_pat
 
-        if p_name == "ALL":
-            for predicate in interpreter.predicates.values():
-                interpreter.message(predicate.__str__())
-            yield 'Print'
-            yield {}
-            return
+# Clear Tables - forget the answers of tabled predicates
+@register("ClearTables", flag="inspect_added")
+def clear_tables(interpreter, query_pat, parts, depth):
+    p_name = query_pat
+
+    if p_name == "ALL":
+        interpreter.tables.clear()
+    elif p_name in interpreter.predicates:
+        interpreter.tables.clear(p_name)
+    else:
+        return
+    yield {}
 
-        if p_name not in interpreter.predicates:
-            return
-        else:
-            predicate_match = interpreter.predicates[p_name]
-            interpreter.message(predicate_match.__str__())
-            yield "Print"
-            yield {}
-            return
 
+# Reload - reads imported files again
+@register("Reload", flag="inspect_added")
+def reload(interpreter, query_pat, parts, depth):
+    if not interpreter.reload(query_pat):
         return
+    yield {}
 
-    if interpreter.dynamic_added and query_name in {"AssertF", "AssertFE", "AssertN", "AssertNE", "AssertC", "AssertCE", "DeleteF",
-                                                    "DeleteN", "DeleteC", "Create", "SwitchRecursive", "SwitchRandom", 'Clear', 'Delete'} \
-            :
 
-        parts = splitWithoutParen(query_pat)
-        if len(parts) != 1:
-            return
+# Domain Stats - statistics of the last search of a domain
+@register("DomainStats", flag="inspect_added")
+def domain_stats(interpreter, query_pat, parts, depth):
+    domain = interpreter.domains.get(query_pat, None)
+    if domain is None:
+        return
+    interpreter.message(", ".join(f"{key}: {value}" for key, value in domain.stats.items()) + "\n")
+    yield "Print"
+    yield {}
 
-        if query_name == "Create":
-            if re.fullmatch(r'[a-zA-Z_0-9\-\.]+', query_pat) and query_pat not in Lexer.reserved:
-                new_pred = Predicate(interpreter, query_pat, False, False)
-                interpreter.predicates[new_pred.name] = new_pred
-                yield {}
-            return
-        if query_name == "SwitchRecursive":
-            if query_pat in interpreter.predicates:
-                pred = interpreter.predicates[query_pat]
-                pred.recursive = not pred.recursive
-                yield {}
-            return
-        if query_name == "SwitchRandom":
-            if query_pat in interpreter.predicates:
-                pred = interpreter.predicates[query_pat]
-                pred.random = not pred.random
-                yield {}
-            return
-        if query_name == 'Delete':
-            if query_pat in interpreter.predicates:
-                del interpreter.predicates[query_pat]
-                yield {}
-            return
 
-        predicate_changed, _, body = query_pat.partition("(")
-        body = "(" + body
-        body = remove_whitespace(body)
+# Dynamic - changing predicates while searching
+def dynamic(query_name, interpreter, query_pat, parts, depth):
 
-        if predicate_changed not in interpreter.predicates:
-            return
+    # Answers tabled before the change might be wrong after it, and processes that rebuild the program would miss it
+    interpreter.tables.clear()
+    interpreter.changed = True
 
-        predicate_changed = interpreter.predicates[predicate_changed]
-
-        if query_name == "AssertFE":
-            basic = processParen(body)
-            if basic:
-                predicate_changed.addBasic(basic)
-                yield {}
-                return
-            else:
-                return
-        if query_name == "AssertF":
-            basic = processParen(body)
-            if basic:
-                predicate_changed.addBasic(basic, insert=True)
-                yield {}
-                return
-            else:
-                return
-
-        if query_name == "AssertNE":
-            basic = processParen(body)
-            if basic:
-                predicate_changed.addNot(basic)
-                yield {}
-                return
-            else:
-                return
-        if query_name == "AssertN":
-            basic = processParen(body)
-            if basic:
-                predicate_changed.addNot(basic, insert=True)
-                yield {}
-                return
-            else:
-                return
-
-        if query_name == "AssertCE":
-            to_match, _, then = body.partition(">")
-            to_match, then = processParen(to_match), processParen(then)
-            if not to_match or not then:
-                return
-            predicate_changed.addCase(to_match, then)
+    if query_name == "Create":
+        if re.fullmatch(r'[a-zA-Z_0-9\-\.]+', query_pat) and query_pat not in Lexer.reserved:
+            new_pred = Predicate(interpreter, query_pat, False, False)
+            interpreter.predicates[new_pred.name] = new_pred
             yield {}
-            return
-        if query_name == "AssertC":
-            to_match, _, then = body.partition(">")
-            to_match, then = processParen(to_match), processParen(then)
-            if not to_match or not then:
-                return
-            predicate_changed.addCase(to_match, then, insert=True)
+        return
+    if query_name == "SwitchRecursive":
+        if query_pat in interpreter.predicates:
+            pred = interpreter.predicates[query_pat]
+            pred.recursive = not pred.recursive
+            pred.native = None
             yield {}
-            return
+        return
+    if query_name == "SwitchRandom":
+        if query_pat in interpreter.predicates:
+            pred = interpreter.predicates[query_pat]
+            pred.random = not pred.random
+            pred.native = None
+            yield {}
+        return
+    if query_name == 'Delete':
+        if query_pat in interpreter.predicates:
+            del interpreter.predicates[query_pat]
+            yield {}
+        return
+
+    predicate_changed, _, body = query_pat.partition("(")
+    body = "(" + body
+    body = remove_whitespace(body)
 
-        if query_name == "DeleteF":
-            body = processParen(body)
-            if body in predicate_changed.basic:
-                predicate_changed.basic.remove(body)
-                yield {}
-                return
-            else:
-                return
-        if query_name == "DeleteN":
-            body = processParen(body)
-            if body in predicate_changed.nope:
-                predicate_changed.nope.remove(body)
-                yield {}
-                return
-            else:
-                return
-        if query_name == 'DeleteC':
-            to_match, _, then = body.partition(">")
-            to_match, then = processParen(to_match), processParen(then)
-            if to_match in predicate_changed.cases:
-                index = predicate_changed.cases.index(to_match)
-                if then != predicate_changed.then[index]:
-                    return
-                predicate_changed.cases.remove(to_match)
-                predicate_changed.then.remove(then)
-                predicate_changed.count -= 1
-                yield {}
-                return
-            else:
-                return
-
-        if query_name == 'Clear':
-            predicate_changed.cases = []
-            predicate_changed.then = []
-            predicate_changed.count = 0
-            predicate_changed.basic = []
-            predicate_changed.nope = []
+    if predicate_changed not in interpreter.predicates:
+        return
+
+    predicate_changed = interpreter.predicates[predicate_changed]
+
+    if query_name == "AssertFE":
+        basic = processParen(body)
+        if basic:
+            predicate_changed.addBasic(basic)
             yield {}
+        return
+    if query_name == "AssertF":
+        basic = processParen(body)
+        if basic:
+            predicate_changed.addBasic(basic, insert=True)
+            yield {}
+        return
+
+    if query_name == "AssertNE":
+        basic = processParen(body)
+        if basic:
+            predicate_changed.addNot(basic)
+            yield {}
+        return
+    if query_name == "AssertN":
+        basic = processParen(body)
+        if basic:
+            predicate_changed.addNot(basic, insert=True)
+            yield {}
+        return
+
+    if query_name == "AssertCE":
+        to_match, _, then = body.partition(">")
+        to_match, then = processParen(to_match), processParen(then)
+        if not to_match or not then:
+            return
+        predicate_changed.addCase(to_match, then)
+        yield {}
+        return
+    if query_name == "AssertC":
+        to_match, _, then = body.partition(">")
+        to_match, then = processParen(to_match), processParen(then)
+        if not to_match or not then:
             return
+        predicate_changed.addCase(to_match, then, insert=True)
+        yield {}
+        return
 
+    if query_name == "DeleteF":
+        body = processParen(body)
+        if predicate_changed.removeBasic(body):
+            yield {}
+        return
+    if query_name == "DeleteN":
+        body = processParen(body)
+        if predicate_changed.removeNot(body):
+            yield {}
         return
+    if query_name == 'DeleteC':
+        to_match, _, then = body.partition(">")
+        to_match, then = processParen(to_match), processParen(then)
+        if predicate_changed.removeCase(to_match, then):
+            yield {}
+        return
+
+    if query_name == 'Clear':
+        predicate_changed.clear()
+        yield {}
+        return
+
 
-    found[0] = False
+for dynamic_name in ["AssertF", "AssertFE", "AssertN", "AssertNE", "AssertC", "AssertCE", "DeleteF", "DeleteN", "DeleteC",
+                     "Create", "SwitchRecursive", "SwitchRandom", 'Clear', 'Delete']:
+    register(dynamic_name, partial(dynamic, dynamic_name), flag="dynamic_added", arity=1)
@@ -0,0 +1,200 @@
+"""
+
+Cache
+
+Compiled programs, cached on disk. Loading a file into a new interpreter (lexing it and reading its tokens, including
+every library it imports) is done once: the state it builds (predicates, packages, domains, infixes, titles, macros,
+datasets and the libraries that were added) is pickled to __lclcache__/<file>.pickle next to the file. Later loads of
+the same file, with the same interpreter version, interpreter sources, libraries and imported files, restore the state
+instead. The pickled state is made of the classes of the interpreter, so a change to any of its source files makes the
+cache out of date, and a cache that can not be restored anyway is discarded.
+Programs with python predicates are not cached (python code can not be pickled).
+
+"""
+
+import hashlib
+import os
+import pickle
+from functools import lru_cache
+
+from Natives import natives
+from main import version
+
+
+FORMAT = 2  # Format of the cache files, changed whenever the cached state changes
+
+# State of the interpreter built by loading a program
+CACHED = ("predicates", "packages", "titles", "infixes", "domains", "macros", "datasets", "datahashes", "objects",
+          "sources", "modules", "math_added", "list_added", "types_added", "predicates_added", "save_added",
+          "strings_added", "inspect_added", "dynamic_added", "ref_added", "filestream_added")
+
+
+# Where a file is cached
+def location(filename):
+    """
+    The path of the cache of a file.
+
+    :param filename: str
+    :return: str
+    """
+    directory, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(directory, "__lclcache__", name + ".pickle")
+
+
+# Hash of a text
+def digest(data):
+    """
+    :param data: str
+    :return: str
+    """
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+# Hash of the sources of the interpreter
+@lru_cache(maxsize=None)
+def code():
+    """
+    The hash of the python files of the interpreter (the modules of the pickled classes among them), read once.
+
+    :return: str
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".py"))
+    hashes = dependencies(paths)
+    return digest("\n".join(f"{os.path.basename(path)}:{hashed}" for path, hashed in hashes.items()))
+
+
+# Key of a program
+def key(interpreter, data):
+    """
+    The key of a program: the version of the interpreter and of the cache, the sources of the interpreter, the libraries
+    and the source.
+
+    :param interpreter: Interpreter
+    :param data: str (the source)
+    :return: str
+    """
+    return digest("\n".join([version, str(FORMAT), code(), interpreter.path, ",".join(interpreter.imports), data]))
+
+
+# Hashes of files
+def dependencies(paths):
+    """
+    The hashes of files (None for files that can not be read).
+
+    :param paths: list[str]
+    :return: dict[str, str]
+    """
+    hashes = {}
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                hashes[path] = digest(f.read())
+        except OSError:
+            hashes[path] = None
+    return hashes
+
+
+class Pickler(pickle.Pickler):
+    """
+    Pickles the state of an interpreter, keeping references to the interpreter and to native implementations.
+    """
+
+    def __init__(self, file, interpreter):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.interpreter = interpreter
+        self.native_names = {id(native): (library, name)
+                             for library, implementations in natives.items() for name, native in implementations.items()}
+
+    def persistent_id(self, obj):
+        if obj is self.interpreter:
+            return "interpreter"
+        if callable(obj) and id(obj) in self.native_names:
+            return ("native",) + self.native_names[id(obj)]
+        return None
+
+
+class Unpickler(pickle.Unpickler):
+    """
+    Restores the state of an interpreter into another interpreter.
+    """
+
+    def __init__(self, file, interpreter):
+        super().__init__(file)
+        self.interpreter = interpreter
+
+    def persistent_load(self, pid):
+        if pid == "interpreter":
+            return self.interpreter
+        _, library, name = pid
+        return natives[library][name]
+
+
+# Restores a cached program
+def restore(interpreter, filename, data):
+    """
+    Restores the state of loading a program into a new interpreter, if it was cached.
+
+    :param interpreter: Interpreter (that read nothing yet)
+    :param filename: str
+    :param data: str (the source)
+    :return: bool (False if the program was not cached, or the cache is out of date)
+    """
+    if interpreter.sources:
+        return False
+    path = location(filename)
+    try:
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+            if entry["key"] != key(interpreter, data) or dependencies(entry["dependencies"]) != entry["dependencies"]:
+                return False
+            state = Unpickler(f, interpreter).load()
+    except OSError:
+        return False
+    except (EOFError, KeyError, TypeError, AttributeError, ImportError, IndexError, ValueError,
+            pickle.UnpicklingError):
+        discard(path)
+        return False
+    for attribute in CACHED:
+        setattr(interpreter, attribute, state[attribute])
+    interpreter.tables.clear()
+    return True
+
+
+# Discards a cache
+def discard(path):
+    """
+    Removes a cache that can not be restored (written by another version of the classes, or broken).
+
+    :param path: str
+    :return: None
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Caches a program
+def store(interpreter, filename, data):
+    """
+    Caches the state of loading a program into a new interpreter.
+
+    :param interpreter: Interpreter (that read only this program)
+    :param filename: str
+    :param data: str (the source)
+    :return: bool (whether the program was cached)
+    """
+    if len(interpreter.sources) != 1 or interpreter.pythons or interpreter.errorLoad:
+        return False
+    path = location(filename)
+    entry = {"key": key(interpreter, data), "dependencies": dependencies(list(interpreter.modules))}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+            Pickler(f, interpreter).dump({attribute: getattr(interpreter, attribute) for attribute in CACHED})
+        os.replace(path + ".tmp", path)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        return False
+    return True
@@ -0,0 +1,375 @@
+"""
+
+Constraints
+
+Global constraints of domain searches (const AllDifferent([?a, ?b, ?c]), ...).
+A global constraint narrows the ranges of its variables directly (a propagator), instead of searching a query for
+the values its variables can take. Its propagator runs whenever the range of one of its variables changes.
+
+"""
+
+from MathHelper import parse
+from util import splitWithoutParen, match_type
+
+
+global_constraints = {}  # Name -> class of the global constraint
+
+
+# Registers a global constraint
+def register(name):
+    """
+    Returns a decorator that registers a class as a global constraint.
+
+    :param name: str
+    :return: function
+    """
+    def decorator(cls):
+        global_constraints[name] = cls
+        return cls
+    return decorator
+
+
+# Creates a global constraint
+def create(domain, const):
+    """
+    The global constraint a constraint of a domain denotes.
+
+    :param domain: Domain
+    :param const: str
+    :return: GlobalConstraint, None (not a global constraint)
+    """
+    name, _, pattern = const.partition("(")
+    cls = global_constraints.get(name.strip(), None)
+    if cls is None or not pattern.endswith(")"):
+        return None
+    try:
+        return cls(domain, [part.strip() for part in splitWithoutParen(pattern[:-1])])
+    except ValueError:
+        return None
+
+
+class GlobalConstraint:
+    """
+    A global constraint over the variables of a domain (components that are not variables are constants).
+    """
+
+    arity = 0
+
+    def __init__(self, domain, parts):
+        """
+        :param domain: Domain
+        :param parts: list[str] (the components of the constraint)
+        :raises ValueError: illegal components
+        """
+        if len(parts) != self.arity:
+            raise ValueError(parts)
+        self.domain = domain
+        self.variables = []  # The variables of the domain the constraint is over
+
+    def term(self, part):
+        """
+        A component, a variable of the domain or a constant.
+
+        :param part: str
+        :return: str
+        :raises ValueError: a variable that is not a variable of the domain
+        """
+        part = part.strip()
+        if match_type(part) == "var":
+            if part not in self.domain.variables:
+                raise ValueError(part)
+            if part not in self.variables:
+                self.variables.append(part)
+        return part
+
+    def terms(self, part):
+        """
+        The elements of a list component.
+
+        :param part: str
+        :return: list[str]
+        :raises ValueError: not a list
+        """
+        return [self.term(element) for element in elements(part)]
+
+    @staticmethod
+    def values(search, term):
+        """
+        The values a component can take.
+
+        :param search: DomainSearch
+        :param term: str
+        :return: set[str]
+        """
+        if match_type(term) == "var":
+            return search.ranges[term]
+        return {term}
+
+    @staticmethod
+    def narrow(search, term, values):
+        """
+        Keeps only some of the values of a component.
+
+        :param search: DomainSearch
+        :param term: str
+        :param values: set[str]
+        :return: bool (False if no value is left)
+        """
+        if match_type(term) == "var":
+            return search.narrow(term, search.ranges[term].intersection(values))
+        return term in values
+
+    def revise(self, search):
+        """
+        Narrows the ranges of the variables of the constraint.
+
+        :param search: DomainSearch
+        :return: bool (False if the constraint can not be satisfied)
+        """
+        raise NotImplementedError
+
+
+@register("AllDifferent")
+class AllDifferent(GlobalConstraint):
+    """
+    AllDifferent(list) - the elements of the list are all different.
+    Keeps exactly the values that are part of some assignment of different values (Regin's matching based filtering).
+    """
+
+    arity = 1
+
+    def __init__(self, domain, parts):
+        super().__init__(domain, parts)
+        self.elements = self.terms(parts[0])
+
+    def revise(self, search):
+        ranges = [self.values(search, term) for term in self.elements]
+
+        # A maximum matching between the elements and the values
+        matched = [None] * len(ranges)  # element -> value
+        owner = {}  # value -> element
+
+        def augment(i, visited):
+            for value in ranges[i]:
+                if value in visited:
+                    continue
+                visited.add(value)
+                if value not in owner or augment(owner[value], visited):
+                    matched[i] = value
+                    owner[value] = i
+                    return True
+            return False
+
+        for i in range(len(ranges)):
+            if not augment(i, set()):
+                return False
+
+        # Directed graph: element -> matched value, value -> the other elements it can be given to
+        graph = {("e", i): [("v", matched[i])] for i in range(len(ranges))}
+        for i, rng in enumerate(ranges):
+            for value in rng:
+                if value != matched[i]:
+                    graph.setdefault(("v", value), []).append(("e", i))
+        for value in owner:
+            graph.setdefault(("v", value), [])
+
+        # Values reachable from a value no element was given
+        reachable = set()
+        stack = [node for node in graph if node[0] == "v" and node[1] not in owner]
+        while stack:
+            node = stack.pop()
+            if node in reachable:
+                continue
+            reachable.add(node)
+            stack.extend(graph.get(node, []))
+
+        component = strongly_connected(graph)
+
+        for i, term in enumerate(self.elements):
+            keep = {value for value in ranges[i]
+                    if value == matched[i] or ("v", value) in reachable or component[("v", value)] == component[("e", i)]}
+            if len(keep) != len(ranges[i]) and not self.narrow(search, term, keep):
+                return False
+        return True
+
+
+@register("Sum")
+class Sum(GlobalConstraint):
+    """
+    Sum(list, total) - the numbers of the list add up to the total (bounds propagation).
+    """
+
+    arity = 2
+
+    def __init__(self, domain, parts):
+        super().__init__(domain, parts)
+        self.elements = self.terms(parts[0])
+        self.total = self.term(parts[1])
+
+    def numbers(self, search, term):
+        """
+        The values of a component that are numbers.
+
+        :return: dict[str, int|float]
+        """
+        return {value: parse(value) for value in self.values(search, term) if parse(value) is not None}
+
+    def revise(self, search):
+        elements = [self.numbers(search, term) for term in self.elements]
+        total = self.numbers(search, self.total)
+        if not total or any(not numbers for numbers in elements):
+            return False
+
+        low = sum(min(numbers.values()) for numbers in elements)
+        high = sum(max(numbers.values()) for numbers in elements)
+        low_total, high_total = min(total.values()), max(total.values())
+
+        keep = {value for value, num in total.items() if low <= num <= high}
+        if not self.narrow(search, self.total, keep):
+            return False
+
+        for term, numbers in zip(self.elements, elements):
+            smallest, largest = min(numbers.values()), max(numbers.values())
+            # The smallest and largest values left for this element by the others
+            least = low_total - (high - largest)
+            most = high_total - (low - smallest)
+            keep = {value for value, num in numbers.items() if least <= num <= most}
+            if len(keep) != len(self.values(search, term)) and not self.narrow(search, term, keep):
+                return False
+        return True
+
+
+@register("Element")
+class Element(GlobalConstraint):
+    """
+    Element(index, list, value) - the element of the list at the index (counting from 0) is the value.
+    """
+
+    arity = 3
+
+    def __init__(self, domain, parts):
+        super().__init__(domain, parts)
+        self.index = self.term(parts[0])
+        self.elements = self.terms(parts[1])
+        self.value = self.term(parts[2])
+
+    def revise(self, search):
+        values = self.values(search, self.value)
+
+        indices = set()
+        possible = set()
+        for index in self.values(search, self.index):
+            i = parse(index)
+            if type(i) is not int or not 0 <= i < len(self.elements):
+                continue
+            common = self.values(search, self.elements[i]).intersection(values)
+            if common:
+                indices.add(index)
+                possible |= common
+
+        if not self.narrow(search, self.index, indices) or not self.narrow(search, self.value, possible):
+            return False
+
+        index = self.values(search, self.index)
+        if len(index) == 1:
+            i = parse(next(iter(index)))
+            return self.narrow(search, self.elements[i], self.values(search, self.value))
+        return True
+
+
+@register("Table")
+class Table(GlobalConstraint):
+    """
+    Table(list, tuples) - the list is one of the tuples (a list of lists of constants).
+    """
+
+    arity = 2
+
+    def __init__(self, domain, parts):
+        super().__init__(domain, parts)
+        self.elements = self.terms(parts[0])
+        self.tuples = []
+        for row in elements(parts[1]):
+            row = elements(row)
+            if len(row) != len(self.elements) or any(match_type(value) == "var" for value in row):
+                raise ValueError(parts[1])
+            self.tuples.append(row)
+
+    def revise(self, search):
+        ranges = [self.values(search, term) for term in self.elements]
+        rows = [row for row in self.tuples if all(value in rng for value, rng in zip(row, ranges))]
+        for i, term in enumerate(self.elements):
+            keep = {row[i] for row in rows}
+            if len(keep) != len(ranges[i]) and not self.narrow(search, term, keep):
+                return False
+        return True
+
+
+# Elements of a list
+def elements(part):
+    """
+    The elements of an expanded list.
+
+    :param part: str
+    :return: list[str]
+    :raises ValueError: not an expanded list
+    """
+    part = part.strip()
+    if match_type(part) != "list":
+        raise ValueError(part)
+    if part[1:-1].strip() == "":
+        return []
+    return [element.strip() for element in splitWithoutParen(part[1:-1])]
+
+
+# Strongly connected components of a graph
+def strongly_connected(graph):
+    """
+    The strongly connected components of a directed graph (Tarjan's algorithm, without recursion).
+
+    :param graph: dict[node, list[node]]
+    :return: dict[node, int] (node -> component)
+    """
+    index = {}
+    low = {}
+    component = {}
+    stack = []
+    on_stack = set()
+    counter = 0
+
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph.get(child, []))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component[member] = node
+                    if member == node:
+                        break
+    return component
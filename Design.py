@@ -14,6 +14,7 @@ from tkinter import filedialog
 from win32api import GetSystemMetrics
 import Lexer
 import Interpreter
+from Budget import Budget
 from util import *
 from time import sleep
 
@@ -45,6 +46,7 @@ class Console:
         # For Queries
         self.asked_for_more, self.found_more = False, False
         self.requested_input, self.got_input = False, False
+        self.budget = None  # Budget of the searched query, cancels it (see stopSearch)
 
         # Get the width and the height of the Page
         width = GetSystemMetrics(0)
@@ -106,6 +108,7 @@ class Console:
         self.query = Entry(self.mainFrame, font=("Courier", 14), textvariable=self.queryText)
         self.query.grid(row=3, column=1, padx=(10), pady=(10, 20), sticky=S + W + E)
         self.root.bind("<Return>", self.moreSolutions)
+        self.root.bind("<Escape>", self.stopSearch)
         self.sendQuery = Button(self.mainFrame, text='Send Query', command=self.queryReceived, font=("Helvetica", 14))
         self.sendQuery.grid(row=3, column=2, padx=(10), pady=(10, 20), stick=W)
 
@@ -170,6 +173,8 @@ class Console:
         :return: None
         """
         self.interpreter.deleted = True
+        if self.budget is not None:
+            self.budget.cancel()
         for domain in self.interpreter.domains.values():
             domain.shut_down()
         self.interpreter.__init__(self.interpreter.time_limit, self.interpreter.imports, self.interpreter.path, update_delete=False)
@@ -303,42 +308,47 @@ class Console:
         :return: None
         """
         try:
-            sol = next_solution(self.solutions, self.time_limit)
-            ed, _ = self.viewErrorsAndMessages()
-            if ed:
-                self.solutions = None
-                self.searching = False
-                return
-            if sol == "Request":
-                self.requested_input = True
-                self.directionsQuery['text'] = "Enter Input:"
-                self.sendQuery['text'] = 'Send Input'
-                while not self.got_input:
+            while True:
+                sol = next_solution(self.solutions, self.time_limit, self.budget)
+                ed, _ = self.viewErrorsAndMessages()
+                if ed:
+                    self.solutions = None
+                    self.searching = False
+                    return
+                if sol == "Request":
+                    self.requested_input = True
+                    self.directionsQuery['text'] = "Enter Input:"
+                    self.sendQuery['text'] = 'Send Input'
+                    while not self.got_input:
+                        sleep(0.01)
+                    self.directionsQuery['text'] = 'Enter Query Here:'
+                    self.sendQuery['text'] = "Send Query"
+                    self.got_input = False
+                    continue
+                elif sol == "Print":
+                    continue  # TT(or(p, q))
+                elif sol == 0 or sol == 3:
                     pass
-                self.directionsQuery['text'] = 'Enter Query Here:'
-                self.sendQuery['text'] = "Send Query"
-                self.got_input = False
-                self.show_solution(not_indp)
-                return
-            elif sol == "Print":
-                self.show_solution(not_indp)
-                return  # TT(or(p, q))
-            elif sol == 0 or sol == 3:
-                pass
-            elif sol == 1:
-                self.interpreter.raiseError('Error: Timeout Error')
-            elif sol == 2:
-                self.interpreter.raiseError('Error: Unknown Error')
-            elif sol == {}:
-                self.sendMessage('True.\n')
-                self.solutions = None
-                self.searching = False
-                return
-            else:
-                self.sendMessage(sol)
-                self.sendMessage('\nFind More Solutions? (Press Enter)\n')
-                self.searching = False
-                return
+                elif sol == 1:
+                    self.interpreter.raiseError('Error: Timeout Error')
+                elif sol == 2:
+                    self.interpreter.raiseError('Error: Unknown Error')
+                elif sol == 4:
+                    self.sendMessage('Search Stopped.\n')
+                    self.solutions = None
+                    self.searching = False
+                    return
+                elif sol == {}:
+                    self.sendMessage('True.\n')
+                    self.solutions = None
+                    self.searching = False
+                    return
+                else:
+                    self.sendMessage(sol)
+                    self.sendMessage('\nFind More Solutions? (Press Enter)\n')
+                    self.searching = False
+                    return
+                break
         except Exception as e:
             if type(e) not in [ValueError, RecursionError]:
                 raise e
@@ -409,7 +419,8 @@ class Console:
                 self.sendMessage("Illegal Query, parentheses do not match")
                 return
 
-        self.solutions = self.interpreter.mixed_query(text_query, type_query, self.recursion_limit)
+        self.budget = Budget(self.recursion_limit)
+        self.solutions = self.interpreter.mixed_query(text_query, type_query, self.budget)
         self.searching = True
 
         try:
@@ -444,6 +455,17 @@ class Console:
                 self.solutions = None
                 self.searching = None
 
+    # Stops the search
+    def stopSearch(self, event=None):
+        """
+        For when escape is pressed - stops the search of the current query (it stops the next time it checks its budget).
+
+        :param event: Any
+        :return: None
+        """
+        if self.searching and self.budget is not None:
+            self.budget.cancel()
+
     # run the code
     def run(self):
         """
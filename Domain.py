@@ -1,9 +1,13 @@
 
-from copy import deepcopy
-from Match import MatchDictionary
-from util import processParen, splitWithoutParen, outString, smart_replace, match_type, var_in_query
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from random import Random
 
-fixed_search = []
+import Constraints
+import Parallel
+from Match import MatchDictionary
+from util import processParen, splitWithoutParen, smart_replace, match_type, var_in_query, Counter
 
 
 class Domain:
@@ -31,6 +35,10 @@ class Domain:
         self.final = ""
         self.when = {}
         self.deleted = False
+        self.strategy = {"variables": "dom", "values": "order", "restarts": None,
+                         "workers": None}  # Search heuristics (see insert_strategy)
+        self.order = {}  # Variable -> its values, in the order the range search found them
+        self.stats = {}  # Statistics of the last search (see DomainSearch)
 
     def complete(self):
         """
@@ -54,7 +62,7 @@ class Domain:
         b = b[:-1]
         if a.isnumeric() and match_type(b) == "var":
             self.variables = [f"{b}{i}" for i in range(1, int(a)+1)]
-            print(self.variables)
+            self.raw_vars = ",".join(self.variables)
             return True
         self.raw_vars = variables
         self.variables = splitWithoutParen(variables)
@@ -133,6 +141,41 @@ class Domain:
         self.when[elim] = when
         return True
 
+    def insert_strategy(self, strategy, line):
+        """
+        Inserts the search heuristics of the domain (domain ... as ...), separated by commas:
+        dom (smallest range first, the default), domdeg (smallest range, ties broken by the number of rules over
+        unfixed variables), domwdeg (smallest range relative to the weights of the rules, rules gain weight when they
+        fail) choose the variable to branch on.
+        lcv tries the values that leave the largest ranges first (otherwise the values are tried in the order the range
+        search found them).
+        restarts, restarts(seed) restarts the search with random tie breaks after a growing number of failures.
+        parallel, parallel(n) searches the subproblems of the top levels in a pool of n processes (one per core).
+
+        :param strategy: str
+        :param line: int
+        :return: bool
+        """
+        for heuristic in splitWithoutParen(strategy):
+            heuristic = heuristic.strip()
+            if heuristic in ("dom", "domdeg", "domwdeg"):
+                self.strategy["variables"] = heuristic
+            elif heuristic == "lcv":
+                self.strategy["values"] = heuristic
+            elif heuristic == "restarts":
+                self.strategy["restarts"] = 0
+            elif heuristic.startswith("restarts(") and heuristic.endswith(")") and heuristic[9:-1].isnumeric():
+                self.strategy["restarts"] = int(heuristic[9:-1])
+            elif heuristic == "parallel":
+                self.strategy["workers"] = os.cpu_count() or 1
+            elif heuristic.startswith("parallel(") and heuristic.endswith(")") and heuristic[9:-1].isnumeric() \
+                    and int(heuristic[9:-1]) > 0:
+                self.strategy["workers"] = int(heuristic[9:-1])
+            else:
+                self.interpreter.raiseError(f"Error: Unknown search heuristic '{heuristic}' of domain {self.name}, in line {line}")
+                return False
+        return True
+
     def insert_final(self, final):
         """
         Inserts a final assertion
@@ -154,9 +197,11 @@ class Domain:
                 self.ranges = None
                 return
             self.ranges[var] = set()
+            self.order[var] = {}
             for search in self.interpreter.mixed_query(self.range_searches[var], 0, depth, True):
                 if var in search:
                     self.ranges[var].add(search[var])
+                    self.order[var].setdefault(search[var], len(self.order[var]))
 
     def search(self, depth, query_pat):
         """
@@ -168,215 +213,551 @@ class Domain:
         """
         parts = splitWithoutParen(query_pat)
         if len(parts) != len(self.variables):
-            # print(parts, self.variables)
             return
         self.generate_ranges(depth)
+        if self.ranges is None:
+            return
 
-        ranges = deepcopy(self.ranges)
-        fixed = {}
-
-        # print(f"Original ranges {ranges}")
+        ranges = {}
         for i, part in enumerate(parts):
             var = self.variables[i]
-            for option in self.ranges[var]:
-                if not MatchDictionary.match(self.interpreter, part, option):
-                    ranges[var].remove(option)
-                if len(ranges[var]) == 0:
-                    return
-                if len(ranges[var]) == 1:
-                    fixed[var] = next(iter(ranges[var]))
-                    del ranges[var]
-                    break
+            ranges[var] = {option for option in self.ranges[var] if MatchDictionary.match(self.interpreter, part, option)}
+            if len(ranges[var]) == 0:
+                return
 
-        consts = deepcopy(self.constraints)
-        elims = deepcopy(self.eliminations)
-        already = set()
+        search = DomainSearch(self, depth, ranges)
+        if self.strategy["workers"] is not None and self.interpreter.rebuildable():
+            yield from search.parallel(self.strategy["workers"])
+        else:
+            yield from search.solve()
 
-        self.update_range(depth, ranges, fixed, consts, elims, already)
 
-        print(f"domain ranges {ranges}, with fixed {fixed}\n")
-        yield from self.solve(depth, ranges, fixed, consts, elims, already)
+class Restart(Exception):
+    """
+    Raised to restart a domain search, once its branches failed too many times.
+    """
+
+
+class DomainSearch:
+    """
+    A single search of a domain.
+    Constraints and eliminations are revised through a propagation queue: a rule is revised again only when one of
+    its variables (or of its when condition) is fixed, since a rule only depends on the values of the fixed variables.
+    Revising a rule narrows the ranges of its variables that are not fixed, and a range narrowed down to a single value
+    fixes its variable. Changes are recorded on a trail, and undone when the search backtracks.
+    The variable to branch on and the order of its values are chosen by the heuristics of the domain.
+
+    Every change of a range keeps its reason, the decisions (by level) the change depends on. A failure is explained by
+    the reasons of the variables of the rule that failed (its conflict set), so the search backjumps over decisions
+    the failure does not depend on, and a variable whose values all failed is recorded as a nogood, the combination of
+    decisions that caused it, which fails any later branch (or restart) that repeats it.
+    """
+
+    CONST = 0
+    ELIM = 1
+    GLOBAL = 2
 
-    def solve(self, depth, ranges, fixed, rel_const, rel_elim, already):
+    FIRST_CUTOFF = 32  # Failures before the first restart
+    GROWTH = 1.5  # Growth of the cutoff after every restart
+
+    SUBPROBLEMS = 4  # Subproblems of a parallel search for every process
+
+    def __init__(self, domain, depth, ranges):
         """
-        Solves a constraint problem.
-        ranges represents the ranges of variables in the constraint problem.
-        fixed represents the fixed variables, that had been instantiated.
-        rel_const represents the relevant constraints that have yet to be solved.
-        rel_elim represents the relevant eliminations that have yet to be solved.
+        Initiate a search.
 
+        :param domain: Domain
         :param depth: Counter
-        :param ranges: dict[str, set[str]]
-        :param fixed: dict[str, str]
-        :param rel_const: dict[str, set[str]]
-        :param rel_elim: dict[str, set[str]]
-        :param already: set[str]
+        :param ranges: dict[str, set[str]] (the initial range of every variable)
+        """
+        self.domain = domain
+        self.interpreter = domain.interpreter
+        self.depth = depth
+        self.ranges = ranges  # Current range of every variable (a single value for fixed variables)
+        self.fixed = {}  # Fixed variables -> values
+        self.trail = []  # Changes to undo when backtracking, ("range", variable, old range, old reason) / ("fixed", variable)
+        self.reasons = {var: frozenset() for var in ranges}  # Variable -> levels of the decisions its range depends on
+        self.cause = frozenset()  # Reason of the changes being made
+        self.conflict = frozenset()  # Levels of the decisions the last failure depends on
+        self.decisions = []  # (variable, value) of every level of the search
+        self.nogoods = {}  # (variable, value) -> combinations of decisions that fail, frozenset[(variable, value)]
+        self.stats = {"nodes": 0, "fails": 0, "propagations": 0, "backjumps": 0, "nogoods": 0}
+        domain.stats = self.stats
+        self.queue = deque()  # Rules waiting to be revised
+        self.queued = set()
+        self.results = {}  # Searched rules (after replacing the fixed variables) -> results
+
+        self.strategy = domain.strategy
+        self.fails = 0  # Number of failed branches
+        self.cutoff = None  # Number of failures after which the search restarts (None for no restarts)
+        self.random = None
+        if self.strategy["restarts"] is not None:
+            self.random = Random(self.strategy["restarts"])
+            self.cutoff = DomainSearch.FIRST_CUTOFF
+
+        self.rules = []  # (kind, rule, variables of the rule, when condition), rule is a GlobalConstraint for globals
+        self.scopes = []  # Variables every rule depends on (including the variables of its when condition)
+        self.watchers = {var: [] for var in domain.variables}  # Variable -> the rules to revise when it is fixed
+        self.narrowed = {var: [] for var in domain.variables}  # Variable -> the rules to revise when its range changes
+        for kind, rules in ((DomainSearch.CONST, domain.constraints), (DomainSearch.ELIM, domain.eliminations)):
+            for rule, variables in rules.items():
+                when = domain.when.get(rule, "")
+                index = len(self.rules)
+                global_constraint = Constraints.create(domain, rule) if kind == DomainSearch.CONST else None
+                if global_constraint is not None:
+                    self.rules.append((DomainSearch.GLOBAL, global_constraint, global_constraint.variables, when))
+                    for var in global_constraint.variables:
+                        self.narrowed[var].append(index)
+                else:
+                    self.rules.append((kind, rule, [var for var in domain.variables if var in variables], when))
+                self.scopes.append([])
+                for var in domain.variables:
+                    if var in variables or (when and var_in_query(when, var)):
+                        self.watchers[var].append(index)
+                        self.scopes[index].append(var)
+                for var in self.rules[index][2]:
+                    if var not in self.scopes[index]:
+                        self.scopes[index].append(var)
+        self.weights = [1] * len(self.rules)  # Weights of the rules (domwdeg), a rule gains weight when it fails
+
+    # Generates the solutions
+    def solve(self):
+        """
+        Generates the solutions of the domain.
+
         :return: generator[dict]
         """
+        for var in self.domain.variables:
+            if len(self.ranges[var]) == 1:
+                self.fix(var, next(iter(self.ranges[var])))
+        self.enqueue(range(len(self.rules)))
+        if not self.propagate():
+            return
 
-        if depth.count < 0:
+        if self.cutoff is None:
+            yield from self.branch()
             return
 
-        if self.deleted:
+        # Restarts, the solutions found before a restart are not generated again
+        found = set()
+        mark = len(self.trail)
+        while True:
+            self.fails = 0
+            try:
+                for solution in self.branch():
+                    key = tuple(solution[var] for var in self.domain.variables)
+                    if key not in found:
+                        found.add(key)
+                        yield solution
+                return
+            except Restart:
+                self.undo(mark)
+                del self.decisions[:]
+                self.cutoff = max(self.cutoff + 1, int(self.cutoff * DomainSearch.GROWTH))
+
+    # Searches subproblems in a pool of processes
+    def parallel(self, workers):
+        """
+        Generates the solutions of the domain, searching the subproblems of the top levels of the search in a pool of
+        processes (see Parallel.py). The solutions are generated as the subproblems are solved.
+
+        :param workers: int (number of processes)
+        :return: generator[dict]
+        """
+        subproblems = self.split(workers * DomainSearch.SUBPROBLEMS)
+        if not subproblems:
             return
 
-        # if there are any ranges with length 1 or 0
-        flag = True
-        while flag:
-            flag = False
-            for var in list(ranges.keys()):
-                if len(ranges[var]) == 0:
+        program = self.interpreter.program()
+        pool = ProcessPoolExecutor(workers)
+        try:
+            futures = [pool.submit(solve_subproblem, program, self.domain.name, self.depth.count, ranges)
+                       for ranges in subproblems]
+            for future in as_completed(futures):
+                if self.depth.count < 0 or self.domain.deleted:
                     return
-                if len(ranges[var]) == 1:
-                    flag = True
-                    fixed[var] = ranges[var].pop()
-                    del ranges[var]
-            if flag:
-                if not self.update_range(depth, ranges, fixed, consts=rel_const, elims=rel_elim, already=already):
+                try:
+                    solutions, stats = future.result()
+                except Exception as e:
+                    self.interpreter.raiseError(f"Error: Parallel search of domain {self.domain.name} failed ({e})")
                     return
+                for key, value in stats.items():
+                    self.stats[key] += value
+                yield from solutions
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # Splits the search into subproblems
+    def split(self, count):
+        """
+        Splits the search into independent subproblems, by branching on more and more of the top levels of the search
+        until there are enough subproblems.
 
-        if len(ranges) == 0:
-            if self.final == "":
-                yield fixed
-                return True
-            for _ in self.interpreter.mixed_query(smart_replace(self.final, fixed), 0, depth, True):
-                yield fixed
-                return True
-            return False
+        :param count: int (number of subproblems wanted)
+        :return: list[dict[str, set[str]]] (the ranges of every subproblem)
+        """
+        for var in self.domain.variables:
+            if len(self.ranges[var]) == 1:
+                self.fix(var, next(iter(self.ranges[var])))
+        self.enqueue(range(len(self.rules)))
+        if not self.propagate():
+            return []
+
+        subproblems = [dict(self.ranges)]
+        levels = 0
+        while len(subproblems) < count and levels < len(self.domain.variables) - len(self.fixed):
+            levels += 1
+            subproblems = []
+            self.frontier(levels, subproblems)
+        return subproblems
+
+    # Subproblems of a level of the search
+    def frontier(self, levels, subproblems):
+        """
+        Collects the ranges of the branches of the search a number of levels below the current fixed variables.
 
-        var = min(ranges.keys(), key=lambda k: len(ranges[k]))
-        rng = ranges[var]
+        :param levels: int
+        :param subproblems: list[dict[str, set[str]]]
+        :return: None
+        """
+        unfixed = [var for var in self.domain.variables if var not in self.fixed]
+        if levels == 0 or not unfixed:
+            subproblems.append(dict(self.ranges))
+            return
+        var = self.choose(unfixed)
+        for option in self.options(var, unfixed):
+            mark = len(self.trail)
+            self.cause = frozenset()
+            if self.narrow(var, {option}) and self.propagate():
+                self.frontier(levels - 1, subproblems)
+            self.undo(mark)
+
+    # Chooses a variable and tries every value of its range
+    def branch(self):
+        """
+        Searches the assignments that extend the current fixed variables.
+        Returns (as the value of the generator) the conflict set, the levels of the decisions the failure of the search
+        depends on, or None if the search did not fail (a solution was found, or the search was cut).
 
-        for option in rng:
+        :return: generator[dict]
+        """
+        level = len(self.decisions) + 1
+
+        if self.depth.count < 0 or self.domain.deleted:
+            return None
+
+        unfixed = [var for var in self.domain.variables if var not in self.fixed]
+        if not unfixed:
+            if self.domain.final == "" or self.holds(smart_replace(self.domain.final, self.fixed)):
+                yield dict(self.fixed)
+                return None
+            return frozenset(range(1, level))
+
+        conflict = set()
+        failed = True
+        var = self.choose(unfixed)
+        for option in self.options(var, unfixed):
+
+            if self.depth.count < 0 or self.domain.deleted:
+                return None
+
+            mark = len(self.trail)
+            self.stats["nodes"] += 1
+            self.decisions.append((var, option))
+            self.cause = frozenset((level,))
+            if self.narrow(var, {option}) and self.propagate() and self.consistent(var, option):
+                result = yield from self.branch()
+            else:
+                self.fails += 1
+                self.stats["fails"] += 1
+                result = self.conflict
+            self.decisions.pop()
+            self.undo(mark)
+
+            if result is None:
+                failed = False
+            elif failed and level not in result:
+                # The failure does not depend on this decision, so no other value of the variable can change it
+                self.stats["backjumps"] += 1
+                return result
+            else:
+                conflict |= result
+            if self.cutoff is not None and self.fails > self.cutoff:
+                raise Restart()
+
+        if not failed:
+            return None
+        conflict.discard(level)
+        self.learn(var, conflict)
+        return frozenset(conflict)
+
+    # Learns a nogood
+    def learn(self, var, conflict):
+        """
+        Records that the decisions of a conflict set leave no value to a variable.
 
-            if self.deleted:
-                return
+        :param var: str
+        :param conflict: set[int] (levels)
+        :return: None
+        """
+        if not conflict:
+            return
+        nogood = frozenset(self.decisions[level - 1] for level in conflict)
+        for decision in nogood:
+            self.nogoods.setdefault(decision, []).append(nogood)
+        self.stats["nogoods"] += 1
 
-            new_ranges = deepcopy(ranges)
-            del new_ranges[var]
-            new_fixed = deepcopy(fixed)
-            new_fixed[var] = option
-            new_consts = deepcopy(rel_const)
-            new_elim = deepcopy(rel_elim)
-            new_already = deepcopy(already)
+    # Checks the nogoods of a decision
+    def consistent(self, var, value):
+        """
+        Whether the fixed variables repeat a nogood of a decision.
 
-            if not self.update_range(depth, new_ranges, new_fixed, new_consts, new_elim, new_already):
-                continue
+        :param var: str
+        :param value: str
+        :return: bool (False if a nogood is repeated, its reasons are the conflict set)
+        """
+        for nogood in self.nogoods.get((var, value), ()):
+            if all(self.fixed.get(other, None) == option for other, option in nogood):
+                conflict = set()
+                for other, _ in nogood:
+                    conflict |= self.reasons[other]
+                self.conflict = frozenset(conflict)
+                return False
+        return True
 
-            yield from self.solve(depth, new_ranges, new_fixed, new_consts, new_elim, new_already)
+    # Chooses the variable to branch on
+    def choose(self, unfixed):
+        """
+        Chooses the variable to branch on, by the variable heuristic of the domain.
 
-    def update_range(self, depth, ranges, fixed, consts, elims, already):
+        :param unfixed: list[str] (the variables that are not fixed, in the order of the domain)
+        :return: str
+        """
+        heuristic = self.strategy["variables"]
+        if heuristic == "dom" and self.random is None:
+            return min(unfixed, key=lambda k: len(self.ranges[k]))
+
+        scores = {}
+        for var in unfixed:
+            if heuristic == "dom":
+                scores[var] = (len(self.ranges[var]),)
+            else:
+                degree = 0
+                for index in self.watchers[var]:
+                    if any(other != var and other not in self.fixed for other in self.rules[index][2]):
+                        degree += self.weights[index] if heuristic == "domwdeg" else 1
+                if heuristic == "domwdeg":
+                    scores[var] = (len(self.ranges[var]) / max(degree, 1),)
+                else:
+                    scores[var] = (len(self.ranges[var]), -degree)
+        if self.random is not None:
+            return min(unfixed, key=lambda k: (scores[k], self.random.random()))
+        return min(unfixed, key=lambda k: scores[k])
+
+    # Orders the values of a variable
+    def options(self, var, unfixed):
         """
-        Updated the ranges based on the constraints, eliminations and fixed variables.
+        The values of a variable, in the order to try them, by the value heuristic of the domain.
 
-        :param depth: Counter
-        :param ranges: dict[str, set[str]]
-        :param fixed: dict[str, str]
-        :param consts: dict[str, set[str]]
-        :param elims: dict[str, set[str]]
-        :param already: set[str]
-        :return: bool
+        :param var: str
+        :param unfixed: list[str]
+        :return: list[str]
         """
+        order = self.domain.order.get(var, {})
+        options = sorted(self.ranges[var], key=lambda value: order.get(value, len(order)))
+        if self.random is not None:
+            self.random.shuffle(options)
+        if self.strategy["values"] != "lcv":
+            return options
+
+        # Least constraining value, the values that leave the most values to the other variables first
+        left = {}
+        for option in options:
+            mark = len(self.trail)
+            self.cause = frozenset((len(self.decisions) + 1,))
+            if self.narrow(var, {option}) and self.propagate():
+                left[option] = sum(len(self.ranges[other]) for other in unfixed if other != var)
+            else:
+                left[option] = -1
+            self.undo(mark)
+        return sorted(options, key=lambda option: -left[option])
 
-        if self.deleted:
-            return
+    # Revises queued rules until no rule is left to revise
+    def propagate(self):
+        """
+        Revises the queued rules.
 
-        for const in list(consts.keys()):
-            possible_sols = {}  # dictionary between variables and their solutions
-            new_set = set()  # to be : a set of all variables that appear in this const, and do not have an evaluation yet
+        :return: bool (False if a range was emptied or a rule failed)
+        """
+        while self.queue:
+            index = self.queue.popleft()
+            self.queued.discard(index)
+            if not self.revise(index):
+                self.weights[index] += 1
+                self.queue.clear()
+                self.queued.clear()
+                return False
+        return True
 
-            # Updating the constraint dictionary
-            for var in consts[const]:
-                if var not in fixed:
-                    possible_sols[var] = set()
-                    new_set.add(var)
+    # Revises a single rule
+    def revise(self, index):
+        """
+        Revises a rule: a constraint keeps only the values its solutions give to the variables that are not fixed (and
+        must hold once all of them are fixed), an elimination removes the values its solutions give to them, and a
+        global constraint narrows the ranges itself (see Constraints.py).
 
-            consts[const] = new_set
-            original_const = const
-            const = smart_replace(const, fixed)
+        :param index: int
+        :return: bool (False if a range was emptied or the rule failed)
+        """
+        kind, rule, variables, when = self.rules[index]
+        self.stats["propagations"] += 1
 
-            if const in already:
-                # already searched this constraint
-                continue
-            else:
-                already.add(const)
+        cause = set()
+        for var in self.scopes[index]:
+            cause |= self.reasons[var]
+        self.cause = frozenset(cause)
+        self.conflict = self.cause
 
-            # checking for when conditions
-            try:
-                if self.when[original_const] != "":
-                    sol_gen = self.interpreter.mixed_query(smart_replace(self.when[original_const], fixed), 0, depth, True)
-                    while next(sol_gen) in ["Print", "Request"]:
-                        pass
-            except StopIteration:
-                # for when
-                continue
-
-            if len(possible_sols) == 0:
-                try:
-                    sol_gen = self.interpreter.mixed_query(const, 0, depth, True)
-                    while next(sol_gen) in ["Print", "Request"]:
-                        pass
-                    del consts[original_const]
-                    continue
-                except StopIteration:
-                    return False
+        if when and not self.holds(smart_replace(when, self.fixed)):
+            return True
 
-            for sol in self.interpreter.mixed_query(const, 0, depth, True):
+        if kind == DomainSearch.GLOBAL:
+            return rule.revise(self)
 
-                if type(sol) != dict:
-                    continue
+        unfixed = [var for var in variables if var not in self.fixed]
+        rule = smart_replace(rule, self.fixed)
 
-                for var in possible_sols:
-                    if var in sol:
-                        possible_sols[var].add(sol[var])
+        if not unfixed:
+            return kind == DomainSearch.ELIM or self.holds(rule)
 
-            for var in possible_sols:
-                if any(match_type(possible_value) == "var" for possible_value in possible_sols[var]):
+        values = self.values(rule, unfixed)
+        for var in unfixed:
+            if kind == DomainSearch.CONST:
+                if any(match_type(value) == "var" for value in values[var]):
                     continue
-                ranges[var] = ranges[var].intersection(possible_sols[var])
-                if len(ranges[var]) == 0:
-                    # print(f"Exited due to {const}")
-                    return False
+                narrowed = self.ranges[var].intersection(values[var])
+            else:
+                narrowed = self.ranges[var].difference(values[var])
+            if not self.narrow(var, narrowed):
+                return False
+        return True
 
-        for elim in list(elims.keys()):
-            impossible_sols = {}
+    # Narrows the range of a variable
+    def narrow(self, var, narrowed):
+        """
+        Replaces the range of a variable with a narrower range, fixing the variable if a single value is left.
 
-            new_set = set()
+        :param var: str
+        :param narrowed: set[str]
+        :return: bool (False if the range is empty)
+        """
+        if len(narrowed) == len(self.ranges[var]):
+            return True
+        self.trail.append(("range", var, self.ranges[var], self.reasons[var]))
+        self.ranges[var] = narrowed
+        self.reasons[var] = self.reasons[var] | self.cause
+        if len(narrowed) == 0:
+            self.conflict = self.reasons[var]
+            return False
+        self.enqueue(self.narrowed[var])
+        if len(narrowed) == 1 and var not in self.fixed:
+            self.fix(var, next(iter(narrowed)))
+        return True
 
-            for var in elims[elim]:
-                if var in fixed:
-                    continue
-                impossible_sols[var] = set()
-                new_set.add(var)
+    # Fixes a variable
+    def fix(self, var, value):
+        """
+        Fixes a variable, and queues the rules that depend on it.
 
-            elims[elim] = new_set
+        :param var: str
+        :param value: str
+        :return: None
+        """
+        self.trail.append(("fixed", var))
+        self.fixed[var] = value
+        self.enqueue(self.watchers[var])
 
-            original_elim = elim
-            elim = smart_replace(elim, fixed)
+    # Queues rules to revise
+    def enqueue(self, indices):
+        """
+        Queues rules to revise (rules that are already queued are not queued twice).
+
+        :param indices: iterable[int]
+        :return: None
+        """
+        for index in indices:
+            if index not in self.queued:
+                self.queued.add(index)
+                self.queue.append(index)
 
-            if elim in already:
-                continue
+    # Undoes changes
+    def undo(self, mark):
+        """
+        Undoes the changes recorded on the trail after a mark.
+
+        :param mark: int (length of the trail at the mark)
+        :return: None
+        """
+        while len(self.trail) > mark:
+            change = self.trail.pop()
+            if change[0] == "range":
+                self.ranges[change[1]] = change[2]
+                self.reasons[change[1]] = change[3]
             else:
-                already.add(elim)
+                del self.fixed[change[1]]
 
-            try:
-                if self.when[original_elim] != "":
-                    next(self.interpreter.mixed_query(smart_replace(self.when[original_elim], fixed), 0, depth, True))
-            except StopIteration:
-                continue
+    # Whether a query has a solution
+    def holds(self, query):
+        """
+        Whether a query has a solution (searched once per search of the domain).
 
-            if len(impossible_sols) == 0:
-                continue
+        :param query: str
+        :return: bool
+        """
+        key = ("holds", query)
+        if key not in self.results:
+            self.results[key] = False
+            for sol in self.interpreter.mixed_query(query, 0, self.depth, True):
+                if sol in ["Print", "Request"]:
+                    continue
+                self.results[key] = True
+                break
+        return self.results[key]
+
+    # Values the solutions of a query give to variables
+    def values(self, query, variables):
+        """
+        The values the solutions of a query give to its variables (searched once per search of the domain).
 
-            for sol in self.interpreter.mixed_query(elim, 0, depth, True):
-                # print(f"Solution to {elim} is {sol}, with possible solutions {possible_sols}")
-                for var in impossible_sols:
+        :param query: str
+        :param variables: list[str]
+        :return: dict[str, set[str]]
+        """
+        key = ("values", query)
+        if key not in self.results:
+            values = {var: set() for var in variables}
+            for sol in self.interpreter.mixed_query(query, 0, self.depth, True):
+                if type(sol) != dict:
+                    continue
+                for var in variables:
                     if var in sol:
-                        impossible_sols[var].add(sol[var])
+                        values[var].add(sol[var])
+            self.results[key] = values
+        return self.results[key]
 
-            for var in impossible_sols:
-                ranges[var] = ranges[var].difference(impossible_sols[var])
-                if len(ranges[var]) == 0:
-                    return False
 
-        return True
+# Searches a subproblem of a parallel search
+def solve_subproblem(program, name, depth, ranges):
+    """
+    Searches a subproblem of a domain, in a process of a parallel search (see DomainSearch.parallel).
+
+    :param program: tuple (see Interpreter.program)
+    :param name: str (name of the domain)
+    :param depth: int
+    :param ranges: dict[str, set[str]]
+    :return: (list[dict], dict) (the solutions, and the statistics of the search)
+    """
+    domain = Parallel.interpreter_of(program).domains[name]
+
+    search = DomainSearch(domain, Counter(depth), ranges)
+    return list(search.solve()), search.stats
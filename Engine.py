@@ -0,0 +1,413 @@
+"""
+
+Engine
+
+Searches queries iteratively, with a stack of goals and a stack of choicepoints instead of nested generators (see
+Query.search), so the depth of the recursion of a program is not limited by the stack of python, and a solution found
+deep in a recursion is not passed up through a generator for every level.
+
+A state of the search is the goals left in the body of the current case (a linked list, (Query, rest)), the solution of
+the body so far, and the frame of the call: the translation back to the pattern of the call (the backward dictionary of
+Predicate.match) and the state of the caller to continue with. Ands are pushed to the goals, ors and the cases of
+predicates are choicepoints, and a body without goals left returns its solution, translated, to its caller.
+A call that is the last goal of a body does not keep the frame of the body (last call optimization): the translation of
+the body is composed with the translation of the call, so deterministic recursive predicates run in constant space.
+
+The search counts the bindings it holds for the budget of the query (Budget.py): the bindings of the solutions kept by
+the frames of a state, the most of the current state and of the states of the choicepoints (their frames are shared).
+They grow with the depth of the recursion, and go down on returning and backtracking.
+
+Only ands, ors, cuts and calls of predicates are searched here. Every other query (builtins, filters, packages,
+domains, tabled and python predicates, ...) is searched by Query.search, as a choicepoint of its solutions.
+
+"""
+
+import re
+
+import BuiltIns
+from Budget import Budget
+from Match import MatchDictionary
+from Query import Query
+from util import smart_replace, processHead, outString, ordered_variables
+
+VARIABLE = re.compile(r"\?[^?).,\]*({}^\">\s'!%&|$:/]+")  # A variable, as util.smart_replace reads it
+
+
+# Searches a query
+def solve(interpreter, query, depth):
+    """
+    Generates the solutions of a query, like Query.search.
+
+    :param interpreter: Interpreter
+    :param query: Query
+    :param depth: Counter
+    :return: generator[dict, "Print", "Request"]
+    """
+    state = ((query, None), Bindings(), None)  # goals, solution, frame (None if the search failed)
+    choicepoints = []  # [alternatives, next alternative, kind, goals, solution, frame, bindings held, call]
+    budget = depth if isinstance(depth, Budget) else None
+    step = None  # The step of the search being timed, while profiling (see Profiler.start)
+
+    while True:
+
+        if step is not None:
+            step = finish(step)
+        profiler = interpreter.profiler
+
+        # Backtracking, to the next alternative of the last choicepoint
+        if state is None:
+            if not choicepoints:
+                return
+            choicepoint = choicepoints[-1]
+            alternatives, alternative, kind, rest, sol, frame, _, call = choicepoint
+            if call is not None or frame is not None and frame[5] is not None:
+                redo(call, frame)
+            if profiler is not None:
+                step = profiler.start(call or (frame[5] if frame is not None else None))
+
+            if kind == "fail":
+                choicepoints.pop()
+                call.fail()
+                continue
+
+            if kind == "cases":
+                if depth.count < 0:
+                    choicepoints.pop()
+                    continue
+                choicepoint[1] = next(alternatives, None)
+                if choicepoint[1] is None:
+                    choicepoints.pop()  # The last matching case, there is nothing to backtrack to
+                search, backward, _ = alternative
+                if search == 1:
+                    if call is not None:
+                        call.exit()
+                    state = (rest, sol.extend(backward), frame)
+                    continue
+                if rest is None and frame is not None and call is None:
+                    frame = (compose(frame[0], sol, backward),) + frame[1:]
+                else:
+                    frame = (backward, rest, sol, frame, len(backward) + holding(sol, frame), call)
+                if budget is not None:
+                    budget.held = max(frame[4], choicepoints[-1][6]) if choicepoints else frame[4]
+                depth.sub(1)
+                state = ((search, None), Bindings(), frame)
+                continue
+
+            alternative = next(alternatives, None)
+            if alternative is None:
+                choicepoints.pop()
+            elif kind == "or":
+                state = ((alternative, rest), sol, frame)
+            elif alternative == "Print" or alternative == "Request":
+                if step is not None:
+                    step = finish(step)
+                yield alternative
+            else:
+                if call is not None:
+                    call.exit()
+                state = (rest, sol.extend(alternative), frame)
+            continue
+
+        goals, sol, frame = state
+        if profiler is not None and frame is not None:
+            step = profiler.start(frame[5])
+
+        # A body was solved
+        if goals is None:
+            if frame is None:
+                yield sol.solution()
+                state = None
+                continue
+            backward, goals, caller, frame, _, call = frame
+            if call is not None:
+                call.exit()
+            state = (goals, caller.extend(translate(backward, sol)), frame)
+            continue
+
+        if depth.count < 0:
+            state = None
+            continue
+
+        goal, rest = goals
+        if type(goal) is Cut:
+            del choicepoints[goal.choicepoints:]
+            state = (rest, sol, frame)
+            continue
+        goal = goal.add_new_info(sol)
+
+        if goal.type == "&" and goal.gateA and goal.gateB:
+            state = ((goal.gateA, (goal.gateB, rest)), sol, frame)
+            continue
+
+        if goal.type == "\\" and goal.gateA and goal.gateB:
+            state = ((goal.gateA, (Cut(len(choicepoints)), (goal.gateB, rest))), sol, frame)
+            continue
+
+        if goal.type == "|" and goal.gateA and goal.gateB:
+            held = holding(sol, frame, choicepoints)
+            choicepoints.append([iter((goal.gateB,)), None, "or", rest, sol, frame, held, None])
+            state = ((goal.gateA, rest), sol, frame)
+            continue
+
+        state = None
+        predicate = searched_predicate(interpreter, goal)
+        if predicate is None:
+            held = holding(sol, frame, choicepoints)
+            choicepoints.append([goal.search(depth), None, "solutions", rest, sol, frame, held, None])
+            continue
+
+        # While profiling, a choicepoint under the choicepoints of the call counts its fails
+        call = None
+        if profiler is not None:
+            call = profiler.call(predicate.name, frame[5] if frame is not None else None)
+            choicepoints.append([None, None, "fail", rest, sol, frame, holding(sol, frame, choicepoints), call])
+            if step is not None:
+                finish(step)
+            step = profiler.start(call)
+
+        query_pat = goal.gateA.partition("(")[2][:-1]
+        if predicate.native is not None:
+            solutions = predicate.native(interpreter, query_pat)
+            if solutions is not None:
+                held = holding(sol, frame, choicepoints)
+                choicepoints.append([iter(solutions), None, "solutions", rest, sol, frame, held, call])
+                continue
+
+        # The first matching case is taken by backtracking into the choicepoint
+        alternatives = predicate.match(query_pat)
+        alternative = next(alternatives, None)
+        if alternative is not None:
+            held = holding(sol, frame, choicepoints)
+            choicepoints.append([alternatives, alternative, "cases", rest, sol, frame, held, call])
+
+
+# Searches for another solution of calls, while profiling
+def redo(call, frame):
+    """
+    Counts the redos of the calls a choicepoint is in (its call, and the calls whose bodies it is in) that found a
+    solution since they were last searched. The callers of a call that did not find a solution did not find one either.
+
+    :param call: Call, None (the call of the choicepoint)
+    :param frame: tuple, None (the frame of the choicepoint)
+    :return: None
+    """
+    if call is not None:
+        if not call.exited:
+            return
+        call.redo()
+    while frame is not None and frame[5] is not None and frame[5].exited:
+        frame[5].redo()
+        frame = frame[3]
+
+
+# Ends a timed step of the search
+def finish(step):
+    """
+    :param step: list (see Profiler.start)
+    :return: None
+    """
+    step[3].profiler.finish(step)
+    return None
+
+
+# Bindings a state holds
+def holding(sol, frame, choicepoints=()):
+    """
+    :param sol: Bindings
+    :param frame: tuple, None
+    :param choicepoints: list (the choicepoints before the state, whose states are held with it)
+    :return: int (the bindings of the solution and of the frames of the callers, or of the choicepoints if more)
+    """
+    held = sol.size if frame is None else sol.size + frame[4]
+    return max(held, choicepoints[-1][6]) if choicepoints else held
+
+
+class Cut:
+    """
+    A goal after the left side of a cut (\\): once the left side has a solution, the choicepoints it left are dropped.
+    """
+
+    __slots__ = ("choicepoints",)
+
+    def __init__(self, choicepoints):
+        """
+        :param choicepoints: int (number of choicepoints before the left side)
+        """
+        self.choicepoints = choicepoints
+
+
+class Bindings:
+    """
+    The solution of a body so far: the solutions of its goals, as a chain from the last goal back to the first, so a
+    solution of a goal extends the solution of the body without copying it (the solution is shared by the
+    alternatives of the choicepoints after it). A variable is looked up in the chain, and its value is resolved (the
+    variables bound by later goals are replaced, like util.smartUpdate) when it is used, once.
+    """
+
+    __slots__ = ("bound", "parent", "empty", "size", "resolved")
+
+    def __init__(self, bound=None, parent=None):
+        """
+        :param bound: dict[str, str] (the solution of a goal), None
+        :param parent: Bindings, None (the solution of the goals before it)
+        """
+        self.bound = bound or {}
+        self.parent = parent
+        self.empty = not self.bound and (parent is None or parent.empty)
+        self.size = len(self.bound) if parent is None else len(self.bound) + parent.size  # Bindings in the chain
+        self.resolved = {}  # Values of variables that were resolved already
+
+    def extend(self, bound):
+        """
+        :param bound: dict[str, str] (the solution of the next goal)
+        :return: Bindings
+        """
+        return Bindings(bound, self) if bound else self
+
+    def get(self, var, default=None):
+        """
+        The value of a variable, with the variables bound after it replaced.
+
+        :param var: str
+        :param default: the value of an unbound variable
+        :return: str
+        """
+        if var in self.resolved:
+            return self.resolved[var]
+        node = self
+        while node is not None and var not in node.bound:
+            node = node.parent
+        if node is None:
+            return default
+        value = node.bound[var]
+        self.resolved[var] = var  # A variable bound to a value that contains it is not replaced in it
+        if "?" in value or "..." in self:
+            value = substitute(value, self)
+        self.resolved[var] = value
+        return value
+
+    def __getitem__(self, var):
+        value = self.get(var, None)
+        if value is None:
+            raise KeyError(var)
+        return value
+
+    def __contains__(self, var):
+        node = self
+        while node is not None:
+            if var in node.bound:
+                return True
+            node = node.parent
+        return False
+
+    def __bool__(self):
+        return not self.empty
+
+    def solution(self):
+        """
+        :return: dict[str, str] (every variable with its value, in the order they were bound)
+        """
+        chain = []
+        node = self
+        while node is not None:
+            chain.append(node.bound)
+            node = node.parent
+        variables = {}
+        for bound in reversed(chain):
+            variables.update(dict.fromkeys(bound))
+        return {var: self.get(var) for var in variables}
+
+
+# The predicate a query calls
+def searched_predicate(interpreter, goal):
+    """
+    The predicate whose cases are searched for a query, if it is a plain call of a predicate (not a query Query.search
+    answers itself, a builtin, a domain, a python predicate or a tabled predicate, without macros, and while not
+    tracing).
+
+    :param interpreter: Interpreter
+    :param goal: Query
+    :return: Predicate, None (if the query is searched by Query.search)
+    """
+    if goal.type != "r" or not goal.gateA or interpreter.trace_on or interpreter.console_trace_on:
+        return None
+
+    query_name, _, query_pat = goal.gateA.partition("(")
+    if not query_name or query_name[0] == "?" or "{" in query_name or outString(goal.gateA, ":") \
+            or query_name in Query.special:
+        return None
+    predicate = interpreter.predicates.get(query_name, None)
+    if predicate is None or predicate.tabled or query_name in interpreter.pythons or query_name in interpreter.domains:
+        return None
+    registered = BuiltIns.lookup_builtin(query_name)
+    if registered is not None and registered.enabled(interpreter):
+        return None
+    for mac in interpreter.macros:
+        if mac in query_pat:
+            return None
+    return predicate
+
+
+# Translates the solution of a body to the pattern of its call
+def translate(backward, solution):
+    """
+    Translates the solution of the body of a case back to the pattern of the call (see Query.alternative).
+
+    :param backward: dict[str, str] (see Predicate.match)
+    :param solution: Bindings
+    :return: dict[str, str]
+    """
+    translated = {}
+    for key, value in backward.items():
+        if value in solution:
+            translated[key] = solution[value]
+        else:
+            translated[key] = processHead(substitute(value, solution))
+    return translated
+
+
+# Translation of a body, through a call that is its last goal
+def compose(backward, solution, called):
+    """
+    Composes the translation of a body (of its solution so far) with the translation of a call that is the last goal of
+    the body, so the solution of the called case is translated straight to the caller of the body.
+    The variables of the body that are left unbound are renamed, so they are not confused with variables of the case.
+
+    :param backward: dict[str, str] (of the body)
+    :param solution: Bindings (of the body, before the call)
+    :param called: dict[str, str] (backward dictionary of the call)
+    :return: dict[str, str]
+    """
+    composed = {}
+    replaced = {}  # The variables of the body, replaced by the solution and then by the call
+    for key, value in backward.items():
+        variables = [var for var in VARIABLE.findall(value) if var in solution or var in called]
+        if not variables:
+            composed[key] = value
+            continue
+        for var in variables:
+            if var not in replaced:
+                replaced[var] = substitute(solution[var], called) if var in solution else called[var]
+        composed[key] = substitute(value, replaced)
+    unbound = [var for var in ordered_variables(",".join(composed.values())) if not var.startswith("?@")]
+    if not unbound:
+        return composed
+    renaming = {}
+    for var in unbound:
+        renaming[var] = f"?@{MatchDictionary.index}"
+        MatchDictionary.index += 1
+    return {key: substitute(value, renaming) for key, value in composed.items()}
+
+
+# Replaces variables
+def substitute(string, replace_dict):
+    """
+    util.smart_replace, with a regular expression for terms without strings (the terms of a deep recursion are long).
+
+    :param string: str
+    :param replace_dict: dict[str, str]
+    :return: str
+    """
+    if "\"" in string or "??" in string or "..." in replace_dict:
+        return smart_replace(string, replace_dict)
+    return VARIABLE.sub(lambda match: replace_dict.get(match.group(), match.group()), string)
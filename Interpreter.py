@@ -10,15 +10,21 @@ from typing import Dict
 
 from Domain import Domain
 from util import processParen, splitWithoutParen, smart_replace, \
-    Counter, processConnectClause, processSolutionDict, match_type
+    Counter, processConnectClause, processSolutionDict, match_type, solution_key
 from Match import MatchDictionary
+import copy
 import Lexer
+import os
 import sys
 from collections import deque
 import re
 from Predicate import Predicate
 from Package import Package
 from Query import Query
+from Table import Tables
+from Natives import natives
+import Parallel
+import Engine
 from Datatypes import Dataset, Datahash, AbstractDataStructure
 
 
@@ -55,6 +61,77 @@ class Interpreter:
         self.errorLoad = []
         self.messageLoad = []
 
+    # Reads an imported file
+    def readModule(self, path, name):
+        """
+        Reads an imported file (a library or a file of the user), and registers it as imported.
+
+        :param path: str
+        :param name: str (the name it was imported by)
+        :return: bool (False if it could not be read)
+        """
+        self.modules[path] = name
+        try:
+            with open(path, "r") as f:
+                data = f.read()
+        except OSError:
+            self.raiseError(f"Error: Missing import {path}")
+            return False
+
+        lexer = Lexer.build()
+        lexer.input(data)
+        new_tokens = []
+        while True:
+            tok = lexer.token()
+            if not tok:
+                break  # No more input
+            new_tokens.append(tok)
+
+        if len(Lexer.SyntaxErrors) != 0:
+            self.raiseError(Lexer.SyntaxErrors[0])
+            Lexer.SyntaxErrors = []
+            return False
+
+        self.read(new_tokens, imported=True)
+
+        # Library predicates with native implementations
+        if name in self.imports:
+            for p_name, native in natives.get(name, {}).items():
+                if p_name in self.predicates:
+                    self.predicates[p_name].native = native
+        return True
+
+    # Reads imported files again
+    def reload(self, name="ALL"):
+        """
+        Reads imported files again (after they were changed), replacing the predicates they define.
+        Files they import are not read again, unless all the imported files are reloaded.
+
+        :param name: str (the name a file was imported by, the name of the file without its extension, or ALL)
+        :return: bool (False if nothing was imported by the name, or a file could not be read)
+        """
+        paths = [path for path, imported in self.modules.items()
+                 if name in ("ALL", imported, os.path.splitext(os.path.basename(path))[0])]
+        if not paths:
+            return False
+        self.tables.clear()
+        self.changed = True
+        return all([self.readModule(path, self.modules[path]) for path in paths])
+
+    # Clears the state of queries
+    def clearState(self):
+        """
+        Clears the state a query leaves behind (references, memory and open files).
+
+        :return: None
+        """
+        self.references = {}
+        self.memory = []
+
+        for file in self.files.values():
+            file.close()
+        self.files = {}
+
     # Empty Interpreter
     def __init__(self, time_limit, imports, path=None, update_delete=True):
         """
@@ -108,6 +185,8 @@ class Interpreter:
 
         self.domains = {}
 
+        self.tables = Tables(self)  # Answer tables of tabled predicates
+
         self.memory = []
         self.references = {}
 
@@ -125,6 +204,13 @@ class Interpreter:
         self.filepath = None  # for imports and such
 
         self.console_trace_on = False
+        self.profiler = None  # Profiler of the searches while profiling (see Profile, in Inspect Library)
+        self.profiled = None  # Profiler of the last profiling, after it stopped
+
+        self.sources = []  # Tokens (type, value) of every program read, to rebuild the interpreter (see program)
+        self.workers = 1  # Processes of or-parallel searches for all the solutions of a query (see all_solutions)
+        self.changed = False  # Whether queries changed the predicates since they were read (see rebuildable)
+        self.modules = {}  # Imported files, path -> the name they were imported by (in order of import)
 
     def setFilePath(self, path):
         """
@@ -135,6 +221,69 @@ class Interpreter:
         """
         self.filepath = path
 
+    # Copy of the interpreter
+    def clone(self):
+        """
+        An independent copy of the interpreter, so queries searched by the copy (references, memory, datasets, saved
+        values, changes to the predicates) leave this interpreter as it was. Open files are not copied, and python
+        predicates are shared. The predicates share their clauses and indexes with the copy until either changes them,
+        and complete answer tables are shared, so copying does not grow with the number of clauses.
+
+        :return: Interpreter
+        """
+        memo = {id(self.files): {}, id(self.pythons): self.pythons}
+        forks = [predicate.fork(None) for predicate in self.predicates.values()]
+        for predicate, forked in zip(self.predicates.values(), forks):
+            memo[id(predicate)] = forked
+        tables = memo[id(self.tables)] = self.tables.fork(None)
+        copied = copy.deepcopy(self, memo)
+        for forked in forks:
+            forked.interpreter = copied
+        tables.interpreter = copied
+        return copied
+
+    # The loaded program
+    def program(self):
+        """
+        Everything needed to rebuild the interpreter in another process: the settings of the interpreter and the tokens
+        of the programs it read. Changes made to the predicates by queries (Dynamic library, assert) are not included.
+
+        :return: tuple
+        """
+        return self.time_limit, tuple(self.imports), self.path, self.filepath, tuple(self.sources)
+
+    # Whether other processes can rebuild the interpreter
+    def rebuildable(self):
+        """
+        Whether the interpreter can be rebuilt in another process from its program (see program), for parallel searches.
+        Once queries changed the predicates (Dynamic library, Reload), the rebuilt interpreter would not have the changes,
+        so searches are not parallel anymore.
+
+        :return: bool
+        """
+        return bool(self.sources) and not self.changed and not Parallel.in_worker
+
+    # Rebuilding an interpreter
+    @staticmethod
+    def rebuild(program):
+        """
+        A new interpreter that read the same programs as another (see program).
+
+        :param program: tuple
+        :return: Interpreter
+        """
+        time_limit, imports, path, filepath, sources = program
+        interpreter = Interpreter(time_limit, list(imports), path=path)
+        interpreter.setFilePath(filepath)
+        for source in sources:
+            tokens = []
+            for kind, value in source:
+                token = Lexer.lex.LexToken()
+                token.type, token.value, token.lineno, token.lexpos = kind, value, 0, 0
+                tokens.append(token)
+            interpreter.read(tokens)
+        return interpreter
+
     # For building connect predicates
     @staticmethod
     def buildThen(string: str):
@@ -225,16 +374,23 @@ class Interpreter:
         return "&".join(processed_parts)
 
     # Reading tokens and creating predicates (main compiling)
-    def read(self, tokens):
+    def read(self, tokens, imported=False):
         """
         Reads tokens handed from the Lexer and creates predicates, titles, infixes, packages and imports based on the tokens inputted.
 
         :param tokens: List of tokens
+        :param imported: bool (tokens of an imported file, which are read again by its import)
         :return: None
         """
 
+        if not imported:
+            self.sources.append(tuple((token.type, token.value) for token in tokens))
+
+        # New rules can add answers to calls that were already tabled
+        self.tables.clear()
+
         # starting tokens : ('PACKAGE', 'IMP', 'SET', 'EXTEND', 'USE', 'CONNECT', 'DOMAIN')
-        properties = ('recursive', 'generative', 'random')
+        properties = ('recursive', 'generative', 'random', 'tabled')
         line = 1
 
         # Sub
@@ -245,6 +401,7 @@ class Interpreter:
         new_package = None
         package_rand = False
         package_recursive = False
+        package_tabled = False
         package_name = ''
         package_param = ''
         package_case = ''
@@ -265,6 +422,7 @@ class Interpreter:
         predicate_name = ''
         predicate_rand = False
         predicate_recursive = False
+        predicate_tabled = False
         predicate_case = ''
         predicate_then = ''
 
@@ -280,6 +438,9 @@ class Interpreter:
         new_domain = None
         domain_name = ""
 
+        domain_moved_to_strategy = False
+        domain_strategy = ""
+
         domain_entered_vars = False
         domain_variables = ""
 
@@ -529,6 +690,9 @@ class Interpreter:
                     new_domain = None
                     domain_name = ""
 
+                    domain_moved_to_strategy = False
+                    domain_strategy = ""
+
                     domain_entered_vars = False
                     domain_variables = ""
 
@@ -558,7 +722,7 @@ class Interpreter:
                         return
 
                     if new_package is None:
-                        new_package = Package(self, package_name, package_param, package_recursive, package_rand)
+                        new_package = Package(self, package_name, package_param, package_recursive, package_rand, package_tabled)
 
                     if package_case != "" or moved_to_cases_pack:
                         if package_then == "":
@@ -574,6 +738,7 @@ class Interpreter:
                     in_pack = False
                     new_package = None
                     package_rand = False
+                    package_tabled = False
                     package_recursive = False
                     package_name = ''
                     package_param = ''
@@ -596,7 +761,7 @@ class Interpreter:
                         return
 
                     if new_predicate is None:
-                        new_predicate = Predicate(self, predicate_name, predicate_recursive, predicate_rand)
+                        new_predicate = Predicate(self, predicate_name, predicate_recursive, predicate_rand, predicate_tabled)
                         predicate_case = ""
 
                     if predicate_case != "" or moved_to_cases_predicate:
@@ -615,6 +780,7 @@ class Interpreter:
                     predicate_name = ''
                     predicate_rand = False
                     predicate_recursive = False
+                    predicate_tabled = False
                     predicate_case = ''
                     predicate_then = ''
 
@@ -825,38 +991,30 @@ class Interpreter:
                         self.filestream_added = True
                     if imp_name == 'Reference':
                         self.ref_added = True
-                    import_name = self.path + f"\\Imports\\{imp_name}.LCL"
-                    import_name_2 = ""
+                    import_name = os.path.join(self.path, "Imports", f"{imp_name}.LCL")
+                    import_names = [import_name, os.path.join(self.path, "Imports", f"{imp_name}.lcl")]
                 else:
                     if token.type != "FILENAME":
                         self.raiseError(f"Error: Imports must begin with '@', in line {line}")
                         return
                     import_name = f"{imp_name}.LCL"
-                    import_name_2 = self.filepath + "/" + f"{imp_name}.LCL"
-                lexer = Lexer.build()
-                try:
-                    f = open(import_name, "r")
-                except FileNotFoundError:
-                    try:
-                        f = open(import_name_2, "r")
-                    except FileNotFoundError:
-                        self.raiseError(f"Error: Missing import {import_name}, in line {line}")
-                        return
-                lexer.input(f.read())
-                new_tokens = []
-                while True:
-                    tok = lexer.token()
-                    if not tok:
-                        break  # No more input
-                    new_tokens.append(tok)
-
-                if len(Lexer.SyntaxErrors) != 0:
-                    self.raiseError(Lexer.SyntaxErrors[0])
-                    Lexer.SyntaxErrors = []
+                    import_names = [import_name, f"{imp_name}.lcl",
+                                    os.path.join(self.filepath or "", f"{imp_name}.LCL"),
+                                    os.path.join(self.filepath or "", f"{imp_name}.lcl")]
+
+                for import_path in import_names:
+                    if os.path.isfile(import_path):
+                        break
+                else:
+                    self.raiseError(f"Error: Missing import {import_name}, in line {line}")
                     return
 
-                self.read(new_tokens)
-                f.close()
+                # Every file is imported once, importing it again does nothing (see reload)
+                import_path = os.path.abspath(import_path)
+                if import_path in self.modules:
+                    continue
+                if not self.readModule(import_path, imp_name):
+                    return
 
             elif in_ext:
                 if ext_predicate_name == "":
@@ -926,6 +1084,8 @@ class Interpreter:
                         package_recursive = True
                     if token.value == 'random':
                         package_rand = True
+                    if token.value == 'tabled':
+                        package_tabled = True
                     closed_pack_prop = True
                 elif closed_pack_prop and token.type == 'COMMA' and not moved_to_cases_pack:
                     if opened_predicate_prop_second:
@@ -939,11 +1099,13 @@ class Interpreter:
                         package_recursive = True
                     if token.value == 'random':
                         package_rand = True
+                    if token.value == 'tabled':
+                        package_tabled = True
                     closed_pack_prop_second = True
 
                 elif token.type == 'CASE':
                     if not moved_to_cases_pack:
-                        new_package = Package(self, package_name, package_param, package_recursive, package_rand)
+                        new_package = Package(self, package_name, package_param, package_recursive, package_rand, package_tabled)
                     moved_to_cases_pack = True
 
                     if package_case != "":
@@ -991,6 +1153,8 @@ class Interpreter:
                         predicate_recursive = True
                     if token.value == 'random':
                         predicate_rand = True
+                    if token.value == 'tabled':
+                        predicate_tabled = True
                     closed_predicate_prop = True
                 elif closed_predicate_prop and token.type == 'COMMA' and not moved_to_cases_predicate:
                     if opened_predicate_prop_second:
@@ -1005,10 +1169,12 @@ class Interpreter:
                         predicate_recursive = True
                     if token.value == 'random':
                         predicate_rand = True
+                    if token.value == 'tabled':
+                        predicate_tabled = True
                     closed_predicate_prop_second = True
                 elif token.type == 'CASE':
                     if not moved_to_cases_predicate:
-                        new_predicate = Predicate(self, predicate_name, predicate_recursive, predicate_rand)
+                        new_predicate = Predicate(self, predicate_name, predicate_recursive, predicate_rand, predicate_tabled)
                     moved_to_cases_predicate = True
 
                     if predicate_case != "":
@@ -1167,6 +1333,12 @@ class Interpreter:
                     domain_name = token.value
                     new_domain = Domain(self, domain_name)
 
+                elif token.type == "AS" and not domain_entered_vars and not domain_strategy and not new_domain.variables:
+                    domain_moved_to_strategy = True
+
+                elif domain_moved_to_strategy and token.type != "OVER":
+                    domain_strategy += token.value
+
                 elif token.type == "OF":
                     domain_moved_to_search = False
                     domain_new_range = True
@@ -1198,6 +1370,10 @@ class Interpreter:
                     if domain_entered_vars:
                         self.raiseError(f"Error: Domain variables defines twice, in line {line}")
                         return
+                    if domain_moved_to_strategy:
+                        domain_moved_to_strategy = False
+                        if not new_domain.insert_strategy(domain_strategy, line):
+                            return
                     domain_entered_vars = True
 
                 elif token.type == "WHEN":
@@ -1408,7 +1584,7 @@ class Interpreter:
         return ",".join(final)
 
     # For inputting queries
-    def mixed_query(self, query, type_query, recursion_limit, unP=False):
+    def mixed_query(self, query, type_query, recursion_limit, unP=False, unique=True):
         """
         Searches for queries. Creates a query, searches for it, keeps track of already sent solutions and process the final solution from
         dictionary form to string form.
@@ -1417,27 +1593,23 @@ class Interpreter:
         :param type_query: int (0-regular, 1-assertive)
         :param recursion_limit: int
         :param unP: boolean (unprocessed solutions)
+        :param unique: boolean (False streams every solution, repeated solutions included, without keeping track of them)
         :return: None
         """
 
         if not unP and not self.save_added:
-            self.references = {}
-            self.memory = []
-
-            for file in self.files.values():
-                file.close()
-            self.files = {}
+            self.clearState()
 
-        original_recursion_limit = recursion_limit
         self.newline = False
         MatchDictionary.reset()
         Q = Query.create(self, query)
         if not Q:
             return
-        sent_solutions = []
-        if type(recursion_limit) is not Counter:
+        sent_solutions = set()  # Keys of the sent solutions (see solution_key)
+        if not isinstance(recursion_limit, Counter):
             recursion_limit = Counter(recursion_limit)
-        for solution in Q.search(recursion_limit):
+        original_recursion_limit = recursion_limit.count
+        for solution in Engine.solve(self, Q, recursion_limit):
             if solution == "Request":
                 yield "Request"
                 continue
@@ -1456,9 +1628,11 @@ class Interpreter:
                 if not flag:
                     continue
 
-            if solution in sent_solutions:
-                continue
-            sent_solutions.append(solution)
+            if unique:
+                key = solution_key(solution)
+                if key in sent_solutions:
+                    continue
+                sent_solutions.add(key)
             if unP:
                 yield solution
             else:
@@ -1467,3 +1641,19 @@ class Interpreter:
                 recursion_limit.count = original_recursion_limit
 
         # print(self.memory, "\n", self.references)
+
+    # All the solutions of a query
+    def all_solutions(self, query, recursion_limit):
+        """
+        Searches for all the solutions of a query (unprocessed, like mixed_query with unP). With more than one worker
+        (see self.workers) the alternatives of the query are searched in a pool of processes (see Parallel.search), and
+        the solutions are generated in the order they are found.
+
+        :param query: str
+        :param recursion_limit: int
+        :return: generator[dict, "Print", "Request"]
+        """
+        if self.workers > 1 and self.rebuildable():
+            yield from Parallel.search(self, query, recursion_limit, self.workers)
+        else:
+            yield from self.mixed_query(query, 0, recursion_limit, True)
@@ -8,8 +8,9 @@ Class that matches two patterns, a query pattern and a case pattern
 
 import functools
 
-from util import match_type, smart_replace, splitWithoutParen, processParen, \
-    lookup, get_all_basics, processHead, var_in_query
+from util import match_type, smart_replace, splitWithoutParen, \
+    get_all_basics, processHead, var_in_query, ordered_variables
+from Term import pattern, Sequence, Var, ANONYMOUS
 
 
 # Class used to match two patterns
@@ -52,19 +53,21 @@ class MatchDictionary:
         self.inside = {}
         self.wiggle_room = False  # checks if the matching is essential, i.e. whether it can be avoided
         self.interpreter = interp
+        self.infixes = tuple(interp.infixes) if interp is not None else ()
 
     @classmethod
-    def match(cls, interp, patternA: str, patternB: str):
+    def match(cls, interp, patternA, patternB):
         """
         Matches two patterns
 
         :param interp: Interpreter
-        :param patternA: str
-        :param patternB: str
+        :param patternA: str, Sequence (a pattern already parsed by Term.pattern)
+        :param patternB: str, Sequence
         :return: (forward:dict, backward:dict, bool)
         """
 
-        if patternB == "...":
+        if patternB == "..." or (type(patternB) is Sequence and patternB.text == "..."):
+            patternA = str(patternA)
             forward = {"...": f"[{patternA}]"}
             backward = functools.reduce(lambda a, b: a.update(b) or a,
                                         [{d: d for d in get_all_basics(comp) if match_type(d) == "var"} for comp in splitWithoutParen(patternA)],
@@ -72,6 +75,13 @@ class MatchDictionary:
             return forward, backward, False
 
         MD = MatchDictionary(interp)
+        try:
+            if type(patternA) is not Sequence:
+                patternA = pattern(patternA, MD.infixes)
+            if type(patternB) is not Sequence:
+                patternB = pattern(patternB, MD.infixes)
+        except TypeError:
+            return False
         matched = MD.outside_push(patternA, patternB)
         if not matched:
             return False
@@ -79,11 +89,8 @@ class MatchDictionary:
         return MD.forward, MD.backward, MD.wiggle_room
 
     def outside_push(self, patternA, patternB):
-        try:
-            comps_A = splitWithoutParen(patternA)
-            comps_B = splitWithoutParen(patternB)
-        except TypeError:
-            return False
+        comps_A = patternA.args
+        comps_B = patternB.args
 
         if len(comps_A) != len(comps_B):
             return False
@@ -99,65 +106,43 @@ class MatchDictionary:
 
     def o_single_push(self, compA, compB):
 
-        compA = processParen(compA)
-        compB = processParen(compB)
-
-        if compB == "_":
-            compB = f"?@{MatchDictionary.index}"
+        if compB is ANONYMOUS:
+            compB = Var(f"?@{MatchDictionary.index}")
             MatchDictionary.index += 1
-        if compA == "_":
-            compA = f"?@{MatchDictionary.index}"
+        if compA is ANONYMOUS:
+            compA = Var(f"?@{MatchDictionary.index}")
             MatchDictionary.index += 1
 
-        if not compA or not compB:
-            return
-
-        if any(map(lambda infx: infx in compA, self.interpreter.infixes)):
-            compA = lookup(compA, self.interpreter.infixes)
-        if any(map(lambda infx: infx in compB, self.interpreter.infixes)):
-            compB = lookup(compB, self.interpreter.infixes)
-
-        if not compA or not compB:
+        if compA is None or compB is None:
             return False
 
-        typeA = match_type(compA)
-        typeB = match_type(compB)
+        typeA = compA.kind
+        typeB = compB.kind
 
         # print(compA, typeA, compB, typeB)
 
-        if typeA in ['list', 'head']:
-            compA = processHead(compA)
-            if not compA:
-                return False
-            typeA = match_type(compA)
-        if typeB in ['list', 'head']:
-            compB = processHead(compB)
-            if not compB:
-                return False
-            typeB = match_type(compB)
-
         if typeA == 'constant' and typeB == 'constant':
-            return compA == compB
+            return compA.symbol is compB.symbol
 
         # var with var & var with constant
         if typeA == 'var' and typeB == 'var':
-            return self.o_var_with_var(compA, compB)
+            return self.o_var_with_var(compA.text, compB.text)
         if typeA == 'var' and typeB == 'constant':
-            return self.o_var_with_const(compA, compB)
+            return self.o_var_with_const(compA.text, compB.text)
         if typeA == 'constant' and typeB == 'var':
-            return self.o_const_with_var(compA, compB)
+            return self.o_const_with_var(compA.text, compB.text)
 
         # Lists with vars
         if typeA == 'list' and typeB == 'var':
-            return self.o_list_with_var(compA, compB)
+            return self.o_list_with_var(str(compA), compB.text)
         if typeA == 'var' and typeB == 'list':
-            return self.o_var_with_list(compA, compB)
+            return self.o_var_with_list(compA.text, str(compB))
 
         # Appended lists with vars
         if typeA == 'head' and typeB == 'var':
-            return self.o_head_with_var(compA, compB)
+            return self.o_head_with_var(compA.text, compB.text)
         if typeA == 'var' and typeB == 'head':
-            return self.o_var_with_head(compA, compB)
+            return self.o_var_with_head(compA.text, compB.text)
 
         # lists with lists, lists with appended lists.
         if typeA == 'list' and typeB == 'list':
@@ -173,25 +158,25 @@ class MatchDictionary:
         if typeA == 'title' and typeB == 'title':
             return self.o_title_with_title(compA, compB)
         if typeA == 'var' and typeB == 'title':
-            return self.o_var_with_title(compA, compB)
+            return self.o_var_with_title(compA.text, compB.text)
         if typeA == 'title' and typeB == 'var':
-            return self.o_title_with_var(compA, compB)
+            return self.o_title_with_var(compA.text, compB.text)
 
         # Packages match
         if typeA == 'pack' and typeB == 'pack':
             return self.o_pack_with_pack(compA, compB)
         if typeA == 'pack' and typeB == 'var':
-            return self.o_pack_with_var(compA, compB)
+            return self.o_pack_with_var(compA.text, compB.text)
         if typeA == 'var' and typeB == 'pack':
-            return self.o_var_with_pack(compA, compB)
+            return self.o_var_with_pack(compA.text, compB.text)
 
         # Pair Match
         if typeA == "pair" and typeB == "pair":
             return self.o_pair_with_pair(compA, compB)
         if typeA == "pair" and typeB == "var":
-            return self.o_pair_with_var(compA, compB)
+            return self.o_pair_with_var(compA.text, compB.text)
         if typeA == "var" and typeB == "pair":
-            return self.o_var_with_pair(compA, compB)
+            return self.o_var_with_pair(compA.text, compB.text)
 
         return False
 
@@ -243,7 +228,7 @@ class MatchDictionary:
             return True
 
     def o_list_with_list(self, q_list, c_list):
-        return self.outside_push(q_list[1:-1], c_list[1:-1])
+        return self.outside_push(q_list, c_list)
 
     def o_var_with_list(self, q_var, c_list):
 
@@ -253,14 +238,7 @@ class MatchDictionary:
             q_to = self.backward[q_var]
             c_basics = get_all_basics(c_list)
             c_trans = MatchDictionary.transform(c_list, c_basics, self.forward)
-            matched = self.i_single_push(q_to, c_trans)
-            if not matched:
-                return False
-            self.backward[q_var] = smart_replace(self.backward[q_var], self.inside)
-            for b in c_basics:
-                if match_type(b) == 'var' and self.forward[b] in self.inside.keys():
-                    self.forward[b] = self.inside[self.forward[b]]
-            return True
+            return self.i_single_push(q_to, c_trans)
 
         else:
             c_basics = get_all_basics(c_list)
@@ -274,14 +252,7 @@ class MatchDictionary:
             c_to = self.forward[c_var]
             q_basics = get_all_basics(q_list)
             q_trans = MatchDictionary.transform(q_list, q_basics, self.backward)
-            matched = self.i_single_push(c_to, q_trans)
-            if not matched:
-                return False
-            self.forward[c_var] = smart_replace(self.forward[c_var], self.inside)
-            for b in q_basics:
-                if match_type(b) == 'var' and self.backward[b] in self.inside.keys():
-                    self.backward[b] = self.inside[self.backward[b]]
-            return True
+            return self.i_single_push(c_to, q_trans)
 
         else:
             q_basics = get_all_basics(q_list)
@@ -290,10 +261,10 @@ class MatchDictionary:
             return True
 
     def o_head_with_head(self, q_head, c_head):
-        q_comps = splitWithoutParen(q_head[1:-1], "*")
-        c_comps = splitWithoutParen(c_head[1:-1], "*")
-        if len(q_comps) != 2 or len(c_comps) != 2:
+        if len(q_head.parts) != 2 or len(c_head.parts) != 2:
             return False
+        q_comps = q_head.args
+        c_comps = c_head.args
         return self.o_single_push(q_comps[0], c_comps[0]) and self.o_single_push(q_comps[1], c_comps[1])
 
     def o_var_with_head(self, q_var, c_head):
@@ -304,14 +275,7 @@ class MatchDictionary:
             q_to = self.backward[q_var]
             c_basics = get_all_basics(c_head, "*")
             c_trans = MatchDictionary.transform(c_head, c_basics, self.forward)
-            matched = self.i_single_push(q_to, c_trans)
-            if not matched:
-                return False
-            self.backward[q_var] = smart_replace(self.backward[q_var], self.inside)
-            for b in c_basics:
-                if self.forward[b] in self.inside.keys():
-                    self.forward[b] = self.inside[self.forward[b]]
-            return True
+            return self.i_single_push(q_to, c_trans)
 
         else:
             c_basics = get_all_basics(c_head, "*")
@@ -324,14 +288,7 @@ class MatchDictionary:
             c_to = self.forward[c_var]
             q_basics = get_all_basics(q_head, "*")
             q_trans = MatchDictionary.transform(q_head, q_basics, self.backward)
-            matched = self.i_single_push(c_to, q_trans)
-            if not matched:
-                return False
-            self.forward[c_var] = smart_replace(self.forward[c_var], self.inside)
-            for b in q_basics:
-                if match_type(b) == "var" and self.backward[b] in self.inside.keys():
-                    self.backward[b] = self.inside[self.backward[b]]
-            return True
+            return self.i_single_push(c_to, q_trans)
 
         else:
             q_basics = get_all_basics(q_head, "*")
@@ -340,39 +297,31 @@ class MatchDictionary:
             return True
 
     def o_list_with_head(self, q_list, c_head):
-        if q_list == "[]":
+        if len(q_list) == 0:
             return False
-        q_comps = splitWithoutParen(q_list[1:-1])
-        c_comps = splitWithoutParen(c_head[1:-1], "*")
-        if len(c_comps) != 2:
+        if len(c_head.parts) != 2:
             return False
+        c_comps = c_head.args
 
-        return self.o_single_push(q_comps[0], c_comps[0]) and self.o_single_push("[" + ",".join(q_comps[1:]) + "]", c_comps[1])
+        return self.o_single_push(q_list.first(), c_comps[0]) and self.o_single_push(q_list.rest(), c_comps[1])
 
     def o_head_with_list(self, q_head, c_list):
 
         self.wiggle_room = True
 
-        if c_list == "[]":
+        if len(c_list) == 0:
             return False
-        q_comps = splitWithoutParen(q_head[1:-1], "*")
-        c_comps = splitWithoutParen(c_list[1:-1])
-        if len(q_comps) != 2:
+        if len(q_head.parts) != 2:
             return False
-        return self.o_single_push(q_comps[0], c_comps[0]) and self.o_single_push(q_comps[1], "[" + ",".join(c_comps[1:]) + "]")
+        q_comps = q_head.args
+        return self.o_single_push(q_comps[0], c_list.first()) and self.o_single_push(q_comps[1], c_list.rest())
 
     def o_title_with_title(self, q_title, c_title):
 
-        q_name, _, q_pat = q_title.partition("(")
-        q_pat = q_pat[:-1]
-
-        c_name, _, c_pat = c_title.partition("(")
-        c_pat = c_pat[:-1]
-
-        if q_name != c_name:
+        if q_title.functor is not c_title.functor:
             return False
 
-        return self.outside_push(q_pat, c_pat)
+        return self.outside_push(q_title, c_title)
 
     def o_var_with_title(self, q_var, c_title):
 
@@ -384,13 +333,7 @@ class MatchDictionary:
             q_to = self.backward[q_var]
             c_basics = get_all_basics(c_title)
             c_trans = MatchDictionary.transform(c_title, c_basics, self.forward)
-            matched = self.i_single_push(q_to, c_trans)
-            if not matched:
-                return False
-            for b in c_basics:
-                if match_type(b) == 'var' and self.forward[b] in self.inside.keys():
-                    self.forward[b] = self.inside[self.forward[b]]
-            return True
+            return self.i_single_push(q_to, c_trans)
         else:
             c_basics = get_all_basics(c_title)
             c_trans = MatchDictionary.transform(c_title, c_basics, self.forward)
@@ -405,14 +348,7 @@ class MatchDictionary:
             c_to = self.forward[c_var]
             q_basics = get_all_basics(q_title)
             q_trans = MatchDictionary.transform(q_title, q_basics, self.backward)
-            matched = self.i_single_push(c_to, q_trans)
-            if not matched:
-                return False
-            self.forward[c_var] = smart_replace(self.forward[c_var], self.inside)
-            for b in q_basics:
-                if match_type(b) == 'var' and self.backward[b] in self.inside.keys():
-                    self.backward[b] = self.inside[self.backward[b]]
-            return True
+            return self.i_single_push(c_to, q_trans)
 
         else:
             q_basics = get_all_basics(q_title)
@@ -421,15 +357,11 @@ class MatchDictionary:
             return True
 
     def o_pack_with_pack(self, q_pack, c_pack):
-        q_name, _, q_pat = q_pack.partition("{")
-        q_pat = q_pat[:-1]
-        c_name, _, c_pat = c_pack.partition("{")
-        c_pat = c_pat[:-1]
 
-        if q_name != c_name or q_name not in self.interpreter.packages:
+        if q_pack.functor is not c_pack.functor or q_pack.name not in self.interpreter.packages:
             return False
 
-        return self.outside_push(q_pat, c_pat)
+        return self.outside_push(q_pack, c_pack)
 
     def o_var_with_pack(self, q_var, c_pack):
 
@@ -442,13 +374,7 @@ class MatchDictionary:
             q_to = self.backward[q_var]
             c_basics = get_all_basics(c_pack)
             c_trans = MatchDictionary.transform(c_pack, c_basics, self.forward)
-            matched = self.i_single_push(q_to, c_trans)
-            if not matched:
-                return False
-            for b in c_basics:
-                if match_type(b) == 'var' and self.forward[b] in self.inside.keys():
-                    self.forward[b] = self.inside[self.forward[b]]
-            return True
+            return self.i_single_push(q_to, c_trans)
         else:
             c_basics = get_all_basics(c_pack)
             c_trans = MatchDictionary.transform(c_pack, c_basics, self.forward)
@@ -466,14 +392,7 @@ class MatchDictionary:
             c_to = self.forward[c_var]
             q_basics = get_all_basics(q_pack)
             q_trans = MatchDictionary.transform(q_pack, q_basics, self.backward)
-            matched = self.i_single_push(c_to, q_trans)
-            if not matched:
-                return False
-            self.forward[c_var] = smart_replace(self.forward[c_var], self.inside)
-            for b in q_basics:
-                if match_type(b) == 'var' and self.backward[b] in self.inside.keys():
-                    self.backward[b] = self.inside[self.backward[b]]
-            return True
+            return self.i_single_push(c_to, q_trans)
 
         else:
             q_basics = get_all_basics(q_pack)
@@ -482,8 +401,8 @@ class MatchDictionary:
             return True
 
     def o_pair_with_pair(self, q_pair, c_pair):
-        q_first, q_second = splitWithoutParen(q_pair[1:-1], "/")
-        c_first, c_second = splitWithoutParen(c_pair[1:-1], "/")
+        q_first, q_second = q_pair.args
+        c_first, c_second = c_pair.args
         return self.o_single_push(q_first, c_first) and self.o_single_push(q_second, c_second)
 
     def o_pair_with_var(self, q_pair, c_var):
@@ -491,14 +410,7 @@ class MatchDictionary:
             c_to = self.forward[c_var]
             q_basics = get_all_basics(q_pair, "/")
             q_trans = MatchDictionary.transform(q_pair, q_basics, self.backward)
-            matched = self.i_single_push(c_to, q_trans)
-            if not matched:
-                return False
-            self.forward[c_var] = smart_replace(self.forward[c_var], self.inside)
-            for b in q_basics:
-                if match_type(b) == "var" and self.backward[b] in self.inside.keys():
-                    self.backward[b] = self.inside[self.backward[b]]
-            return True
+            return self.i_single_push(c_to, q_trans)
 
         else:
             q_basics = get_all_basics(q_pair, "/")
@@ -514,14 +426,7 @@ class MatchDictionary:
             q_to = self.backward[q_var]
             c_basics = get_all_basics(c_pair, "/")
             c_trans = MatchDictionary.transform(c_pair, c_basics, self.forward)
-            matched = self.i_single_push(q_to, c_trans)
-            if not matched:
-                return False
-            self.backward[q_var] = smart_replace(self.backward[q_var], self.inside)
-            for b in c_basics:
-                if match_type(b) == "var" and self.forward[b] in self.inside.keys():
-                    self.forward[b] = self.inside[self.forward[b]]
-            return True
+            return self.i_single_push(q_to, c_trans)
 
         else:
             c_basics = get_all_basics(c_pair, "/")
@@ -533,6 +438,14 @@ class MatchDictionary:
     inside pushes : dealing only with managing the inside dictionary, 
                     a dictionary that doesn't have anything to do with 
                     with the forward and  
+                    
+    the inside dictionary binds variables without rewriting the other bindings: 
+    a variable is bound once (to a value that may contain bound variables), 
+    components are dereferenced (walk) before they are matched, 
+    and values are resolved only when they are needed (resolve, o_update).
+    it is not a WAM-style store: terms are strings, so there are no mutable variable cells and no trail. 
+    a match attempt owns its dictionary, so a failed match is undone by dropping it, 
+    and resolving a value still rewrites the string (once for every bound variable in it).
     """
 
     def inside_push(self, patternA, patternB):
@@ -558,6 +471,10 @@ class MatchDictionary:
             MatchDictionary.index += 1
         if compA == "_":
             compA = f"?@{MatchDictionary.index}"
+            MatchDictionary.index += 1
+
+        compA = self.walk(compA)
+        compB = self.walk(compB)
 
         typeA = match_type(compA)
         typeB = match_type(compB)
@@ -626,63 +543,29 @@ class MatchDictionary:
         if typeA == 'pair' and typeB == 'var':
             matched = self.i_var_with_pair(compB, compA)
 
-        if not matched:
-            return False
-
-        self.update()
-        return True
+        return matched
 
+    # variables reaching the i_var_with_... methods are unbound (i_single_push walks its components)
     def i_var_with_var(self, i1_var, i2_var):
 
-        if i1_var == i2_var:
-            return True
-
-        i1_exists = i1_var in self.inside.keys()
-        i2_exists = i2_var in self.inside.keys()
-
-        if i1_exists and i2_exists:
-            success = self.i_single_push(self.inside[i1_var], self.inside[i2_var])
-            if not success:
-                return False
-            self.inside[i1_var] = smart_replace(self.inside[i1_var], self.inside)
-            self.inside[i2_var] = smart_replace(self.inside[i2_var], self.inside)
-            return True
-        elif i1_exists:
-            self.inside[i2_var] = self.inside[i1_var]
-            return True
-        elif i2_exists:
-            self.inside[i1_var] = self.inside[i2_var]
-            return True
-        else:
+        if i1_var != i2_var:
             self.inside[i1_var] = i2_var
-            return True
+        return True
 
     def i_const_with_var(self, i1_const, i2_var):
 
-        i2_exists = i2_var in self.inside.keys()
-
-        if i2_exists:
-            return self.i_single_push(i1_const, self.inside[i2_var])
-        else:
-            self.inside[i2_var] = i1_const
-            return True
+        self.inside[i2_var] = i1_const
+        return True
 
     def i_list_with_list(self, i1_list, i2_list):
         return self.inside_push(i1_list[1:-1], i2_list[1:-1])
 
     def i_var_with_list(self, i1_var, i2_list):
-        i2_list = smart_replace(i2_list, self.inside)
+        i2_list = self.resolve(i2_list)
         if i1_var + "," in i2_list or i1_var + "]" in i2_list or i1_var + "*" in i2_list or i1_var + ")" in i2_list:
             return False
-        if i1_var in self.inside.keys():
-            i1_to = self.inside[i1_var]
-            matched = self.i_single_push(i1_to, i2_list)
-            if not matched:
-                return False
-            return True
-        else:
-            self.inside[i1_var] = i2_list
-            return True
+        self.inside[i1_var] = i2_list
+        return True
 
     def i_head_with_head(self, i1_head, i2_head):
         i1_comps = splitWithoutParen(i1_head[1:-1], "*")
@@ -692,18 +575,11 @@ class MatchDictionary:
         return self.i_single_push(i1_comps[0], i2_comps[0]) and self.i_single_push(i1_comps[1], i2_comps[1])
 
     def i_var_with_head(self, i1_var, i2_head):
-        i2_head = smart_replace(i2_head, self.inside)
+        i2_head = self.resolve(i2_head)
         if i1_var + "," in i2_head or i1_var + "]" in i2_head or i1_var + "*" in i2_head or i1_var + ")" in i2_head:
             return False
-        if i1_var in self.inside.keys():
-            i1_to = self.inside[i1_var]
-            matched = self.i_single_push(i1_to, i2_head)
-            if not matched:
-                return False
-            return True
-        else:
-            self.inside[i1_var] = i2_head
-            return True
+        self.inside[i1_var] = i2_head
+        return True
 
     def i_list_with_head(self, i1_list, i2_head):
         if i1_list == "[]":
@@ -724,18 +600,11 @@ class MatchDictionary:
         return self.inside_push(i1_pat, i2_pat)
 
     def i_var_with_title(self, i1_var, i2_title):
-        i2_title = smart_replace(i2_title, self.inside)
+        i2_title = self.resolve(i2_title)
         if i1_var + "," in i2_title or i1_var + "]" in i2_title or i1_var + "*" in i2_title or i1_var + ")" in i2_title:
             return False
-        if i1_var in self.inside.keys():
-            i1_to = self.inside[i1_var]
-            matched = self.i_single_push(i1_to, i2_title)
-            if not matched:
-                return False
-            return True
-        else:
-            self.inside[i1_var] = i2_title
-            return True
+        self.inside[i1_var] = i2_title
+        return True
 
     def i_pack_with_pack(self, i1_pack, i2_pack):
         i1_name, _, i1_pat = i1_pack.partition("{")
@@ -747,18 +616,11 @@ class MatchDictionary:
         return self.inside_push(i1_pat, i2_pat)
 
     def i_var_with_pack(self, i1_var, i2_pack):
-        i2_pack = smart_replace(i2_pack, self.inside)
+        i2_pack = self.resolve(i2_pack)
         if i1_var + "," in i2_pack or i1_var + "]" in i2_pack or i1_var + "*" in i2_pack or i1_var + ")" in i2_pack:
             return False
-        if i1_var in self.inside.keys():
-            i1_to = self.inside[i1_var]
-            matched = self.i_single_push(i1_to, i2_pack)
-            if not matched:
-                return False
-            return True
-        else:
-            self.inside[i1_var] = i2_pack
-            return True
+        self.inside[i1_var] = i2_pack
+        return True
 
     def i_pair_with_pair(self, i1_pair, i2_pair):
         i1_comps = splitWithoutParen(i1_pair[1:-1], "/")
@@ -766,35 +628,52 @@ class MatchDictionary:
         return self.i_single_push(i1_comps[0], i2_comps[0]) and self.i_single_push(i1_comps[1], i2_comps[1])
 
     def i_var_with_pair(self, i1_var, i2_pair):
-        i2_first, i2_second = splitWithoutParen(smart_replace(i2_pair[1:-1], self.inside), "/")
+        i2_pair = self.resolve(i2_pair)
+        i2_first, i2_second = splitWithoutParen(i2_pair[1:-1], "/")
         if var_in_query(i2_first, i1_var) or var_in_query(i2_second, i1_var):
             return False
-        if i1_var in self.inside.keys():
-            i1_to = self.inside[i1_var]
-            matched = self.i_single_push(i1_to, i2_pair)
-            if not matched:
-                return False
-            return True
-        else:
-            self.inside[i1_var] = i2_pair
-            return True
+        self.inside[i1_var] = i2_pair
+        return True
 
-    def update(self):
+    # the value bound to a component, if the component is a bound variable
+    def walk(self, comp):
+        """
+        Dereferences a component: follows the inside bindings while the component is a bound variable.
+
+        :param comp: str
+        :return: str
+        """
+        while comp in self.inside:
+            comp = self.inside[comp]
+        return comp
 
-        found_repeat = False
-        for i_key in self.inside:
-            new_value = smart_replace(self.inside[i_key], self.inside)
-            if new_value != self.inside[i_key]:
-                self.inside[i_key] = new_value
-                found_repeat = True
-        if found_repeat:
-            self.update()
-            return
+    # a value with all the inside bindings applied
+    def resolve(self, value, resolved=None):
+        """
+        Replaces the bound variables of a value by their values, in one pass: the value of every bound variable is
+        resolved once (and kept in resolved), and not again for every variable bound to it.
+
+        :param value: str
+        :param resolved: dict[str, str] (values of bound variables that were resolved already), None
+        :return: str
+        """
+        if not self.inside:
+            return value
+        if resolved is None:
+            resolved = {}
+        replacing = {}
+        for var in ordered_variables(value):
+            if var in self.inside:
+                if var not in resolved:
+                    resolved[var] = self.resolve(self.inside[var], resolved)
+                replacing[var] = resolved[var]
+        return smart_replace(value, replacing) if replacing else value
 
     def o_update(self):
 
+        resolved = {}
         for q_key in self.backward.keys():
-            self.backward[q_key] = processHead(smart_replace(self.backward[q_key], self.inside))
+            self.backward[q_key] = processHead(self.resolve(self.backward[q_key], resolved))
 
         for c_key in self.forward.keys():
-            self.forward[c_key] = processHead(smart_replace(self.forward[c_key], self.inside))
+            self.forward[c_key] = processHead(self.resolve(self.forward[c_key], resolved))
@@ -1,5 +1,103 @@
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache
+from math import ceil, floor, log10, sin, cos, tan, asin, acos, atan, prod
 
-from math import ceil, floor, log10, sin, cos, tan, asin, acos, atan
+from util import processHead, splitWithoutParen, match_type
+
+MAX_DIGITS = 100000  # Most digits of an integer (larger numbers and results fail, instead of running for ever)
+SHORT_BITS = 13000  # Larger integers are converted through Decimal (python limits converting them directly to text)
+
+# Numbers are integers (of any size) unless they are written with a decimal point or an exponent, which makes them floats.
+# Divisions and negative powers of integers are exact (fractions), their results are written as integers if they are
+# whole, and as floats otherwise (the results are atoms, which have no fraction syntax).
+
+# Parses a number (once for every text)
+@lru_cache(maxsize=1 << 14)
+def parse(text: str):
+    """
+    The number an atom denotes.
+
+    :param text: str
+    :return: int, float, None (not a number)
+    """
+    try:
+        return int(text)
+    except ValueError:
+        if text.strip().lstrip("+-").isdigit():
+            return int(Decimal(text)) if len(text) <= MAX_DIGITS else None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def number(text: str):
+    """
+    The number an atom denotes.
+
+    :param text: str
+    :return: int, float
+    :raises ValueError: not a number
+    """
+    num = parse(text)
+    if num is None:
+        raise ValueError(text)
+    return num
+
+
+# Text of a number
+def text(num):
+    """
+    The atom of a number. Integers are written in full, up to MAX_DIGITS digits.
+
+    :param num: int, float
+    :return: str
+    :raises ValueError: an integer with more than MAX_DIGITS digits
+    """
+    if type(num) is not int or num.bit_length() < SHORT_BITS:
+        return str(num)
+    if abs(num).bit_length() * 0.30103 > MAX_DIGITS + 1:
+        raise ValueError(num)
+    digits = str(Decimal(num))
+    if len(digits.lstrip("-")) > MAX_DIGITS:
+        raise ValueError(num)
+    return digits
+
+
+# Normal form of a result
+def normal(num):
+    """
+    Whole results become integers, fractions that are not whole become floats.
+
+    :param num: int, float, Fraction
+    :return: int, float
+    :raises ValueError: complex results
+    """
+    if type(num) is Fraction:
+        return num.numerator if num.denominator == 1 else float(num)
+    if type(num) is float:
+        return int(num) if num.is_integer() else num
+    if type(num) is complex:
+        raise ValueError(num)
+    return num
+
+
+# Numbers of a list
+def numbers(text: str):
+    """
+    The numbers of an expanded list.
+
+    :param text: str
+    :return: list[int, float]
+    :raises ValueError: not a list of numbers
+    """
+    text = processHead(text.strip())
+    if not text or match_type(text) != "list":
+        raise ValueError(text)
+    if text[1:-1].strip() == "":
+        return []
+    return [number(item) for item in splitWithoutParen(text[1:-1])]
 
 
 # For Math
@@ -19,10 +117,10 @@ def Reader(queryName:str, queryComp:str):
         if comps[0][0] == "?" or comps[1][0] == "?":
             return
         try:
-            if float(comps[0]) == float(comps[1]):
+            if number(comps[0]) == number(comps[1]):
                 yield {}
             return
-        except ValueError:
+        except (ValueError, ArithmeticError):
             return
 
     if queryName == 'hAdd':
@@ -32,18 +130,17 @@ def Reader(queryName:str, queryComp:str):
         if comps[0][0] == "?" or comps[1][0] == "?":
             return
         try:
-            num1 = float(comps[0])
-            num2 = float(comps[1])
+            num1 = number(comps[0])
+            num2 = number(comps[1])
             num3 = num1 + num2
-            if num3.is_integer():
-                num3 = int(num3)
+            num3 = normal(num3)
             if comps[2][0] == "?":
-                yield {comps[2]:str(num3)}
-            elif float(comps[2]) == num3:
+                yield {comps[2]: text(num3)}
+            elif number(comps[2]) == num3:
                 yield {}
             else:
                 return
-        except ValueError:
+        except (ValueError, ArithmeticError):
             return
 
     if queryName == 'hSub':
@@ -53,18 +150,17 @@ def Reader(queryName:str, queryComp:str):
         if comps[0][0] == "?" or comps[1][0] == "?":
             return
         try:
-            num1 = float(comps[0])
-            num2 = float(comps[1])
+            num1 = number(comps[0])
+            num2 = number(comps[1])
             num3 = num1 - num2
-            if num3.is_integer():
-                num3 = int(num3)
+            num3 = normal(num3)
             if comps[2][0] == "?":
-                yield {comps[2]: str(num3)}
-            elif float(comps[2]) == num3:
+                yield {comps[2]: text(num3)}
+            elif number(comps[2]) == num3:
                 yield {}
             else:
                 return
-        except ValueError:
+        except (ValueError, ArithmeticError):
             return
 
     if queryName == 'hMul':
@@ -74,18 +170,17 @@ def Reader(queryName:str, queryComp:str):
         if comps[0][0] == "?" or comps[1][0] == "?":
             return
         try:
-            num1 = float(comps[0])
-            num2 = float(comps[1])
+            num1 = number(comps[0])
+            num2 = number(comps[1])
             num3 = num1 * num2
-            if num3.is_integer():
-                num3 = int(num3)
+            num3 = normal(num3)
             if comps[2][0] == "?":
-                yield {comps[2]: str(num3)}
-            elif float(comps[2]) == num3:
+                yield {comps[2]: text(num3)}
+            elif number(comps[2]) == num3:
                 yield {}
             else:
                 return
-        except ValueError:
+        except (ValueError, ArithmeticError):
             return
 
     if queryName == 'hDiv':
@@ -95,20 +190,22 @@ def Reader(queryName:str, queryComp:str):
         if comps[0][0] == "?" or comps[1][0] == "?":
             return
         try:
-            num1 = float(comps[0])
-            num2 = float(comps[1])
+            num1 = number(comps[0])
+            num2 = number(comps[1])
             if num2 == 0:
                 return
-            num3 = num1 / num2
-            if num3.is_integer():
-                num3 = int(num3)
+            if type(num1) is int and type(num2) is int:
+                num3 = Fraction(num1, num2)
+            else:
+                num3 = num1 / num2
+            num3 = normal(num3)
             if comps[2][0] == "?":
-                yield {comps[2]: str(num3)}
-            elif float(comps[2]) == num3:
+                yield {comps[2]: text(num3)}
+            elif number(comps[2]) == num3:
                 yield {}
             else:
                 return
-        except ValueError:
+        except (ValueError, ArithmeticError):
             return
 
     if queryName == 'hMod':
@@ -118,20 +215,19 @@ def Reader(queryName:str, queryComp:str):
         if comps[0][0] == "?" or comps[1][0] == "?":
             return
         try:
-            num1 = float(comps[0])
-            num2 = float(comps[1])
+            num1 = number(comps[0])
+            num2 = number(comps[1])
             if num2 == 0:
                 return
             num3 = num1 % num2
-            if num3.is_integer():
-                num3 = int(num3)
+            num3 = normal(num3)
             if comps[2][0] == "?":
-                yield {comps[2]: str(num3)}
-            elif float(comps[2]) == num3:
+                yield {comps[2]: text(num3)}
+            elif number(comps[2]) == num3:
                 yield {}
             else:
                 return
-        except ValueError:
+        except (ValueError, ArithmeticError):
             return
 
     if queryName == 'hFloor':
@@ -141,15 +237,15 @@ def Reader(queryName:str, queryComp:str):
         if comps[0][0] == "?":
             return
         try:
-            num1 = float(comps[0])
+            num1 = number(comps[0])
             num2 = int(floor(num1))
             if comps[1][0] == "?":
-                yield {comps[1]: str(num2)}
-            elif float(comps[1]) == num2:
+                yield {comps[1]: text(num2)}
+            elif number(comps[1]) == num2:
                 yield {}
             else:
                 return
-        except ValueError:
+        except (ValueError, ArithmeticError):
             return
 
     if queryName == 'hCeil':
@@ -159,15 +255,15 @@ def Reader(queryName:str, queryComp:str):
         if comps[0][0] == "?":
             return
         try:
-            num1 = float(comps[0])
+            num1 = number(comps[0])
             num2 = int(ceil(num1))
             if comps[1][0] == "?":
-                yield {comps[1]: str(num2)}
-            elif float(comps[1]) == num2:
+                yield {comps[1]: text(num2)}
+            elif number(comps[1]) == num2:
                 yield {}
             else:
                 return
-        except ValueError:
+        except (ValueError, ArithmeticError):
             return
 
     if queryName == 'hPower':
@@ -177,18 +273,22 @@ def Reader(queryName:str, queryComp:str):
         if comps[0][0] == "?" or comps[1][0] == "?":
             return
         try:
-            num1 = float(comps[0])
-            num2 = float(comps[1])
-            num3 = num1 ** num2
-            if num3.is_integer():
-                num3 = int(num3)
+            num1 = number(comps[0])
+            num2 = number(comps[1])
+            if type(num1) is int and type(num2) is int and abs(num1) > 1 and abs(num2) * log10(abs(num1)) > MAX_DIGITS:
+                return
+            if type(num1) is int and type(num2) is int and num2 < 0:
+                num3 = Fraction(num1) ** num2
+            else:
+                num3 = num1 ** num2
+            num3 = normal(num3)
             if comps[2][0] == "?":
-                yield {comps[2]: str(num3)}
-            elif float(comps[2]) == num3:
+                yield {comps[2]: text(num3)}
+            elif number(comps[2]) == num3:
                 yield {}
             else:
                 return
-        except ValueError:
+        except (ValueError, ArithmeticError):
             return
 
     if queryName == 'hLog':
@@ -198,17 +298,16 @@ def Reader(queryName:str, queryComp:str):
         if comps[0][0] == "?":
             return
         try:
-            num1 = float(comps[0])
+            num1 = number(comps[0])
             num2 = log10(num1)
-            if num2.is_integer():
-                num2 = int(num2)
+            num2 = normal(num2)
             if comps[1][0] == "?":
-                yield {comps[1]: str(num2)}
-            elif float(comps[1]) == num2:
+                yield {comps[1]: text(num2)}
+            elif number(comps[1]) == num2:
                 yield {}
             else:
                 return
-        except ValueError:
+        except (ValueError, ArithmeticError):
             return
 
     if queryName == 'hCos':
@@ -218,33 +317,31 @@ def Reader(queryName:str, queryComp:str):
 
         if comps[1][0] == "?":
             try:
-                num1 = float(comps[0])
+                num1 = number(comps[0])
                 num2 = cos(num1)
-                if num2.is_integer():
-                    num2 = int(num2)
-                yield {comps[1]: str(num2)}
-            except ValueError:
+                num2 = normal(num2)
+                yield {comps[1]: text(num2)}
+            except (ValueError, ArithmeticError):
                 return
 
         elif comps[0][0] == "?":
             try:
-                num1 = float(comps[1])
+                num1 = number(comps[1])
                 try:
                     num2 = acos(num1)
-                except ValueError:
+                except (ValueError, ArithmeticError):
                     return
-                if num2.is_integer():
-                    num2 = int(num2)
-                yield {comps[0]: str(num2)}
-            except ValueError:
+                num2 = normal(num2)
+                yield {comps[0]: text(num2)}
+            except (ValueError, ArithmeticError):
                 return
         else:
             try:
-                num1 = float(comps[1])
-                num2 = cos(float(comps[0]))
+                num1 = number(comps[1])
+                num2 = cos(number(comps[0]))
                 if num1 == num2:
                     yield {}
-            except ValueError:
+            except (ValueError, ArithmeticError):
                 return
 
     if queryName == 'hSin':
@@ -254,33 +351,31 @@ def Reader(queryName:str, queryComp:str):
 
         if comps[1][0] == "?":
             try:
-                num1 = float(comps[0])
+                num1 = number(comps[0])
                 num2 = sin(num1)
-                if num2.is_integer():
-                    num2 = int(num2)
-                yield {comps[1]: str(num2)}
-            except ValueError:
+                num2 = normal(num2)
+                yield {comps[1]: text(num2)}
+            except (ValueError, ArithmeticError):
                 return
 
         elif comps[0][0] == "?":
             try:
-                num1 = float(comps[1])
+                num1 = number(comps[1])
                 try:
                     num2 = asin(num1)
-                except ValueError:
+                except (ValueError, ArithmeticError):
                     return
-                if num2.is_integer():
-                    num2 = int(num2)
-                yield {comps[0]: str(num2)}
-            except ValueError:
+                num2 = normal(num2)
+                yield {comps[0]: text(num2)}
+            except (ValueError, ArithmeticError):
                 return
         else:
             try:
-                num1 = float(comps[1])
-                num2 = sin(float(comps[0]))
+                num1 = number(comps[1])
+                num2 = sin(number(comps[0]))
                 if num1 == num2:
                     yield {}
-            except ValueError:
+            except (ValueError, ArithmeticError):
                 return
 
     if queryName == 'hTan':
@@ -290,33 +385,31 @@ def Reader(queryName:str, queryComp:str):
 
         if comps[1][0] == "?":
             try:
-                num1 = float(comps[0])
+                num1 = number(comps[0])
                 try:
                     num2 = tan(num1)
-                except ValueError:
+                except (ValueError, ArithmeticError):
                     return
-                if num2.is_integer():
-                    num2 = int(num2)
-                yield {comps[1]: str(num2)}
-            except ValueError:
+                num2 = normal(num2)
+                yield {comps[1]: text(num2)}
+            except (ValueError, ArithmeticError):
                 return
 
         elif comps[0][0] == "?":
             try:
-                num1 = float(comps[1])
+                num1 = number(comps[1])
                 num2 = atan(num1)
-                if num2.is_integer():
-                    num2 = int(num2)
-                yield {comps[0]: str(num2)}
-            except ValueError:
+                num2 = normal(num2)
+                yield {comps[0]: text(num2)}
+            except (ValueError, ArithmeticError):
                 return
         else:
             try:
-                num1 = float(comps[1])
-                num2 = tan(float(comps[0]))
+                num1 = number(comps[1])
+                num2 = tan(number(comps[0]))
                 if num1 == num2:
                     yield {}
-            except ValueError:
+            except (ValueError, ArithmeticError):
                 return
 
     if queryName == 'hLT':
@@ -324,11 +417,27 @@ def Reader(queryName:str, queryComp:str):
         if len(comps) != 2:
             return
         try:
-            num1 = float(comps[0])
-            num2 = float(comps[1])
+            num1 = number(comps[0])
+            num2 = number(comps[1])
             if num1 < num2:
                 yield {}
             else:
                 return
-        except ValueError:
+        except (ValueError, ArithmeticError):
+            return
+
+    if queryName == 'hSumList' or queryName == 'hProductList':
+        comps = splitWithoutParen(queryComp)
+        if len(comps) != 2:
+            return
+        try:
+            nums = numbers(comps[0])
+            num2 = normal(sum(nums) if queryName == 'hSumList' else prod(nums))
+            if comps[1][0] == "?":
+                yield {comps[1]: text(num2)}
+            elif number(comps[1]) == num2:
+                yield {}
+            else:
+                return
+        except (ValueError, ArithmeticError):
             return
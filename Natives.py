@@ -0,0 +1,181 @@
+"""
+
+Natives
+
+Native (python) implementations of library predicates.
+A native implementation is attached to a library predicate when its library is imported, and is tried before the clauses
+of the predicate. It either returns all the solutions the clauses would generate (the same solutions, as many times and
+in the same order), or declines by returning None - when a call is not instantiated enough (generative calls such as
+Join(?a, ?b, [1,2,3])), and the clauses are searched as usual.
+A predicate whose clauses are changed (extend, assert, delete, switches) loses its native implementation.
+
+"""
+
+import re
+
+from Match import MatchDictionary
+from util import processHead, splitWithoutParen, match_type, independent
+
+
+natives = {}  # Library name -> {predicate name -> native implementation}
+
+ANONYMOUS = re.compile(r'(?<![\w".?])_(?![\w"])')  # The anonymous variable inside a pattern
+INTEGER = re.compile(r'0|-?[1-9][0-9]*')
+
+
+# Registers a native implementation
+def register(library, name, arity):
+    """
+    Returns a decorator that registers a native implementation of a library predicate.
+    The implementation is called with the interpreter, the pattern of the call (str) and its components (list of str),
+    and returns a list of solutions (dict[str, str]), or None to decline.
+
+    :param library: str
+    :param name: str
+    :param arity: int (number of components, calls with a different number of components decline)
+    :return: function
+    """
+    def decorator(function):
+        def native(interpreter, query_pat):
+            if any(infx in query_pat for infx in interpreter.infixes):
+                return None
+            parts = splitWithoutParen(query_pat)
+            if len(parts) != arity:
+                return None
+            return function(interpreter, query_pat, parts)
+        natives.setdefault(library, {})[name] = native
+        return function
+    return decorator
+
+
+# Elements of a ground list
+def elements(component):
+    """
+    The elements of a list without variables.
+
+    :param component: str
+    :return: list[str], None (not a list, or has variables)
+    """
+    component = component.strip()
+    if match_type(component) not in ("list", "head"):
+        return None
+    component = processHead(component)
+    if not component or match_type(component) != "list":
+        return None
+    if independent(component) or ANONYMOUS.search(component):
+        return None
+    if component[1:-1].strip() == "":
+        return []
+    return splitWithoutParen(component[1:-1])
+
+
+# Matches the pattern of a call with an answer
+def answer(interpreter, query_pat, parts):
+    """
+    Matches the pattern of a call with an answer, as the answer was a fact.
+
+    :param interpreter: Interpreter
+    :param query_pat: str
+    :param parts: list[str] (components of the answer)
+    :return: list[dict[str, str]] (one solution, or none)
+    """
+    m = MatchDictionary.match(interpreter, query_pat, ",".join(parts))
+    if not m:
+        return []
+    return [m[1]]
+
+
+def as_list(items):
+    return "[" + ",".join(items) + "]"
+
+
+@register("List", "Reverse", 2)
+def reverse(interpreter, query_pat, parts):
+    items = elements(parts[0])
+    if items is None:
+        return None
+    return answer(interpreter, query_pat, [parts[0], as_list(reversed(items))])
+
+
+@register("List", "Appended", 3)
+def appended(interpreter, query_pat, parts):
+    items = elements(parts[1])
+    if items is None or independent(parts[0]) or ANONYMOUS.search(parts[0]):
+        return None
+    return answer(interpreter, query_pat, [parts[0], parts[1], as_list(items + [parts[0]])])
+
+
+@register("List", "Join", 3)
+def join(interpreter, query_pat, parts):
+    first = elements(parts[0])
+    second = elements(parts[1])
+    if first is None or second is None:
+        return None
+    return answer(interpreter, query_pat, [parts[0], parts[1], as_list(first + second)])
+
+
+@register("List", "_Len", 2)
+def length(interpreter, query_pat, parts):
+    items = elements(parts[0])
+    if items is None:
+        return None
+    if match_type(parts[1]) != "var" and not INTEGER.fullmatch(parts[1]):
+        return None
+    return answer(interpreter, query_pat, [parts[0], str(len(items))])
+
+
+@register("List", "Last", 2)
+def last(interpreter, query_pat, parts):
+    items = elements(parts[0])
+    if items is None:
+        return None
+    if not items:
+        return []
+    return answer(interpreter, query_pat, [parts[0], items[-1]])
+
+
+@register("List", "In", 2)
+def member(interpreter, query_pat, parts):
+    items = elements(parts[1])
+    if items is None:
+        return None
+    solutions = []
+    for item in items:
+        solutions += answer(interpreter, query_pat, [item, parts[1]])
+    # The clauses match the last element twice (as [?x] and as [?x * ?ys])
+    if items:
+        solutions += answer(interpreter, query_pat, [items[-1], parts[1]])
+    return solutions
+
+
+@register("List", "Index", 3)
+def index(interpreter, query_pat, parts):
+    items = elements(parts[1])
+    if items is None:
+        return None
+    if match_type(parts[0]) == "var":
+        positions = range(len(items))
+    elif INTEGER.fullmatch(parts[0]):
+        position = int(parts[0])
+        positions = [position] if 0 <= position < len(items) else []
+    else:
+        return None
+    solutions = []
+    for position in positions:
+        solutions += answer(interpreter, query_pat, [str(position), parts[1], items[position]])
+    return solutions
+
+
+@register("List", "Split", 4)
+def split(interpreter, query_pat, parts):
+    items = elements(parts[0])
+    if items is None or independent(parts[1]) or ANONYMOUS.search(parts[1]):
+        return None
+    # The clauses keep looking for a later occurrence if the outputs do not match, only plain outputs are handled
+    before, after = parts[2].strip(), parts[3].strip()
+    if match_type(before) != "var" or match_type(after) != "var" or before == after:
+        return None
+    for i, item in enumerate(items):
+        if MatchDictionary.match(interpreter, item, parts[1]):
+            return answer(interpreter, query_pat, [parts[0], parts[1], as_list(items[:i]), as_list(items[i + 1:])])
+    return answer(interpreter, query_pat, [parts[0], parts[1], as_list(items), "[]"])
@@ -1,3 +1,4 @@
+from sys import intern
 
 from Match import MatchDictionary
 from util import processParen, smart_replace, smartUpdate, independent
@@ -40,7 +41,7 @@ class Package:
         t = MatchDictionary.match(interpreter, p_inp, pack_match.p_pat)
         if t:
             forward, backward, _ = t
-            new_pred = Predicate(interpreter, name, pack_match.recursive, pack_match.random)
+            new_pred = Predicate(interpreter, name, pack_match.recursive, pack_match.random, pack_match.tabled)
             for basic in pack_match.basic:
                 new_pred.addBasic(smart_replace(basic, forward))
             for falsehood in pack_match.nope:
@@ -52,7 +53,7 @@ class Package:
 
             return True
 
-    def __init__(self, interpreter, name, p_pat, rec, rand):
+    def __init__(self, interpreter, name, p_pat, rec, rand, tabled=False):
         """
         Creating an empty Package.
 
@@ -61,8 +62,9 @@ class Package:
         :param p_pat: str
         :param rec: boolean
         :param rand: boolean
+        :param tabled: boolean
         """
-        self.name = name  # Package name
+        self.name = intern(name)  # Package name
         self.p_pat = p_pat
         self.cases = []  # Predicate cases to match
         self.then = []  # Predicate searches to do if matched with case
@@ -70,6 +72,7 @@ class Package:
         self.nope = []  # Predicate False
         self.recursive = rec  # If the predicate is recursive, as son as it matches it stops looking. (Opposite of generative)
         self.random = rand  # Whether to check solutions
+        self.tabled = tabled  # Whether to answer calls from answer tables
         self.count = 0  # Count of cases
         self.interpreter = interpreter  # Interpreter for predicate
 
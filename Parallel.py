@@ -0,0 +1,164 @@
+"""
+
+Parallel
+
+Searches in a pool of processes. Every process rebuilds the interpreter once, from the programs the searching
+interpreter read (see Interpreter.program), and searches independent parts of a search: the subproblems of a domain
+(see DomainSearch.parallel), or the alternatives of a query whose solutions are all wanted (or-parallel search, see
+search). Changes made to the predicates by queries (Dynamic library, assert) would not be seen by the processes, so
+once the predicates changed searches are not parallel (see Interpreter.rebuildable).
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Match import MatchDictionary
+from util import processParen, splitWithoutParen, outString, solution_key, Counter
+
+
+in_worker = False  # Whether this process searches for another process (searches in it are not parallel again)
+rebuilt = {}  # The interpreter rebuilt by this process, program -> Interpreter
+
+
+# The interpreter of a process
+def interpreter_of(program):
+    """
+    The interpreter of a process of a pool, rebuilt from a program the first time it is needed.
+
+    :param program: tuple (see Interpreter.program)
+    :return: Interpreter
+    """
+    global in_worker
+    in_worker = True
+
+    if program not in rebuilt:
+        from Interpreter import Interpreter
+        rebuilt.clear()
+        rebuilt[program] = Interpreter.rebuild(program)
+    interpreter = rebuilt[program]
+    interpreter.clearErrors()
+    return interpreter
+
+
+# Or-parallel search
+def search(interpreter, query, depth, workers):
+    """
+    Generates all the solutions of a query (unprocessed, without duplicates, like mixed_query), searching its
+    alternatives in a pool of processes: the branches of an or (|), and the cases of a predicate the query calls.
+    The solutions are generated as the alternatives are solved, so their order is not the order of mixed_query.
+    Queries that can not be split into at least two alternatives are searched as usual.
+
+    :param interpreter: Interpreter
+    :param query: str
+    :param depth: int
+    :param workers: int (number of processes)
+    :return: generator[dict, "Print"]
+    """
+    tasks = []
+    facts = []
+    if not alternatives(interpreter, query, tasks, facts) or len(tasks) < 2:
+        yield from interpreter.mixed_query(query, 0, depth, True)
+        return
+
+    sent_solutions = set()
+    for solution in facts:
+        if solution_key(solution) not in sent_solutions:
+            sent_solutions.add(solution_key(solution))
+            yield solution
+
+    program = interpreter.program()
+    pool = ProcessPoolExecutor(workers)
+    try:
+        futures = [pool.submit(solve_alternative, program, task, depth) for task in tasks]
+        for future in as_completed(futures):
+            if interpreter.deleted:
+                return
+            try:
+                solutions, messages, errors = future.result()
+            except Exception as e:
+                interpreter.raiseError(f"Error: Parallel search of {query} failed ({e})")
+                return
+            interpreter.errorLoad.extend(errors)
+            if messages:
+                interpreter.messageLoad.extend(messages)
+                yield "Print"
+            for solution in solutions:
+                if solution_key(solution) not in sent_solutions:
+                    sent_solutions.add(solution_key(solution))
+                    yield solution
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Splits a query into alternatives
+def alternatives(interpreter, query, tasks, facts):
+    """
+    Splits a query into alternatives that can be searched independently: every branch of an or, and every case of a
+    predicate (facts are answered at once). Predicates that are recursive (only their first matching case is
+    searched), random, tabled or native are not split.
+
+    :param interpreter: Interpreter
+    :param query: str
+    :param tasks: list (alternatives to search, ("query", query) or ("case", predicate name, pattern, index))
+    :param facts: list[dict] (solutions of the facts of split predicates)
+    :return: bool (False if the query is illegal)
+    """
+    query = processParen(query)
+    if not query:
+        return False
+
+    if len(splitWithoutParen(query, "\\")) == 1 and len(splitWithoutParen(query, "&")) == 1:
+        branches = splitWithoutParen(query, "|")
+        if len(branches) != 1:
+            return all(alternatives(interpreter, branch, tasks, facts) for branch in branches)
+
+    name, _, pattern = query.partition("(")
+    predicate = interpreter.predicates.get(name, None)
+    if predicate is None or not query.endswith(")") or outString(query, ":") or outString(query, "}(") \
+            or predicate.recursive or predicate.random or predicate.tabled or predicate.native is not None \
+            or name in interpreter.pythons or name in interpreter.domains \
+            or any(mac in pattern for mac in interpreter.macros):
+        tasks.append(("query", query))
+        return True
+
+    pattern = pattern[:-1]
+    MatchDictionary.reset()
+    for index, (case, backward, _) in enumerate(predicate.match(pattern)):
+        if case == 1:
+            facts.append(backward)
+        else:
+            tasks.append(("case", name, pattern, index))
+    return True
+
+
+# Searches an alternative of an or-parallel search
+def solve_alternative(program, task, depth):
+    """
+    Searches an alternative of a query, in a process of an or-parallel search (see search).
+
+    :param program: tuple (see Interpreter.program)
+    :param task: tuple (see alternatives)
+    :param depth: int
+    :return: (list[dict], list[str], list[str]) (the solutions, the messages and the errors of the search)
+    """
+    # Imported here, queries import the builtins, which import the domains (that import this module)
+    from Query import Query
+
+    interpreter = interpreter_of(program)
+    solutions = []
+    found = set()
+    if task[0] == "query":
+        for solution in interpreter.mixed_query(task[1], 0, depth, True):
+            if type(solution) == dict:
+                solutions.append(solution)
+    else:
+        _, name, pattern, index = task
+        MatchDictionary.reset()
+        for i, (case, backward, _) in enumerate(interpreter.predicates[name].match(pattern)):
+            if i == index:
+                for solution in Query.alternative(interpreter, case, backward, Counter(depth)):
+                    if type(solution) == dict and solution_key(solution) not in found:
+                        found.add(solution_key(solution))
+                        solutions.append(solution)
+                break
+    return solutions, interpreter.messageLoad, interpreter.errorLoad
@@ -1,6 +1,11 @@
 
+from bisect import bisect_left
+from heapq import merge
+from sys import intern
+
 from Match import MatchDictionary
-from util import processParen, smart_replace
+from Term import pattern as parse_pattern, index_key
+from util import processParen
 import random
 
 
@@ -31,7 +36,7 @@ class Predicate:
         """
         return self.id == other.id
 
-    def __init__(self, interpreter, name, rec, rand):
+    def __init__(self, interpreter, name, rec, rand, tabled=False):
         """
         Initiate an empty Predicate.
         Predicates are the building blocks of LCL. They provide the information needed to solve Queries.
@@ -40,19 +45,82 @@ class Predicate:
         :param name: A String denoting the name
         :param rec: A Boolean denoting whether a predicate is recursive (stops looking after found matches)
         :param rand: A Boolean denoting whether a predicate is random
+        :param tabled: A Boolean denoting whether a predicate is tabled (calls are answered from answer tables)
         """
-        self.name = name  # Predicate Name
+        self.name = intern(name)  # Predicate Name
         self.cases = []  # Predicate cases to match
         self.then = []  # Predicate searches to do if matched with case
         self.basic = []  # Predicate Facts
         self.nope = []  # Predicate False
         self.recursive = rec  # If the predicate is recursive, as son as it matches it stops looking. (Opposite of generative)
         self.random = rand  # Whether to check solutions
+        self.tabled = tabled  # Whether to answer calls from answer tables (see Table.py)
+        self.native = None  # Native implementation of a library predicate, tried before the clauses (see Natives.py)
         self.count = 0  # Count of cases
         self.interpreter = interpreter  # Interpreter for predicate
+        self.heads = {}  # Parsed patterns of the cases, facts and falsehoods
+        self.plans = {}  # Parsed queries of the bodies of the cases
+        self.index = {}  # Clause index, (kind, arity, position) -> (buckets by key, unbound clauses)
+        self.idents = {'basic': [], 'cases': []}  # Index identifiers of the clauses of each kind, in order (ascending)
+        self.shared = False  # Whether the clauses are shared with a fork (copied before they are changed, see fork)
+        self.id = Predicate.created
+        Predicate.created += 1
+
+    # State for copying and pickling
+    def __getstate__(self):
+        """
+        The state of the predicate, without the parsed patterns and the index, which are rebuilt lazily from the clauses
+        (so copies and the processes of parallel searches are not sent the parsed terms).
+
+        :return: dict
+        """
+        state = dict(self.__dict__)
+        state["heads"] = {}
+        state["index"] = {}
+        state["idents"] = {'basic': list(range(len(self.basic))), 'cases': list(range(len(self.cases)))}
+        state["shared"] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
         self.id = Predicate.created
         Predicate.created += 1
 
+    # Copy of the predicate for another interpreter
+    def fork(self, interpreter):
+        """
+        A copy of the predicate for a copy of its interpreter (see Interpreter.clone), in constant time: the clauses,
+        their parsed patterns and the index are shared, until the copy or the predicate change them (copy on write).
+        The parsed bodies are not shared, since they search with their interpreter.
+
+        :param interpreter: Interpreter (None until the copy of the interpreter is made)
+        :return: Predicate
+        """
+        forked = Predicate.__new__(Predicate)
+        forked.__dict__.update(self.__dict__)
+        forked.interpreter = interpreter
+        forked.plans = {}
+        forked.id = Predicate.created
+        Predicate.created += 1
+        forked.shared = self.shared = True
+        return forked
+
+    # Stops sharing the clauses
+    def unshare(self):
+        """
+        Copies the clauses shared with a fork (see fork), before they are changed.
+
+        :return: None
+        """
+        if not self.shared:
+            return
+        self.cases, self.then, self.basic, self.nope = list(self.cases), list(self.then), list(self.basic), list(self.nope)
+        self.heads = dict(self.heads)
+        self.index = {key: ({k: list(bucket) for k, bucket in buckets.items()}, list(unbound))
+                      for key, (buckets, unbound) in self.index.items()}
+        self.idents = {kind: list(idents) for kind, idents in self.idents.items()}
+        self.shared = False
+
     # Adds a case
     def addCase(self, to_match, then, insert=False):
         """
@@ -66,15 +134,7 @@ class Predicate:
         to_match = to_match.strip()
         if len(to_match) == 0:
 
-            if insert:
-                self.cases = [to_match] + self.cases
-                self.then = [then] + self.then
-                self.count += 1
-                return
-
-            self.cases.append('')
-            self.then.append(then)
-            self.count += 1
+            self.storeCase('', then, insert)
             return
 
         to_match = processParen(to_match)
@@ -88,26 +148,11 @@ class Predicate:
             return
 
         if len(to_match) == 0:
-            if insert:
-                self.cases = [to_match] + self.cases
-                self.then = [then] + self.then
-                self.count += 1
-                return
-
-            self.cases.append('')
-            self.then.append(then)
-            self.count += 1
+            self.storeCase('', then, insert)
             return
 
-        if insert:
-            self.cases = [to_match] + self.cases
-            self.then = [then] + self.then
-            self.count += 1
-            return
-
-        self.cases.append(to_match)
-        self.then.append(then)
-        self.count += 1
+        self.head(to_match)
+        self.storeCase(to_match, then, insert)
 
     # adds a fact
     def addBasic(self, to_match, insert=False):
@@ -122,28 +167,128 @@ class Predicate:
         to_match = to_match.strip()
         if len(to_match) == 0:
 
-            if insert:
-                self.basic = [''] + self.basic
-                return
-
-            self.basic.append('')
+            self.storeBasic('', insert)
             return
         to_match = processParen(to_match)
         if not to_match:
             self.interpreter.raiseError(f"Error: Incomplete parentheses in predicate {self.name}")
         if len(to_match) == 0:
-            if insert:
-                self.basic = [''] + self.basic
-                return
-
-            self.basic.append('')
+            self.storeBasic('', insert)
             return
 
+        self.head(to_match)
+        self.storeBasic(to_match, insert)
+
+    # stores a case (keeping the index up to date)
+    def storeCase(self, to_match, then, insert=False):
+        """
+        Stores an already processed case.
+
+        :param to_match: str
+        :param then: str
+        :param insert: boolean, add in the beginning
+        :return: None
+        """
+        self.unshare()
+        if insert:
+            self.cases = [to_match] + self.cases
+            self.then = [then] + self.then
+        else:
+            self.cases.append(to_match)
+            self.then.append(then)
+        self.count += 1
+        self.native = None
+        self.indexClause('cases', to_match, insert)
+
+    # stores a fact (keeping the index up to date)
+    def storeBasic(self, to_match, insert=False):
+        """
+        Stores an already processed fact.
+
+        :param to_match: str
+        :param insert: boolean, add in the beginning
+        :return: None
+        """
+        self.unshare()
         if insert:
             self.basic = [to_match] + self.basic
-            return
+        else:
+            self.basic.append(to_match)
+        self.native = None
+        self.indexClause('basic', to_match, insert)
+
+    # removes a fact
+    def removeBasic(self, to_match):
+        """
+        Removes the first fact equal to to_match.
+
+        :param to_match: str
+        :return: boolean, whether a fact was removed
+        """
+        if to_match not in self.basic:
+            return False
+        self.unshare()
+        position = self.basic.index(to_match)
+        del self.basic[position]
+        self.native = None
+        self.unindexClause('basic', to_match, position)
+        return True
+
+    # removes a false fact
+    def removeNot(self, to_match):
+        """
+        Removes the first terminal case equal to to_match.
 
-        self.basic.append(to_match)
+        :param to_match: str
+        :return: boolean, whether a terminal case was removed
+        """
+        if to_match not in self.nope:
+            return False
+        self.unshare()
+        self.nope.remove(to_match)
+        self.native = None
+        return True
+
+    # removes a case
+    def removeCase(self, to_match, then):
+        """
+        Removes the first case equal to to_match, if its search is then.
+
+        :param to_match: str
+        :param then: str
+        :return: boolean, whether a case was removed
+        """
+        if to_match not in self.cases:
+            return False
+        self.unshare()
+        index = self.cases.index(to_match)
+        if then != self.then[index]:
+            return False
+        del self.cases[index]
+        del self.then[index]
+        self.count -= 1
+        self.native = None
+        self.unindexClause('cases', to_match, index)
+        return True
+
+    # removes everything
+    def clear(self):
+        """
+        Removes all cases, facts and terminal cases.
+
+        :return: None
+        """
+        self.unshare()
+        self.cases = []
+        self.then = []
+        self.count = 0
+        self.basic = []
+        self.nope = []
+        self.heads = {}
+        self.plans = {}
+        self.native = None
+        self.dropIndex('basic')
+        self.dropIndex('cases')
 
     # adds a false fact
     def addNot(self, to_match, insert=False):
@@ -154,6 +299,8 @@ class Predicate:
         :param insert: boolean, add in the beginning
         :return:
         """
+        self.unshare()
+        self.native = None
         to_match = to_match.strip()
         if len(to_match) == 0:
 
@@ -173,33 +320,188 @@ class Predicate:
             self.nope.append('')
             return
 
+        self.head(to_match)
+
         if insert:
             self.nope = [to_match] + self.nope
             return
 
         self.nope.append(to_match)
 
+    # parsed pattern of a case
+    def head(self, to_match):
+        """
+        Returns the parsed pattern of a case (parsing it only the first time, or when infixes were declared since).
+
+        :param to_match: str
+        :return: Sequence
+        """
+        infixes = tuple(self.interpreter.infixes)
+        parsed = self.heads.get(to_match, None)
+        if parsed is None or parsed.infixes != infixes:
+            parsed = parse_pattern(to_match, infixes)
+            self.heads[to_match] = parsed
+        return parsed
+
+    # parsed body of a case
+    def plan(self, then):
+        """
+        Returns the parsed query of the body of a case (parsing it only the first time the case is used).
+        The query is instantiated with the bindings of every match (Query.add_new_info) instead of being parsed again.
+
+        :param then: str
+        :return: Query (None if illegal)
+        """
+        if then in self.plans:
+            return self.plans[then]
+        from Query import Query  # Query imports the builtins, which import Predicate
+        plan = Query.create(self.interpreter, then)
+        self.plans[then] = plan
+        return plan
+
+    # Drops the index of a kind of clauses (rebuilt when needed)
+    def dropIndex(self, kind):
+        """
+        Drops the index tables of a kind of clauses ('basic' or 'cases'), they are rebuilt lazily.
+
+        :param kind: str
+        :return: None
+        """
+        self.index = {key: table for key, table in self.index.items() if key[0] != kind}
+        self.idents[kind] = list(range(len(self.basic if kind == 'basic' else self.cases)))
+
+    # The bucket of an index table a clause is filed in
+    def bucket(self, table, to_match, arity, position):
+        """
+        :param table: (dict, list)
+        :param to_match: str
+        :param arity: int
+        :param position: int
+        :return: list[int], None (if the clause has another arity, and is not in the table)
+        """
+        buckets, unbound = table
+        if to_match == "...":
+            return unbound
+        parsed = self.head(to_match)
+        if len(parsed.parts) != arity:
+            return None
+        key = index_key(parsed.args[position])
+        return unbound if key is None else buckets.setdefault(key, [])
+
+    # Files a clause in an index table
+    def fileClause(self, table, to_match, arity, position, ident, insert):
+        """
+        Files a clause in an index table.
+
+        :param table: (dict, list)
+        :param to_match: str
+        :param arity: int
+        :param position: int
+        :param ident: int
+        :param insert: boolean, the clause was added in the beginning
+        :return: None
+        """
+        bucket = self.bucket(table, to_match, arity, position)
+        if bucket is None:
+            return
+        if insert:
+            bucket.insert(0, ident)
+        else:
+            bucket.append(ident)
+
+    # Adds a new clause to the existing index tables
+    def indexClause(self, kind, to_match, insert):
+        """
+        Adds a new clause to the index tables that were already built.
+
+        :param kind: str
+        :param to_match: str
+        :param insert: boolean, the clause was added in the beginning
+        :return: None
+        """
+        idents = self.idents[kind]
+        if insert:
+            ident = idents[0] - 1 if idents else 0
+            idents.insert(0, ident)
+        else:
+            ident = idents[-1] + 1 if idents else 0
+            idents.append(ident)
+        for (t_kind, arity, position), table in self.index.items():
+            if t_kind == kind:
+                self.fileClause(table, to_match, arity, position, ident, insert)
+
+    # Removes a clause from the index tables
+    def unindexClause(self, kind, to_match, position):
+        """
+        Removes a clause that was removed from the index tables that were already built. The identifiers of the other
+        clauses do not change, so only the bucket of the clause is changed.
+
+        :param kind: str
+        :param to_match: str
+        :param position: int (of the clause, before it was removed)
+        :return: None
+        """
+        ident = self.idents[kind].pop(position)
+        for (t_kind, arity, arg_position), table in self.index.items():
+            if t_kind == kind:
+                bucket = self.bucket(table, to_match, arity, arg_position)
+                if bucket is not None:
+                    bucket.remove(ident)
+
+    # Candidate clauses
+    def candidates(self, kind, pattern):
+        """
+        Returns the positions of the clauses of a kind that can possibly match the pattern, in order.
+        Clauses are indexed by the first argument of the pattern that is not a variable.
+
+        :param kind: str ('basic' or 'cases')
+        :param pattern: Sequence
+        :return: list[int], None (if no argument can be used, and all clauses should be tried)
+        """
+        args = pattern.args
+        for position, arg in enumerate(args):
+            key = index_key(arg)
+            if key is not None:
+                break
+        else:
+            return None
+
+        arity = len(args)
+        table = self.index.get((kind, arity, position), None)
+        idents = self.idents[kind]
+        if table is None:
+            table = ({}, [])
+            for ident, to_match in zip(idents, self.basic if kind == 'basic' else self.cases):
+                self.fileClause(table, to_match, arity, position, ident, False)
+            self.index[(kind, arity, position)] = table
+
+        buckets, unbound = table
+        return [bisect_left(idents, ident) for ident in merge(buckets.get(key, ()), unbound)]
+
     # finds a match.
     def match(self, pattern):
         """
         Given a pattern, look through all cases and determine if there exists a match.
         if match is basic, return basic solution.
          if match is terminal, return False.
-        if match is translational, return the new search that has to be done, and a way (the backward dictionary) to translate from solutions of the new
-        search back to the parameters given in the pattern. This is the fundamental idea of back chaining, used to solved queries.
+        if match is translational, return the new search that has to be done (a Query), and a way (the backward dictionary) to translate from solutions of
+        the new search back to the parameters given in the pattern. This is the fundamental idea of back chaining, used to solved queries.
 
         :param pattern: str
-        :return: Generator of (search, forward, backward), False
+        :return: Generator of (search, backward, forward), False
         """
 
         pattern = processParen(pattern)
         if pattern is False or pattern is None:
             self.interpreter.raiseError("Error: Incomplete Parentheses")
             return
+        pattern = parse_pattern(pattern, tuple(self.interpreter.infixes))
+        profiler = self.interpreter.profiler
+        unify = MatchDictionary.match if profiler is None else profiler.matcher(self.name)
 
         # Looking for false facts
         for nope in self.nope:
-            t = MatchDictionary.match(self.interpreter, pattern, nope)
+            t = unify(self.interpreter, pattern, self.head(nope))
             if t and not t[2]:  # only in the case the patterns matched AND no wiggle room
                 return
 
@@ -216,7 +518,7 @@ class Predicate:
                 indices_name = random.choice(ch)
                 if indices_name == 'basic':
                     basic = random.choice(self.basic)
-                    t = MatchDictionary.match(self.interpreter, pattern, basic)
+                    t = unify(self.interpreter, pattern, self.head(basic))
                     if t:
                         # print(f"Match basic: {t[0]},{t[1]}")
                         yield 1, t[1], t[0]
@@ -224,28 +526,39 @@ class Predicate:
                             return
                 if indices_name == 'translation':
                     i = random.randint(0, self.count - 1)
-                    t = MatchDictionary.match(self.interpreter, pattern, self.cases[i])
+                    t = unify(self.interpreter, pattern, self.head(self.cases[i]))
                     if t:
                         # print(f"Matched with {self.cases[i]}: {t[0]},{t[1]}")
-                        then = self.then[i]
-                        then = smart_replace(then, t[0])
-                        yield then, t[1], t[0]
+                        plan = self.plan(self.then[i])
+                        if plan is None:
+                            return
+                        yield plan.add_new_info(t[0]), t[1], t[0]
                         if self.recursive:
                             return
 
-        for basic in self.basic:
-            t = MatchDictionary.match(self.interpreter, pattern, basic)
+        positions = self.candidates('basic', pattern)
+        basics = self.basic if positions is None else [self.basic[i] for i in positions]
+        for basic in basics:
+            t = unify(self.interpreter, pattern, self.head(basic))
             if t:
                 yield 1, t[1], t[0]
                 if self.recursive:
                     return
 
-        for i in range(self.count):
-            t = MatchDictionary.match(self.interpreter, pattern, self.cases[i])
+        positions = self.candidates('cases', pattern)
+        if positions is None:
+            cases, thens = self.cases, self.then
+            positions = range(self.count)
+        else:
+            cases, thens = [self.cases[i] for i in positions], [self.then[i] for i in positions]
+            positions = range(len(cases))
+        for i in positions:
+            t = unify(self.interpreter, pattern, self.head(cases[i]))
             if t:
-                then = self.then[i]
-                then = smart_replace(then, t[0])
-                yield then, t[1], t[0]
+                plan = self.plan(thens[i])
+                if plan is None:
+                    return
+                yield plan.add_new_info(t[0]), t[1], t[0]
                 if self.recursive:
                     return
 
@@ -261,6 +574,8 @@ class Predicate:
             s += ", Recursive"
         if self.random:
             s += ", Random"
+        if self.tabled:
+            s += ", Tabled"
 
         s += ":\n"
 
@@ -0,0 +1,265 @@
+"""
+
+Profiler
+
+Counts and times the searches of predicates (Profile, in Inspect Library, and batch.py --profile). For every predicate:
+the calls, exits (solutions), fails (calls that ran out of solutions) and redos (searches for another solution), the
+attempts to match its clauses and the attempts that matched, the time spent matching them (in MatchDictionary.match),
+and the inclusive (with the predicates it called) and exclusive (without them) wall time. Calls between predicates are
+counted as well, for the call graph.
+
+The calls searched by Engine.solve are profiled by the engine itself, with a Call for every call (see Profiler.call), and
+the calls searched by Query.search (tabled predicates, and the searches of builtins) are generators, profiled by
+Profiler.search.
+
+"""
+
+from time import perf_counter
+
+from Match import MatchDictionary
+
+
+class Record:
+    """
+    The counts and times of a predicate.
+    """
+
+    __slots__ = ("calls", "exits", "fails", "redos", "attempts", "matches", "inclusive", "exclusive", "match_time")
+
+    def __init__(self):
+        self.calls = 0
+        self.exits = 0
+        self.fails = 0
+        self.redos = 0
+        self.attempts = 0
+        self.matches = 0
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+        self.match_time = 0.0
+
+    def as_dict(self):
+        """
+        :return: dict
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Call:
+    """
+    A call of a predicate searched by Engine.solve, which counts its ports.
+    """
+
+    __slots__ = ("profiler", "name", "record", "records", "exited")
+
+    def __init__(self, profiler, name, caller):
+        """
+        :param profiler: Profiler
+        :param name: str
+        :param caller: Call, None (the call whose body made the call, None for the query itself)
+        """
+        self.profiler = profiler
+        self.name = name
+        self.record = profiler.record(name)
+        # The records of the call and its callers, once each (the time of recursive calls is counted once)
+        self.records = (self.record,) if caller is None else \
+            (self.record,) + tuple(record for record in caller.records if record is not self.record)
+        self.exited = False  # The call found a solution since it was last searched
+
+    def exit(self):
+        self.record.exits += 1
+        self.exited = True
+
+    def redo(self):
+        self.record.redos += 1
+        self.exited = False
+
+    def fail(self):
+        self.record.fails += 1
+
+
+class Profiler:
+    """
+    Profiles the searches of predicates. Searches are generators, so the time of a call is the time its generator
+    runs (until it yields a solution, and again whenever another solution is asked for).
+    """
+
+    QUERY = "(query)"  # The caller of predicates called by the query itself
+
+    def __init__(self):
+        self.records = {}  # Predicate name -> Record
+        self.edges = {}  # (caller, called) -> number of calls
+        self.frames = []  # Running searches, [name, start, time of searches they ran]
+        self.running = {}  # Predicate name -> number of its running searches (time of recursive calls is counted once)
+
+    # The record of a predicate
+    def record(self, name):
+        """
+        :param name: str
+        :return: Record
+        """
+        record = self.records.get(name, None)
+        if record is None:
+            record = self.records[name] = Record()
+        return record
+
+    # Profiles the search of a predicate
+    def search(self, name, solutions):
+        """
+        Generates the solutions of a call to a predicate, counting its ports (call, exit, redo and fail) and timing it.
+
+        :param name: str
+        :param solutions: generator (of the call)
+        :return: generator
+        """
+        record = self.record(name)
+        record.calls += 1
+        caller = self.frames[-1][0] if self.frames else Profiler.QUERY
+        self.edges[(caller, name)] = self.edges.get((caller, name), 0) + 1
+
+        try:
+            while True:
+                frame = [name, perf_counter(), 0.0]
+                self.frames.append(frame)
+                self.running[name] = self.running.get(name, 0) + 1
+                try:
+                    solution = next(solutions, None)
+                finally:
+                    self.stop(frame, record)
+
+                if solution is None:
+                    record.fails += 1
+                    return
+                if type(solution) != dict:
+                    yield solution
+                    continue
+                record.exits += 1
+                yield solution
+                record.redos += 1
+        finally:
+            solutions.close()
+
+    # A call of a predicate searched by Engine.solve
+    def call(self, name, caller):
+        """
+        :param name: str
+        :param caller: Call, None (the query itself)
+        :return: Call
+        """
+        call = Call(self, name, caller)
+        call.record.calls += 1
+        caller = Profiler.QUERY if caller is None else caller.name
+        self.edges[(caller, name)] = self.edges.get((caller, name), 0) + 1
+        return call
+
+    # A step of Engine.solve started
+    def start(self, call):
+        """
+        Times a step of the search of Engine.solve, for a call (searches profiled by Profiler.search in the step are
+        called by it).
+
+        :param call: Call, None (the query itself, which is not timed)
+        :return: list, None (a frame, see frames, with the call)
+        """
+        if call is None:
+            return None
+        frame = [call.name, perf_counter(), 0.0, call]
+        self.frames.append(frame)
+        return frame
+
+    # A step of Engine.solve ended
+    def finish(self, frame):
+        """
+        :param frame: list (see start)
+        :return: None
+        """
+        elapsed = perf_counter() - frame[1]
+        self.frames.pop()
+        call = frame[3]
+        call.record.exclusive += elapsed - frame[2]
+        for record in call.records:
+            record.inclusive += elapsed
+        if self.frames:
+            self.frames[-1][2] += elapsed
+
+    # A search stopped running
+    def stop(self, frame, record):
+        """
+        :param frame: list (see frames)
+        :param record: Record
+        :return: None
+        """
+        elapsed = perf_counter() - frame[1]
+        self.frames.pop()
+        record.exclusive += elapsed - frame[2]
+        self.running[frame[0]] -= 1
+        if self.running[frame[0]] == 0:
+            record.inclusive += elapsed
+        if self.frames:
+            self.frames[-1][2] += elapsed
+
+    # Matching of the clauses of a predicate
+    def matcher(self, name):
+        """
+        A replacement for MatchDictionary.match that counts and times the matching of the clauses of a predicate.
+
+        :param name: str
+        :return: function
+        """
+        record = self.record(name)
+
+        def match(interpreter, pattern, head):
+            start = perf_counter()
+            t = MatchDictionary.match(interpreter, pattern, head)
+            record.match_time += perf_counter() - start
+            record.attempts += 1
+            if t:
+                record.matches += 1
+            return t
+
+        return match
+
+    # Flat profile
+    def table(self, limit=None):
+        """
+        The profile as a table, a row for every predicate, by exclusive time.
+
+        :param limit: int, None (most rows)
+        :return: str
+        """
+        header = ("Predicate", "Calls", "Exits", "Fails", "Redos", "Attempts", "Matches", "Incl(s)", "Excl(s)", "Match(s)")
+        rows = []
+        for name, record in sorted(self.records.items(), key=lambda item: -item[1].exclusive)[:limit]:
+            rows.append((name, str(record.calls), str(record.exits), str(record.fails), str(record.redos),
+                         str(record.attempts), str(record.matches), f"{record.inclusive:.4f}",
+                         f"{record.exclusive:.4f}", f"{record.match_time:.4f}"))
+        widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+        lines = ["  ".join(cell.ljust(width) if i == 0 else cell.rjust(width)
+                           for i, (cell, width) in enumerate(zip(row, widths))) for row in [header] + rows]
+        return "\n".join(lines) + "\n"
+
+    # Call graph
+    def graph(self):
+        """
+        The call graph, the callers and the called predicates of every predicate (with the number of calls).
+
+        :return: str
+        """
+        lines = []
+        for name, record in sorted(self.records.items(), key=lambda item: -item[1].inclusive):
+            if record.calls == 0:
+                continue
+            callers = [f"{caller} ({count})" for (caller, called), count in self.edges.items() if called == name]
+            called = [f"{called} ({count})" for (caller, called), count in self.edges.items() if caller == name]
+            lines.append(f"{name}: {record.calls} calls, {record.inclusive:.4f}s")
+            lines.append(f"    called by: {', '.join(callers) or '-'}")
+            lines.append(f"    calls: {', '.join(called) or '-'}")
+        return "\n".join(lines) + "\n"
+
+    # Machine readable profile
+    def report(self):
+        """
+        :return: dict (the records, and the calls between predicates)
+        """
+        return {"predicates": {name: record.as_dict() for name, record in self.records.items()},
+                "calls": [{"caller": caller, "called": called, "count": count}
+                          for (caller, called), count in self.edges.items()]}
@@ -19,6 +19,7 @@ class Query:
     """
 
     start = 0
+    special = ("True", "Time", "ClockInit")  # Queries answered by search itself, before builtins and predicates
 
     def __init__(self, interpreter):
         """
@@ -169,16 +170,28 @@ class Query:
     def add_new_info(self, info: dict):
         """
         Adding new information to a current query.
-        Useful in And Gates where a solution to a previous query is used in a following query(s).
+        Useful in And Gates where a solution to a previous query is used in a following query(s), and to instantiate the
+        (parsed once) bodies of predicate cases.
+        Queries are never changed while searched, so parts of the query that the information does not change are shared
+        with the updated query.
 
         :param info: dict (of translations between variables and atoms|lists|variables)
         :return: Query (updated)
         """
+        if not info:
+            return self
+
         Q = Query(self.interpreter)
 
         if self.type == 'r' or self.type == 'pi' or self.type == 'pc' or self.type == "%" or self.type == "!":
             # print(f"New Info is {info}")
-            Q.gateA = smart_replace(self.gateA, info)
+            gateA = smart_replace(self.gateA, info)
+            if gateA == self.gateA:
+                return self
+            if self.gateA[0] == "?" and gateA[0] != "?":
+                # a variable searched as a query, it might be bound to any query
+                return Query.create(self.interpreter, gateA)
+            Q.gateA = gateA
             Q.type = self.type
         elif self.type in ['&', '|', '$', '\\']:
             try:
@@ -188,9 +201,13 @@ class Query:
             except AttributeError as e:
                 print(type(Q), Q.type, Q.gateA, Q.gateB)
                 raise e
+            if Q.gateA is self.gateA and Q.gateB is self.gateB:
+                return self
         elif self.type == '~':
             Q.gateA = self.gateA.add_new_info(info)
             Q.type = self.type
+            if Q.gateA is self.gateA:
+                return self
         elif self.type == "c":
             for key, value in self.cond:
                 key, value = key.add_new_info(info), value.add_new_info(info)
@@ -230,6 +247,65 @@ class Query:
         else:
             print(self.type)
 
+    # Solves a pattern using the clauses of a predicate
+    @classmethod
+    def resolve(cls, interpreter, predicate, query_pat, depth):
+        """
+        Matches a pattern against the clauses of a predicate, and searches the bodies of the matching cases.
+
+        :param interpreter: Interpreter
+        :param predicate: Predicate
+        :param query_pat: str
+        :param depth: Counter
+        :return: a generator object that can generate solutions for the pattern, dict[str, str]
+        """
+        if predicate.native is not None:
+            solutions = predicate.native(interpreter, query_pat)
+            if solutions is not None:
+                yield from solutions
+                return
+
+        for search, backward, forwards in predicate.match(query_pat):
+            if depth.count < 0:
+                return
+            yield from Query.alternative(interpreter, search, backward, depth)
+
+    # Solves a single matching case of a predicate
+    @classmethod
+    def alternative(cls, interpreter, search, backward, depth):
+        """
+        Searches the body of a case that matched a pattern, and translates its solutions back to the pattern.
+
+        :param interpreter: Interpreter
+        :param search: Query, 1 (a matching fact)
+        :param backward: dict[str, str] (the translation back to the pattern, see Predicate.match)
+        :param depth: Counter
+        :return: a generator object that can generate solutions for the pattern, dict[str, str]
+        """
+        if search == 1:
+            yield backward
+            return
+
+        depth.sub(1)
+        for solution in search.search(depth):
+
+            if solution == "Request":
+                yield "Request"
+                continue
+            if solution == "Print":
+                yield "Print"
+                continue
+
+            solution_as_dict = {}
+            for key in backward.keys():
+
+                if backward[key] in solution.keys():
+                    solution_as_dict[key] = solution[backward[key]]
+                else:
+                    solution_as_dict[key] = processHead(smart_replace(backward[key], solution))
+
+            yield solution_as_dict
+
     # Main function. Searches for query
     def search(self, depth):
         """
@@ -327,8 +403,9 @@ class Query:
                 return
 
             if "{" in query_name:
-                self.type = "pi"
-                yield from self.search(depth)
+                package_query = Query(self.interpreter)
+                package_query.gateA, package_query.type = self.gateA, "pi"
+                yield from package_query.search(depth)
                 return
 
             # if predicate is variable
@@ -392,30 +469,13 @@ class Query:
             predicate_match = self.interpreter.predicates.get(query_name, None)
 
             if predicate_match:
-                for search, backward, forwards in predicate_match.match(query_pat):
-                    if search == 1:
-                        yield backward
-                    else:
-                        next_q = Query.create(self.interpreter, search)
-                        depth.sub(1)
-                        for solution in next_q.search(depth):
-
-                            if solution == "Request":
-                                yield "Request"
-                                continue
-                            if solution == "Print":
-                                yield "Print"
-                                continue
-
-                            solution_as_dict = {}
-                            for key in backward.keys():
-
-                                if backward[key] in solution.keys():
-                                    solution_as_dict[key] = solution[backward[key]]
-                                else:
-                                    solution_as_dict[key] = processHead(smart_replace(backward[key], solution))
-
-                            yield solution_as_dict
+                if predicate_match.tabled:
+                    solutions = self.interpreter.tables.search(predicate_match, query_pat, depth)
+                else:
+                    solutions = Query.resolve(self.interpreter, predicate_match, query_pat, depth)
+                if self.interpreter.profiler is not None:
+                    solutions = self.interpreter.profiler.search(query_name, solutions)
+                yield from solutions
 
         # filter clause
         elif self.type == "~":
@@ -454,8 +514,7 @@ class Query:
                         yield "Print"
                         continue
 
-                    q_solution = p_solution.copy()
-                    q_solution = smartUpdate(q_solution, solution)
+                    q_solution = smartUpdate(p_solution, solution)
                     yield q_solution
 
             except StopIteration:
@@ -488,8 +547,8 @@ class Query:
                         yield "Print"
                         continue
 
-                    q_solution = p_solution.copy()
-                    q_solution = smartUpdate(q_solution, solution)
+                    # Merged by copying (Engine.solve chains the solutions instead, see Engine.Bindings)
+                    q_solution = smartUpdate(p_solution, solution)
                     yield q_solution
 
         # or clause
@@ -678,13 +737,13 @@ class Query:
             elif independent(self.gateB):
                 self.interpreter.raiseError(f"Error: trying to change the value of a reference to a value containing variables, '{self.gateB}'")
                 return
-            self.gateB = deref(self.interpreter, self.gateB)
-            if not self.gateB:
+            value = deref(self.interpreter, self.gateB)
+            if not value:
                 return
-            self.gateB = processHead(self.gateB)
-            if not self.gateB:
+            value = processHead(value)
+            if not value:
                 return
-            self.interpreter.references[self.gateA] = self.gateB
+            self.interpreter.references[self.gateA] = value
             yield {}
 
         else:
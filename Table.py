@@ -0,0 +1,205 @@
+"""
+
+Table
+
+Answer tables for tabled predicates (declared with 'as tabled').
+Every call to a tabled predicate is answered from a table kept per variant of the call (the call up to renaming of
+variables). The first call of a variant evaluates the clauses of the predicate until no new answers are found, calls of a
+variant that is still being evaluated are answered with the answers found so far (which is what makes left recursion
+terminate), and calls of a completed variant never touch the clauses again.
+
+Variants that depend on each other are completed together, by the oldest of them (the leader), similarly to the
+completion of strongly connected components in SLG resolution.
+
+"""
+
+from Match import MatchDictionary
+from Query import Query
+from util import smart_replace, processHead, variant
+
+
+class Table:
+    """
+    The answers found for one variant call.
+    """
+
+    __slots__ = ("call", "answers", "found", "complete", "evaluating", "position", "leader", "mark")
+
+    def __init__(self, call):
+        """
+        Initiate an empty table.
+
+        :param call: str (the variant of the call)
+        """
+        self.call = call
+        self.answers = []  # Answers, in the order they were found
+        self.found = set()  # Answers, for duplicate checks
+        self.complete = False  # All the answers were found
+        self.evaluating = False  # Evaluation of the clauses is in progress
+        self.position = -1  # Position in the evaluation stack
+        self.leader = -1  # Position of the oldest table this table depends on
+        self.mark = 0  # Number of incomplete tables when evaluation started
+
+    def add(self, answer):
+        """
+        Adds an answer if it is new.
+
+        :param answer: str
+        :return: boolean (whether the answer was new)
+        """
+        if answer in self.found:
+            return False
+        self.found.add(answer)
+        self.answers.append(answer)
+        return True
+
+
+class Tables:
+    """
+    All the answer tables of an interpreter.
+    """
+
+    def __init__(self, interpreter):
+        """
+        Initiate an empty collection of tables.
+
+        :param interpreter: Interpreter
+        """
+        self.interpreter = interpreter
+        self.tables = {}  # (predicate name, variant of call) -> Table
+        self.stack = []  # Tables being evaluated
+        self.incomplete = []  # Tables evaluated, waiting for their leader to complete
+        self.added = 0  # Number of answers added, used to detect a fixpoint
+
+    # Solves a call to a tabled predicate
+    def search(self, predicate, query_pat, depth):
+        """
+        Solves a call to a tabled predicate, each distinct answer once.
+
+        :param predicate: Predicate
+        :param query_pat: str
+        :param depth: Counter
+        :return: a generator object that can generate solutions, dict[str, str]
+        """
+        call = variant(query_pat, "c")
+        key = (predicate.name, call)
+        table = self.tables.get(key, None)
+        if table is None:
+            table = Table(call)
+            self.tables[key] = table
+
+        if table.evaluating:
+            # A recursive call, every table evaluated above it depends on it
+            for above in self.stack[table.position + 1:]:
+                above.leader = min(above.leader, table.position)
+            yield from self.answer(table, query_pat, list(table.answers))
+            return
+
+        if not table.complete:
+            completed = False
+            table.evaluating = True
+            table.position = len(self.stack)
+            table.leader = table.position
+            table.mark = len(self.incomplete)
+            self.stack.append(table)
+            try:
+                while True:
+                    added = self.added
+                    for solution in Query.resolve(self.interpreter, predicate, call, depth):
+                        if solution == "Print" or solution == "Request":
+                            yield solution
+                            continue
+                        if table.add(variant(processHead(smart_replace(call, solution)), "t")):
+                            self.added += 1
+                    if depth.count < 0:
+                        return
+                    if self.added == added:
+                        break
+                completed = True
+            finally:
+                self.stack.pop()
+                table.evaluating = False
+                if not completed:
+                    self.discard(table)
+            if table.leader == table.position:
+                for member in self.incomplete[table.mark:]:
+                    member.complete = True
+                del self.incomplete[table.mark:]
+                table.complete = True
+            else:
+                self.stack[-1].leader = min(self.stack[-1].leader, table.leader)
+                self.incomplete.append(table)
+
+        yield from self.answer(table, query_pat, table.answers if table.complete else list(table.answers))
+
+    # Matches the answers of a table with a call
+    def answer(self, table, query_pat, answers):
+        """
+        Matches answers with the call they answer.
+
+        :param table: Table
+        :param query_pat: str
+        :param answers: list[str]
+        :return: a generator object that can generate solutions, dict[str, str]
+        """
+        for answer in answers:
+            m = MatchDictionary.match(self.interpreter, query_pat, answer)
+            if m:
+                yield m[1]
+
+    # Drops an evaluation that did not finish
+    def discard(self, table):
+        """
+        Drops a table whose evaluation was stopped (exceeded recursion depth, or the solutions were no longer needed),
+        together with the incomplete tables that depend on it.
+
+        :param table: Table
+        :return: None
+        """
+        dropped = {id(t) for t in self.incomplete[table.mark:]}
+        dropped.add(id(table))
+        del self.incomplete[table.mark:]
+        for key in [key for key, t in self.tables.items() if id(t) in dropped]:
+            del self.tables[key]
+
+    # Copy of the tables for another interpreter
+    def fork(self, interpreter):
+        """
+        A copy of the tables for a copy of their interpreter (see Interpreter.clone). Complete tables never change, so
+        they are shared, and tables that are being evaluated are not copied.
+
+        :param interpreter: Interpreter (None until the copy of the interpreter is made)
+        :return: Tables
+        """
+        forked = Tables(interpreter)
+        forked.tables = {key: table for key, table in self.tables.items() if table.complete}
+        return forked
+
+    # Clears tables
+    def clear(self, name=None):
+        """
+        Clears the complete tables of a predicate, or of all predicates (name is None).
+        Tables that are still being evaluated are kept.
+
+        :param name: str
+        :return: None
+        """
+        for key in [key for key, table in self.tables.items() if table.complete and (name is None or key[0] == name)]:
+            del self.tables[key]
+
+    # Shows tables
+    def show(self, name=None):
+        """
+        Called by ShowTables. The tables of a predicate, or of all predicates (name is None).
+
+        :param name: str
+        :return: str representation of the tables
+        """
+        s = ""
+        for (t_name, call), table in self.tables.items():
+            if name is not None and t_name != name:
+                continue
+            s += f"Table {t_name}({call}), {'Complete' if table.complete else 'Incomplete'}:\n"
+            for answer in table.answers:
+                s += f"   Answer: {t_name}({answer})\n"
+        return s
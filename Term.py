@@ -0,0 +1,339 @@
+"""
+
+Term
+
+Structured representation of patterns. A pattern string is parsed once into a tree of compact term objects,
+which the matcher walks directly instead of re-splitting and re-typing the strings at every level of recursion.
+Every term keeps its (processed) text, so bindings are still handed around as strings.
+
+Atoms and functors (name, kind and arity of titles, packages and lists) are interned as symbols: equal atoms and
+functors share one Symbol, so comparing them compares identities, and every symbol has a small integer id, that clause
+indexes and builtins are keyed by. The table of symbols holds them weakly: a symbol is freed (and its id is given to the
+next new symbol) once no term uses it, so the table holds the symbols of the loaded programs, of the registered builtins,
+and of the terms in the caches of the parser (component and pattern, which are bounded), and not every atom ever seen.
+
+"""
+
+from functools import lru_cache
+from itertools import count
+from sys import intern
+from weakref import WeakValueDictionary
+
+from util import processParen, splitWithoutParen, match_type, processHead, lookup
+
+
+# Symbol table, atoms and functors -> symbols (while they are used)
+SYMBOLS = WeakValueDictionary()
+FREE = []  # Ids of freed symbols, given again
+IDS = count()  # Ids never given
+
+
+# An atom or a functor
+class Symbol:
+    """
+    An atom (its text) or a functor ((kind, name, arity)), with its id.
+    """
+
+    __slots__ = ("key", "id", "__weakref__")
+
+    def __init__(self, key, sid):
+        """
+        :param key: str, tuple
+        :param sid: int
+        """
+        self.key = key
+        self.id = sid
+
+    def __del__(self):
+        if FREE is not None:
+            FREE.append(self.id)
+
+    def __reduce__(self):
+        # Copies (and other processes) use the symbol of the key in their own table
+        return symbol, (self.key,)
+
+    def __repr__(self):
+        return f"Symbol({self.key!r}, {self.id})"
+
+
+# Symbol of an atom or a functor
+def symbol(key):
+    """
+    The symbol of an atom (its text) or a functor ((kind, name, arity)), made the first time it is used.
+
+    :param key: str, tuple
+    :return: Symbol
+    """
+    sym = SYMBOLS.get(key, None)
+    if sym is None:
+        sym = Symbol(key, FREE.pop() if FREE else next(IDS))
+        SYMBOLS[key] = sym
+    return sym
+
+
+# Symbol of an atom or a functor, if it is used
+def find(key):
+    """
+    :param key: str, tuple
+    :return: Symbol, None (if no term uses the atom or the functor)
+    """
+    return SYMBOLS.get(key, None)
+
+
+EMPTY_LIST = symbol(("list", "[]", 0))
+CONS = symbol(("list", "[*]", 2))
+PAIR = symbol(("pair", "/", 2))
+
+
+# Base term
+class Term:
+    """
+    A single component of a pattern. kind mirrors the names returned by match_type.
+    """
+
+    __slots__ = ("text",)
+    kind = None
+
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.text})"
+
+
+class Atom(Term):
+    """
+    Constants: names, numbers and strings.
+    """
+    __slots__ = ("symbol",)
+    kind = "constant"
+
+    def __init__(self, text):
+        super().__init__(intern(text))
+        self.symbol = symbol(self.text)
+
+
+class Var(Term):
+    """
+    Variables (?x).
+    """
+    __slots__ = ()
+    kind = "var"
+
+
+class Anonymous(Term):
+    """
+    The anonymous variable '_', a fresh variable every time it is matched.
+    """
+    __slots__ = ()
+    kind = "anon"
+
+
+class Compound(Term):
+    """
+    Terms with sub components. The components are parsed lazily (the first time the matcher descends into them).
+    """
+    __slots__ = ("parts", "infixes", "_args")
+
+    def __init__(self, text, parts, infixes):
+        super().__init__(text)
+        self.parts = parts
+        self.infixes = infixes
+        self._args = None
+
+    @property
+    def args(self):
+        """
+        The parsed sub components.
+
+        :return: tuple[Term]
+        """
+        if self._args is None:
+            self._args = tuple(component(part, self.infixes) for part in self.parts)
+        return self._args
+
+
+class Sequence(Compound):
+    """
+    A comma separated sequence of components (the pattern of a predicate, title or package).
+    """
+    __slots__ = ()
+    kind = "sequence"
+
+
+class ListTerm(Compound):
+    """
+    An expanded list, [1,2,3]. Lists can be views of the tail of another list, so walking a list element by element
+    does not re-split or re-join it.
+    """
+    __slots__ = ("start",)
+    kind = "list"
+
+    def __init__(self, text, parts, infixes, start=0):
+        super().__init__(text, parts, infixes)
+        self.start = start
+
+    @property
+    def args(self):
+        if self._args is None:
+            self._args = tuple(component(part, self.infixes) for part in self.parts[self.start:])
+        return self._args
+
+    def __len__(self):
+        return len(self.parts) - self.start
+
+    def __str__(self):
+        if self.text is None:
+            self.text = "[" + ",".join(self.parts[self.start:]) + "]"
+        return self.text
+
+    def first(self):
+        """
+        First element of the list.
+
+        :return: Term
+        """
+        if self._args is not None:
+            return self._args[0]
+        return component(self.parts[self.start], self.infixes)
+
+    def rest(self):
+        """
+        The list without its first element.
+
+        :return: ListTerm
+        """
+        return ListTerm(None, self.parts, self.infixes, self.start + 1)
+
+
+class Cons(Compound):
+    """
+    A headed list, [?x * ?xs].
+    """
+    __slots__ = ()
+    kind = "head"
+
+
+class Title(Compound):
+    """
+    A title, Name(...).
+    """
+    __slots__ = ("name", "functor")
+    kind = "title"
+
+    def __init__(self, text, name, parts, infixes):
+        super().__init__(text, parts, infixes)
+        self.name = intern(name)
+        self.functor = symbol((self.kind, self.name, len(parts)))
+
+
+class Pack(Compound):
+    """
+    A package, Name{...}.
+    """
+    __slots__ = ("name", "functor")
+    kind = "pack"
+
+    def __init__(self, text, name, parts, infixes):
+        super().__init__(text, parts, infixes)
+        self.name = intern(name)
+        self.functor = symbol((self.kind, self.name, len(parts)))
+
+
+class Pair(Compound):
+    """
+    A pair, (?a/?b).
+    """
+    __slots__ = ()
+    kind = "pair"
+
+
+ANONYMOUS = Anonymous("_")
+
+
+# Parses a single component
+@lru_cache(maxsize=1 << 16)
+def component(raw, infixes=()):
+    """
+    Parses a single component into a term, processing it the same way the matcher does (parentheses, infixes and
+    headed lists).
+
+    :param raw: str
+    :param infixes: tuple[str]
+    :return: Term, None (if the component is illegal)
+    """
+    text = processParen(raw)
+    if text == "_":
+        return ANONYMOUS
+    if not text:
+        return None
+
+    if infixes and any(infx in text for infx in infixes):
+        text = lookup(text, infixes)
+        if not text:
+            return None
+
+    t = match_type(text)
+    if t in ("list", "head"):
+        text = processHead(text)
+        if not text:
+            return None
+        t = match_type(text)
+
+    if t == "constant":
+        return Atom(text)
+    if t == "var":
+        return Var(text)
+    if t == "list":
+        return ListTerm(text, tuple(splitWithoutParen(text[1:-1])), infixes)
+    if t == "head":
+        return Cons(text, tuple(splitWithoutParen(text[1:-1], "*")), infixes)
+    if t == "title":
+        name, _, pat = text.partition("(")
+        return Title(text, name, tuple(splitWithoutParen(pat[:-1])), infixes)
+    if t == "pack":
+        name, _, pat = text.partition("{")
+        return Pack(text, name, tuple(splitWithoutParen(pat[:-1])), infixes)
+    return Pair(text, tuple(splitWithoutParen(text[1:-1], "/")), infixes)
+
+
+# Parses a full pattern
+@lru_cache(maxsize=1 << 16)
+def pattern(text, infixes=()):
+    """
+    Parses a full pattern (a comma separated sequence of components).
+
+    :param text: str
+    :param infixes: tuple[str]
+    :return: Sequence
+    """
+    return Sequence(text, tuple(splitWithoutParen(text)), infixes)
+
+
+# Key of a component in a clause index
+def index_key(term):
+    """
+    The id of the principal functor or constant of a component, used to index clauses.
+    Two components with different keys can never be matched. Variables (and illegal components) have no key.
+    The terms the key was taken from keep its symbol (and id) in use, as long as they are kept (see Predicate.heads).
+
+    :param term: Term
+    :return: int, None
+    """
+    if term is None:
+        return None
+    kind = term.kind
+    if kind == "constant":
+        return term.symbol.id
+    if kind == "list":
+        return EMPTY_LIST.id if len(term) == 0 else CONS.id
+    if kind == "head":
+        return CONS.id
+    if kind == "title" or kind == "pack":
+        return term.functor.id
+    if kind == "pair":
+        return PAIR.id
+    return None
@@ -70,6 +70,15 @@ class BackChainingTest(Testing.TestingSuper.Testing):
         set Cut
             case ?x then Cut1(?x) \ True();
         
+        set Call
+            case ?g then ?g;
+        
+        set Both
+            case ?g, ?h then ?g & ?h;
+        
+        set Same
+            case ?x, ?x;
+        
         """
 
         cls.interpreter = cls.upload(data)
@@ -123,4 +132,24 @@ class BackChainingTest(Testing.TestingSuper.Testing):
         self.isTrue("A(Abraham)")
 
     def test_Cut(self):
-        self.singleSolved("Cut(?x)", x="1")
\ No newline at end of file
+        self.singleSolved("Cut(?x)", x="1")
+
+    def test_Same(self):
+        self.singleSolved("Same([?a,2],[1,?b])", a="1", b="2")
+        self.singleSolved("Same(f(?x,?x),f(?y,3))", x="3", y="3")
+        self.singleSolved("Same([?x*?xs],[1,2,3])", x="1", xs="[2,3]")
+        self.noSolution("Same(f(?x,?x),f(1,2))")
+        self.noSolution("Same([?x,?x],[?y,[?y]])")
+        self.noSolution("Same(f(1),f(1,2))")
+        self.noSolution("Same(f(1),g(1))")
+        self.isTrue("Same(f(a,[]),f(a,[]))")
+
+    def test_Call(self):
+        self.singleSolved("Call(Father(Abraham,?x))", x="Isaac")
+        self.multipleSolved("Both(Father(?x,Jacob),Father(?y,?x))", x=("Isaac",), y=("Abraham",))
+        self.multipleSolved("Call(Grandfather(?x,?y))", x=("Abraham", "Abraham", "Isaac", "Isaac"), y=("Jacob", "Esau", "Joseph", "Judah"))
+    def test_Repeated(self):
+        # Isaac is the father of both, the solution is sent once unless repeated solutions are asked for
+        self.singleSolved("Father(?x,Jacob)|Father(?x,Esau)", x="Isaac")
+        sols = list(self.interpreter.mixed_query("Father(?x,Jacob)|Father(?x,Esau)", 0, 300, unP=True, unique=False))
+        self.assertEqual(sols, [{"?x": "Isaac"}, {"?x": "Isaac"}])
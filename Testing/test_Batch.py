@@ -0,0 +1,94 @@
+import os
+import tempfile
+
+from Testing.TestingSuper import Testing
+from Budget import Budget
+from util import next_solution
+import batch
+
+
+class BatchTest(Testing):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        data = """
+
+        import List;
+        import Math;
+
+        set Father
+            case (Abraham, Isaac)
+            case (Isaac, Jacob)
+            case (Isaac, Esau);
+
+        set Digit case 0 case 1 case 2 case 3 case 4 case 5 case 6 case 7 case 8 case 9;
+        set D case ?x then Digit(?x);
+        set Down
+            case 0
+            case ?n then GT(?n, 0) & Sub(?n, 1, ?m) & Down(?m) & E(?n, ?n);
+
+        """
+
+        cls.interpreter = cls.upload(data)
+
+    def results(self, query, solutions_limit=None, limit=10, inferences=None, bindings=None):
+        return list(batch.run(self.interpreter, query, limit, solutions_limit, 10000, inferences, bindings))
+
+    def test_Run(self):
+        results = self.results("Print(sons)&Father(Isaac,?s)")
+        self.assertEqual(results[0], {"query": "Print(sons)&Father(Isaac,?s)", "print": "sons"})
+        self.assertEqual([result["solution"] for result in results[1:3]], [{"?s": "Jacob"}, {"?s": "Esau"}])
+        self.assertEqual(results[3]["status"], "complete")
+        self.assertEqual(results[3]["solutions"], 2)
+        self.assertEqual(results[1]["stats"]["exhausted"], None)
+
+    def test_Limits(self):
+        results = self.results("Father(?x,?y)", 1)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[-1]["status"], "limit")
+        self.assertEqual(self.results("Father(?x,((")[-1]["status"], "error")
+
+    def test_Budgets(self):
+        query = "D(?a)&D(?b)&D(?c)&D(?d)&D(?e)&E(?a,x)"
+        results = self.results(query, inferences=500)
+        self.assertEqual(results[-1]["status"], "inferences")
+        self.assertEqual(results[-1]["stats"]["inferences"], 501)
+
+        results = self.results(query, limit=0.1)
+        self.assertEqual(results[-1]["status"], "timeout")
+        self.assertLess(results[-1]["time"], 5)
+
+        # The bindings held at once, not all the bindings made: a deep recursion holds the bindings of its callers
+        results = self.results(query, bindings=50)
+        self.assertEqual(results[-1]["status"], "complete")
+        self.assertLessEqual(results[-1]["stats"]["bindings"], 50)
+        results = self.results("Down(100)", bindings=50)
+        self.assertEqual(results[-1]["status"], "bindings")
+        self.assertEqual(self.results("Down(10)", bindings=50)[-1]["status"], "complete")
+
+        # The budget is for the whole query, not for every solution
+        results = self.results("D(?a)&D(?b)", inferences=5)
+        self.assertEqual(results[-1]["status"], "inferences")
+        self.assertEqual(results[-1]["solutions"], 40)
+        self.assertEqual([results[0]["stats"]["inferences"], results[10]["stats"]["inferences"]], [2, 3])
+
+    def test_NextSolution(self):
+        query = "D(?a)&D(?b)&D(?c)&D(?d)&D(?e)&E(?a,x)"
+        budget = Budget(10000)
+        self.assertEqual(next_solution(self.interpreter.mixed_query(query, 0, budget, True), 0.1, budget), 1)
+
+        budget = Budget(10000)
+        solutions = self.interpreter.mixed_query("D(?a)", 0, budget, True)
+        self.assertEqual(next_solution(solutions, 10, budget), {"?a": "0"})
+        budget.cancel()
+        self.assertEqual(next_solution(solutions, 10, budget), 4)
+
+    def test_Load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "program.lcl")
+            with open(filename, "w") as f:
+                f.write("set Mother\n    case (Sarah, Isaac);\n")
+            self.assertEqual(batch.load(self.interpreter, filename), [])
+            self.assertNotEqual(batch.load(self.interpreter, os.path.join(directory, "missing.lcl")), [])
+        self.assertEqual(self.results("Mother(?m,Isaac)")[0]["solution"], {"?m": "Sarah"})
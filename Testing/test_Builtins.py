@@ -0,0 +1,63 @@
+import BuiltIns
+import Term
+from Match import MatchDictionary
+from Testing.TestingSuper import Testing
+
+
+# A builtin registered from python
+def double(interpreter, query_pat, parts, depth):
+    try:
+        doubled = str(2 * int(parts[0]))
+    except ValueError:
+        return
+    m = MatchDictionary.match(interpreter, parts[1], doubled)
+    if m:
+        yield m[1]
+
+
+class BuiltinsTest(Testing):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        BuiltIns.register("Double", double, arity=2)
+        BuiltIns.register("ListDouble", double, flag="list_added", arity=2)
+
+        data = """
+
+        import Types;
+
+        set Quadruple
+            case ?x, ?y then Double(?x, ?z) & Double(?z, ?y);
+
+        """
+
+        cls.interpreter = cls.upload(data)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        BuiltIns.unregister("Double")
+        BuiltIns.unregister("ListDouble")
+
+    def test_Registered(self):
+
+        self.singleSolved("Double(4,?x)", x="8")
+        self.isTrue("Double(4,8)")
+        self.noSolution("Double(4,9)")
+        self.noSolution("Double(4)")
+        self.singleSolved("Quadruple(3,?x)", x="12")
+
+    def test_Unregister(self):
+
+        BuiltIns.register("Twice", double, arity=2)
+        self.singleSolved("Twice(2,?x)", x="4")
+        self.assertTrue(BuiltIns.unregister("Twice"))
+        self.noSolution("Twice(2,?x)")
+        self.assertFalse(BuiltIns.unregister("Twice"))
+        # The name is not used anymore, its symbol was freed
+        self.assertIsNone(Term.find("Twice"))
+
+    def test_Flags(self):
+
+        self.isTrue("isList([1,2])")
+        self.noSolution("ListDouble(4,?x)")
@@ -0,0 +1,84 @@
+import os
+import pickle
+import tempfile
+
+from Testing.TestingSuper import Testing
+import Cache
+import Interpreter
+from main import imports
+import batch
+
+
+class CacheTest(Testing):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.filename = os.path.join(cls.directory.name, "program.lcl")
+        cls.data = """
+        import List;
+
+        set Father
+            case (Abraham, Isaac)
+            case (Isaac, Jacob);
+
+        domain Pair
+            over ?a, ?b
+            of ?all : In(?all, [1, 2])
+            const AllDifferent([?a, ?b]);
+        """
+        with open(cls.filename, "w") as f:
+            f.write(cls.data)
+
+        # The libraries are found where the other tests find them
+        cls.path = cls.upload("").path
+        cls.interpreter = cls.fresh()
+        batch.load(cls.interpreter, cls.filename)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.directory.cleanup()
+
+    @classmethod
+    def fresh(cls):
+        return Interpreter.Interpreter(20, imports, path=cls.path)
+
+    def test_Restore(self):
+        self.assertTrue(os.path.exists(Cache.location(self.filename)))
+
+        restored = self.fresh()
+        self.assertTrue(Cache.restore(restored, self.filename, self.data))
+        self.assertIs(restored.predicates["Father"].interpreter, restored)
+        self.assertIsNotNone(restored.predicates["Reverse"].native)
+        self.assertEqual(list(restored.mixed_query("Father(Isaac,?x)", 0, 300, unP=True)), [{"?x": "Jacob"}])
+        self.assertEqual(len(list(restored.mixed_query("Pair(?a,?b)", 0, 300, unP=True))), 2)
+
+    def test_OutOfDate(self):
+        self.assertFalse(Cache.restore(self.fresh(), self.filename, self.data + "\nset Mother;\n"))
+
+        # Only the first file of an interpreter is restored
+        self.assertFalse(Cache.restore(self.interpreter, self.filename, self.data))
+
+        # The sources of the interpreter are part of the key
+        code = Cache.code
+        Cache.code = lambda: "changed"
+        try:
+            self.assertFalse(Cache.restore(self.fresh(), self.filename, self.data))
+        finally:
+            Cache.code = code
+        self.assertTrue(Cache.restore(self.fresh(), self.filename, self.data))
+
+    def test_Stale(self):
+        # A cache whose classes changed (it can not be unpickled) is discarded
+        path = Cache.location(self.filename)
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+        with open(path, "wb") as f:
+            pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+            f.write(b"\x80\x05\x95\x00\x00\x00\x00\x00\x00\x00\x00\x8c\x05Cache\x8c\x07Missing\x93.")
+        self.assertFalse(Cache.restore(self.fresh(), self.filename, self.data))
+        self.assertFalse(os.path.exists(path))
+
+        self.assertTrue(Cache.store(self.interpreter, self.filename, self.data))
+        self.assertTrue(Cache.restore(self.fresh(), self.filename, self.data))
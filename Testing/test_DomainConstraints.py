@@ -0,0 +1,112 @@
+from Testing.TestingSuper import Testing
+
+
+class DomainConstraintsTest(Testing):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        rows = [[f"?x{r * 4 + c + 1}" for c in range(4)] for r in range(4)]
+        groups = rows + [[rows[r][c] for r in range(4)] for c in range(4)] + \
+                 [[rows[br * 2 + r][bc * 2 + c] for r in range(2) for c in range(2)] for br in range(2) for bc in range(2)]
+        sudoku = "\n".join(f"const AllDifferent([{','.join(group)}])" for group in groups)
+
+        data = f"""
+
+        import List;
+
+        domain Sudoku
+            over 16(?x)
+            of ?all : In(?all, [1, 2, 3, 4])
+            {sudoku};
+
+        domain Different
+            over ?a, ?b, ?c
+            of ?a : In(?a, [1, 2])
+            of ?b : In(?b, [1, 2])
+            of ?c : In(?c, [1, 2, 3])
+            const AllDifferent([?a, ?b, ?c]);
+
+        domain Change
+            over ?a, ?b, ?c
+            of ?all : In(?all, [0, 1, 2, 5])
+            const Sum([?a, ?b, ?c], 7);
+
+        domain ChangeWdeg as domwdeg, lcv
+            over ?a, ?b, ?c
+            of ?all : In(?all, [0, 1, 2, 5])
+            const Sum([?a, ?b, ?c], 7);
+
+        domain ChangeRestarts as domdeg, restarts(3)
+            over ?a, ?b, ?c
+            of ?all : In(?all, [0, 1, 2, 5])
+            const Sum([?a, ?b, ?c], 7);
+
+        domain ChangeParallel as parallel(2)
+            over ?a, ?b, ?c
+            of ?all : In(?all, [0, 1, 2, 5])
+            const Sum([?a, ?b, ?c], 7);
+
+        domain Pick
+            over ?i, ?v
+            of ?i : In(?i, [0, 1, 2, 3])
+            of ?v : In(?v, [a, b, c])
+            const Element(?i, [c, a, d, c], ?v);
+
+        domain Allowed
+            over ?x, ?y
+            of ?all : In(?all, [1, 2, 3])
+            const Table([?x, ?y], [[1, 2], [2, 3], [3, 1], [4, 4]])
+            const E(?x, 2) | E(?x, 3);
+
+        set Other
+            case (1, 2)
+            case (2, 1);
+
+        domain Pigeons
+            over ?a, ?b, ?c, ?d, ?e
+            of ?all : In(?all, [1, 2])
+            const Other(?c, ?d)
+            const Other(?d, ?e)
+            const Other(?c, ?e);
+
+        """
+
+        cls.interpreter = cls.upload(data)
+
+    def test_AllDifferent(self):
+        self.generic("Different(?a,?b,?c)", [{"?a": "1", "?b": "2", "?c": "3"}, {"?a": "2", "?b": "1", "?c": "3"}])
+        self.singleSolved("Sudoku(1,?a,?b,?c,?d,?e,?f,2,?g,?h,4,?i,?j,3,?k,?l)",
+                          a="2", b="3", c="4", d="3", e="4", f="1", g="2", h="1", i="3", j="4", k="2", l="1")
+
+    def test_Sum(self):
+        for name in ["Change", "ChangeWdeg", "ChangeRestarts", "ChangeParallel"]:
+            self.generic(f"{name}(?a,?b,?c)", [{"?a": a, "?b": b, "?c": c} for a, b, c in
+                                                ["025", "052", "205", "250", "502", "520", "115", "151", "511"]])
+        self.noSolution("Change(5,5,?c)")
+
+    def test_Element(self):
+        self.generic("Pick(?i,?v)", [{"?i": "0", "?v": "c"}, {"?i": "1", "?v": "a"}, {"?i": "3", "?v": "c"}])
+
+    def test_Table(self):
+        self.generic("Allowed(?x,?y)", [{"?x": "2", "?y": "3"}, {"?x": "3", "?y": "1"}])
+
+    def test_Order(self):
+        sols = list(self.interpreter.mixed_query("Different(?a,?b,?c)", 0, 10000, unP=True))
+        self.assertEqual(sols, [{"?a": "1", "?b": "2", "?c": "3"}, {"?a": "2", "?b": "1", "?c": "3"}])
+
+    def test_Backjumping(self):
+        self.noSolution("Pigeons(?a,?b,?c,?d,?e)")
+        # ?a and ?b have nothing to do with the failures, so their other values are never tried
+        stats = self.interpreter.domains["Pigeons"].stats
+        self.assertEqual(stats["nodes"], 4)
+        self.assertEqual(stats["backjumps"], 2)
+
+    def test_Stats(self):
+        # Every 4x4 sudoku, backjumping and nogoods must not lose any of them
+        sols = list(self.interpreter.mixed_query("Sudoku(?a,?b,?c,?d,?e,?f,?g,?h,?i,?j,?k,?l,?m,?n,?o,?p)", 0, 10000,
+                                                 unP=True))
+        self.assertEqual(len(sols), 288)
+        stats = self.interpreter.domains["Sudoku"].stats
+        self.assertLessEqual(stats["fails"], stats["nodes"])
+        self.assertGreater(stats["propagations"], 0)
@@ -134,6 +134,13 @@ class DomainZebraTest(Testing):
            # The man who smokes Blends has a neighbour who drinks water.
            const NextTo(blends, water, ?smokes, ?beverages);
         
+        domain Permutation
+           over ?a, ?b, ?c
+           of ?all : In(?all, [1, 2, 3])
+           elim In(?a, [?b, ?c])
+           elim In(?b, [?a, ?c])
+           elim In(?c, [?a, ?b]);
+
         set Nice
            case ?fish_owner then
               EinsteinRiddle(?c1, ?n1, ?b1, ?s1, ?p1,
@@ -161,3 +168,8 @@ class DomainZebraTest(Testing):
 
     def test_riddle2(self):
         self.singleSolved("Nice(?x)", x="German")
+
+    def test_permutation(self):
+        self.generic("Permutation(?a,?b,?c)", [{"?a": a, "?b": b, "?c": c} for a, b, c in
+                                                ["123", "132", "213", "231", "312", "321"]])
+        self.generic("Permutation(2,?b,?c)", [{"?b": "1", "?c": "3"}, {"?b": "3", "?c": "1"}])
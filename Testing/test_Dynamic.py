@@ -1,4 +1,6 @@
 
+import time
+
 from Testing.TestingSuper import Testing
 
 
@@ -44,3 +46,83 @@ class DynamicTest(Testing):
         self.isTrue("AssertC(Even(?x)>(Mod(?x,2,0)))")
 
         self.singleSolved("Filter(Even,[1,5,8,4],?x)", x="[8,4]")
+
+    def test_Index(self):
+
+        self.isTrue("Create(Age)")
+        self.isTrue("AssertFE(Age(Abraham,175))&AssertFE(Age(Isaac,180))&AssertFE(Age(Jacob,147))")
+
+        self.singleSolved("Age(Isaac,?x)", x="180")
+        self.singleSolved("Age(?x,147)", x="Jacob")
+
+        self.isTrue("AssertF(Age(Isaac,60))")
+        self.multipleSolved("Age(Isaac,?x)", x=("60", "180"))
+
+        self.isTrue("DeleteF(Age(Isaac,180))")
+        self.singleSolved("Age(Isaac,?x)", x="60")
+
+        self.isTrue("AssertFE(Age(?person,0))")
+        self.multipleSolved("Age(Jacob,?x)", x=("147", "0"))
+
+        self.isTrue("Clear(Age)")
+        self.noSolution("Age(Isaac,?x)")
+
+    def test_Retract(self):
+
+        self.isTrue("Create(Owns)")
+        self.isTrue("AssertFE(Owns(a,1))&AssertFE(Owns(b,2))&AssertFE(Owns(a,3))&AssertFE(Owns(c,4))")
+        self.multipleSolved("Owns(a,?x)", x=("1", "3"))
+
+        # Removing clauses keeps the index of the others
+        self.isTrue("DeleteF(Owns(b,2))&DeleteF(Owns(a,1))")
+        self.singleSolved("Owns(a,?x)", x="3")
+        self.singleSolved("Owns(c,?x)", x="4")
+        self.isTrue("AssertF(Owns(a,0))&AssertFE(Owns(b,5))")
+        self.multipleSolved("Owns(a,?x)", x=("0", "3"))
+        self.singleSolved("Owns(b,?x)", x="5")
+
+        self.isTrue("AssertCE(Owns(d,?x)>(Owns(c,?x)))&AssertCE(Owns(e,?x)>(Owns(b,?x)))")
+        self.isTrue("DeleteC(Owns(d,?x)>(Owns(c,?x)))")
+        self.noSolution("Owns(d,?x)")
+        self.singleSolved("Owns(e,?x)", x="5")
+
+    def test_Clone(self):
+
+        self.isTrue("Create(Kept)")
+        self.isTrue("AssertFE(Kept(1))")
+
+        copied = self.interpreter.clone()
+        self.assertEqual(list(copied.mixed_query("AssertFE(Kept(2))", 0, 300, unP=True)), [{}])
+        self.assertEqual(list(copied.mixed_query("Kept(?x)", 0, 300, unP=True)), [{"?x": "1"}, {"?x": "2"}])
+        self.assertIs(copied.predicates["Kept"].interpreter, copied)
+
+        # The changes of the copy do not reach the original
+        self.singleSolved("Kept(?x)", x="1")
+
+    def test_CloneCost(self):
+
+        def cloning(facts):
+            interpreter = self.upload("import Dynamic;")
+            list(interpreter.mixed_query("Create(Many)", 0, 300, unP=True))
+            for i in range(facts):
+                interpreter.predicates["Many"].addBasic(f"{i},{i % 7}")
+            list(interpreter.mixed_query("Many(3,?x)", 0, 300, unP=True))
+            times = []
+            for _ in range(5):
+                start = time.perf_counter()
+                interpreter.clone()
+                times.append(time.perf_counter() - start)
+            return interpreter, min(times)
+
+        small, small_time = cloning(10)
+        large, large_time = cloning(20000)
+        # Copying does not grow with the number of facts
+        self.assertLess(large_time, small_time * 3 + 0.001)
+
+        copied = large.clone()
+        self.assertIs(copied.predicates["Many"].basic, large.predicates["Many"].basic)
+        self.assertEqual(list(copied.mixed_query("Many(3,?x)", 0, 300, unP=True)), [{"?x": "3"}])
+        self.assertEqual(list(copied.mixed_query("DeleteF(Many(3,3))&AssertF(Many(3,9))", 0, 300, unP=True)), [{}])
+        self.assertEqual(list(copied.mixed_query("Many(3,?x)", 0, 300, unP=True)), [{"?x": "9"}])
+        self.assertEqual(list(large.mixed_query("Many(3,?x)", 0, 300, unP=True)), [{"?x": "3"}])
+        self.assertEqual(len(large.predicates["Many"].basic), 20000)
@@ -0,0 +1,85 @@
+import sys
+
+from Testing.TestingSuper import Testing
+import Engine
+from Match import MatchDictionary
+from Query import Query
+from util import Counter, processSolutionDict
+
+
+class EngineTest(Testing):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        data = """
+
+        import Math;
+
+        set To
+            case ?x, ?x
+            case ?x, ?y then LT(?x, ?y) & Add(?x, 1, ?z) & To(?z, ?y);
+
+        set Sum
+            case 0, 0
+            case ?n, ?s then GT(?n, 0) & Sub(?n, 1, ?m) & Sum(?m, ?t) & Add(?t, ?n, ?s);
+
+        set Count
+            case 0, ?l, ?l
+            case ?n, ?l, ?r then GT(?n, 0) & Sub(?n, 1, ?m) & Count(?m, [?n * ?l], ?r);
+
+        set Pick
+            case 1
+            case 2
+            case 3;
+
+        set True
+            case 1;
+
+        set ClockInit
+            case never;
+
+        set Wrap
+            case ?x then True(?x) & Pick(?x);
+
+        """
+
+        cls.interpreter = cls.upload(data)
+
+    def test_Deep(self):
+        # Deeper than the stack of python, calls do not keep frames of python
+        depth = sys.getrecursionlimit() * 2
+        self.generic(f"To(0,{depth})", [{}])
+        self.resulted(f"Sum({depth},?s)", "?s", depth * (depth + 1) // 2)
+
+    def test_LastCall(self):
+        self.resulted("Count(4,[],?r)", "?r", "[1,2,3,4]")
+        self.noSolution("Count(3,[],[1,2])")
+
+    def solutions(self, query):
+        # The solutions of a query by the engine and by Query.search
+        searched = []
+        for search in (lambda q: Engine.solve(self.interpreter, q, Counter(10000)), lambda q: q.search(Counter(10000))):
+            MatchDictionary.reset()
+            solutions = search(Query.create(self.interpreter, query))
+            searched.append([processSolutionDict(solution) for solution in solutions if type(solution) == dict])
+        return searched
+
+    def test_Engines(self):
+        queries = ["Pick(?x)&Pick(?y)&LT(?x,?y)", "Pick(?x)\\Pick(?y)", "Count(3,[],?r)", "Sum(10,?s)", "To(0,5)",
+                   "Count(2,[],?r)|Pick(?r)", "True(7)", "Wrap(?x)", "ClockInit()&Time(?t)&LT(?t,100)&E(?t,?t)", "ClockInit(never)"]
+        for query in queries:
+            engine, searched = self.solutions(query)
+            self.assertEqual(len(engine), len(searched), query)
+            if "Time" not in query:
+                self.assertEqual(engine, searched, query)
+        # Queries that search answers itself are answered before the predicates with their names
+        self.assertEqual(self.solutions("True(7)")[0], [{}])
+        self.assertEqual(self.solutions("Wrap(?x)")[0], ["?x ← 1", "?x ← 2", "?x ← 3"])
+        self.assertEqual(self.solutions("ClockInit(never)")[0], [])
+        self.assertEqual(len(self.solutions("ClockInit()&Time(?t)")[0]), 1)
+
+    def test_Backtracking(self):
+        self.generic("Pick(?x)&Pick(?y)&LT(?x,?y)", [{"?x": "1", "?y": "2"}, {"?x": "1", "?y": "3"}, {"?x": "2", "?y": "3"}])
+        self.generic("Pick(?x)\\Pick(?y)&GT(?y,?x)", [{"?x": "1", "?y": "2"}, {"?x": "1", "?y": "3"}])
+        self.generic("Count(2,[],?r)|Count(1,[],?r)", [{"?r": "[1,2]"}, {"?r": "[1]"}])
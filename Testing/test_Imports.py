@@ -0,0 +1,59 @@
+import os
+import tempfile
+
+from Testing.TestingSuper import Testing
+import Lexer
+
+
+class ImportsTest(Testing):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.module = os.path.join(cls.directory.name, "Versions")
+        with open(cls.module + ".LCL", "w") as f:
+            f.write("set Version case (1);")
+
+        data = f"""
+
+        import List;
+        import Sets;
+        import Inspect;
+        import @{cls.module};
+
+        """
+
+        cls.interpreter = cls.upload(data)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.directory.cleanup()
+
+    def read(self, data):
+        lexer = Lexer.build()
+        lexer.input(data)
+        self.interpreter.read(list(iter(lexer.token, None)))
+
+    def test_Once(self):
+        self.assertEqual(list(self.interpreter.modules.values()).count("List"), 1)
+        self.assertIn(os.path.abspath(self.module + ".LCL"), self.interpreter.modules)
+
+        # Importing again does not replace the predicates
+        predicate = self.interpreter.predicates["In"]
+        self.read("import List; import Sets;")
+        self.assertIs(self.interpreter.predicates["In"], predicate)
+        self.isTrue("In(2,[1,2])")
+
+    def test_Reload(self):
+        self.resulted("Version(?v)", "?v", "1")
+        with open(self.module + ".LCL", "w") as f:
+            f.write("set Version case (2);")
+
+        self.read(f"import @{self.module};")
+        self.resulted("Version(?v)", "?v", "1")
+
+        self.isTrue("Reload(Versions)")
+        self.resulted("Version(?v)", "?v", "2")
+        self.noSolution("Reload(Missing)")
+        self.assertTrue(self.interpreter.reload())
@@ -1,3 +1,4 @@
+import sys
 
 from Testing.TestingSuper import Testing
 from math import log, cos, sin, tan, asin, acos, atan
@@ -85,4 +86,30 @@ class MathTest(Testing):
             self.resulted(f"Min({lcl_rand_list},?x)", "?x", min(rand_list))
             self.resulted(f"Max({lcl_rand_list},?x)", "?x", max(rand_list))
             self.resulted(f"Sort({lcl_rand_list},?x)", "?x", lcl_sorted)
-            self.resulted(f"Sum({lcl_rand_list},?x)", "?x", sum(rand_list))
\ No newline at end of file
+            self.resulted(f"Sum({lcl_rand_list},?x)", "?x", sum(rand_list))
+
+    def test_Exact(self):
+        self.resulted("Add(99999999999999999,1,?x)", "?x", "100000000000000000")
+        self.resulted("Mul(123456789123456789,1000000001,?x)", "?x", 123456789123456789 * 1000000001)
+        self.resulted("Div(1000000000000000000000,10,?x)", "?x", 10 ** 20)
+        self.resulted("Div(1,3,?x)", "?x", 1/3)
+        self.isTrue("Div(1,3,0.3333333333333333)")
+        self.resulted("Power(2,100,?x)", "?x", 2 ** 100)
+        self.resulted("Power(2,-2,?x)", "?x", 0.25)
+        self.resulted(f"Add({'9' * 5000},1,?x)", "?x", "1" + "0" * 5000)
+        self.resulted("Power(10,5000,?x)", "?x", "1" + "0" * 5000)
+        self.noSolution("Power(10,100000000000,?x)")
+        self.noSolution(f"Mul({'9' * 60000},{'9' * 60000},?x)")
+        # The limit of python on converting integers to text is kept for the rest of the process
+        if hasattr(sys, "get_int_max_str_digits"):
+            self.assertNotEqual(sys.get_int_max_str_digits(), 0)
+        self.isTrue("E(6,6.0)")
+
+    def test_NumberList_SumProduct(self):
+        numbers = list(range(1, 31))
+        lcl_numbers = "[" + ",".join(map(str, numbers)) + "]"
+        self.resulted(f"Product({lcl_numbers},?x)", "?x", "265252859812191058636308480000000")
+        self.resulted(f"Sum({lcl_numbers},?x)", "?x", sum(numbers))
+        self.resulted("Sum([0.5,1,2],?x)", "?x", 3.5)
+        self.resulted("Sum([1,2,3,?y],10)", "?y", 4)
+        self.resulted("Product([],?x)", "?x", 1)
@@ -0,0 +1,60 @@
+from Testing.TestingSuper import Testing
+
+
+class NativesTest(Testing):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        data = """
+
+        import List;
+        import Dynamic;
+
+        set Swap
+            case [?a, ?b], [?b, ?a];
+
+        extend Last
+            case [], Nothing;
+
+        """
+
+        cls.interpreter = cls.upload(data)
+
+    def test_Natives(self):
+
+        self.assertIsNotNone(self.interpreter.predicates["Reverse"].native)
+        self.assertIsNotNone(self.interpreter.predicates["Join"].native)
+        self.assertIsNone(self.interpreter.predicates["Swap"].native)
+
+    def test_Instantiated(self):
+
+        self.singleSolved("Reverse([1,2,3],?r)", r="[3,2,1]")
+        self.singleSolved("Reverse([a,b],[?p,a])", p="b")
+        self.noSolution("Reverse([a],[b])")
+        self.singleSolved("Join([1,2],[3],?z)", z="[1,2,3]")
+        self.singleSolved("Join([1],[2],[1,?k])", k="2")
+        self.singleSolved("Appended(c,[],?z)", z="[c]")
+        self.singleSolved("Len([a,[b,c],f(x)],?n)", n="3")
+        self.noSolution("_Len([a,b],3)")
+        self.multipleSolved("In(?x,[a,b,c])", x=("a", "b", "c"))
+        self.multipleSolved("In([?p,1],[[2,1],[3,1],[4,2]])", p=("2", "3"))
+        self.multipleSolved("Index(?i,[a,b,a],a)", i=("0", "2"))
+        self.singleSolved("Index(1,[a,b,c],?x)", x="b")
+        self.noSolution("Index(-1,[a],?x)")
+        self.generic("Split([1,2,3,2],2,?a,?b)", [{"?a": "[1]", "?b": "[3,2]"}])
+        self.generic("Split([1,2,3],4,?a,?b)", [{"?a": "[1,2,3]", "?b": "[]"}])
+
+    def test_Generative(self):
+
+        self.generic("Join(?a,?b,[1,2])", [{"?a": "[]", "?b": "[1,2]"}, {"?a": "[1]", "?b": "[2]"}, {"?a": "[1,2]", "?b": "[]"}])
+        self.singleSolved("Appended(?x,[a,b],[a,b,c])", x="c")
+
+    def test_Changed(self):
+
+        self.assertIsNone(self.interpreter.predicates["Last"].native)
+        self.singleSolved("Last([],?x)", x="Nothing")
+        self.isTrue("AssertF(In(z,[]))")
+        self.isTrue("In(z,[])")
+        self.isTrue("DeleteF(In(z,[]))")
+        self.noSolution("In(z,[])")
@@ -0,0 +1,70 @@
+from Testing.TestingSuper import Testing
+
+
+class ParallelTest(Testing):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        data = """
+
+        import List;
+        import Predicates;
+
+        set Pick
+            case (?x, ?y) then In(?x, [1, 2, 3]) & In(?y, [a, b])
+            case (?x, ?y) then In(?x, [3, 4]) & E(?y, c)
+            case (?x, ?y) then In(?x, [1, 4]) & E(?y, c)
+            case (5, d);
+
+        """
+
+        cls.interpreter = cls.upload(data)
+
+    def tearDown(self) -> None:
+        self.interpreter.workers = 1
+
+    def sequential(self, query):
+        return list(self.interpreter.mixed_query(query, 0, 10000, unP=True))
+
+    def parallel(self, query):
+        self.interpreter.workers = 2
+        return [sol for sol in self.interpreter.all_solutions(query, 10000) if type(sol) == dict]
+
+    def test_Cases(self):
+        expected = self.sequential("Pick(?x,?y)")
+        self.assertEqual(len(expected), 10)
+        sols = self.parallel("Pick(?x,?y)")
+        self.assertCountEqual(sols, expected)
+
+    def test_Branches(self):
+        expected = self.sequential("Pick(?x,c)|In(?x,[1,7])|Pick(5,?y)")
+        sols = self.parallel("Pick(?x,c)|In(?x,[1,7])|Pick(5,?y)")
+        self.assertCountEqual(sols, expected)
+
+    def test_Changed(self):
+        self.interpreter = self.upload("""
+
+        import Dynamic;
+        import List;
+
+        set Pick
+            case ?x then E(?x, 1)
+            case ?x then E(?x, 2)
+            case ?x then In(?x, [3, 4]);
+
+        """)
+        self.isTrue("AssertC(Pick(?x)>E(?x,9))")
+        expected = self.sequential("Pick(?x)")
+        self.assertCountEqual(expected, [{"?x": str(x)} for x in (9, 1, 2, 3, 4)])
+        # The processes would rebuild the program without the new case
+        self.assertCountEqual(self.parallel("Pick(?x)"), expected)
+
+    def test_AllSolutions(self):
+        self.isTrue("Workers(2)")
+        self.resulted("Workers(?n)", "?n", 2)
+        sols = self.sequential("AllSolutions(Pick,2,?s)")
+        self.assertEqual(len(sols), 1)
+        self.assertCountEqual(sols[0]["?s"][2:-2].split("],["),
+                              ["5,d", "1,a", "1,b", "2,a", "2,b", "3,a", "3,b", "3,c", "4,c", "1,c"])
+        self.noSolution("Workers(0)")
@@ -0,0 +1,76 @@
+import sys
+
+from Testing.TestingSuper import Testing
+
+
+class ProfilerTest(Testing):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        data = """
+
+        import Inspect;
+        import Math;
+
+        set Edge
+            case (a, b)
+            case (b, c)
+            case (c, d);
+
+        set Path
+            case (?x, ?y) then Edge(?x, ?y)
+            case (?x, ?z) then Edge(?x, ?y) & Path(?y, ?z);
+
+        set To
+            case ?x, ?x
+            case ?x, ?y then LT(?x, ?y) & Add(?x, 1, ?z) & To(?z, ?y);
+
+        """
+
+        cls.interpreter = cls.upload(data)
+
+    def tearDown(self) -> None:
+        self.interpreter.profiler = None
+        self.interpreter.profiled = None
+
+    def test_Ports(self):
+        self.isTrue("Profile(On)")
+        self.generic("Path(a,?z)", [{"?z": "b"}, {"?z": "c"}, {"?z": "d"}])
+        self.isTrue("Profile(Off)")
+        self.assertIsNone(self.interpreter.profiler)
+
+        records = self.interpreter.profiled.records
+        self.assertEqual((records["Path"].calls, records["Path"].exits, records["Path"].fails), (4, 6, 4))
+        self.assertEqual(records["Path"].redos, records["Path"].exits)
+        self.assertEqual((records["Edge"].calls, records["Edge"].exits, records["Edge"].fails), (8, 6, 8))
+        # Only the clauses the first argument indexes are matched
+        self.assertEqual((records["Edge"].attempts, records["Edge"].matches), (6, 6))
+        self.assertGreaterEqual(records["Path"].inclusive, records["Path"].exclusive)
+
+        edges = self.interpreter.profiled.edges
+        self.assertEqual(edges[("(query)", "Path")], 1)
+        self.assertEqual(edges[("Path", "Path")], 3)
+        self.assertEqual(edges[("Path", "Edge")], 8)
+
+    def test_Engine(self):
+        # Profiled searches are searched by the engine too, deeper than the stack of python
+        depth = sys.getrecursionlimit() * 2
+        self.isTrue("Profile(On)")
+        self.generic(f"To(0,{depth})", [{}])
+        record = self.interpreter.profiler.records["To"]
+        self.assertEqual((record.calls, record.exits), (depth + 1, depth + 1))
+        self.assertGreater(record.exclusive, 0)
+        self.assertGreaterEqual(record.inclusive, record.exclusive)
+
+    def test_Reports(self):
+        self.noSolution("Profile(Table)")
+        self.isTrue("Profile(On)")
+        self.isTrue("Path(a,d)")
+        self.solved("Profile(Table)")
+        self.solved("Profile(Graph)")
+        self.assertIn("Path", self.interpreter.profiler.table())
+        self.assertIn("called by: Path", self.interpreter.profiler.graph())
+        self.isTrue("Profile(Clear)")
+        self.assertEqual(self.interpreter.profiler.records, {})
+        self.noSolution("Profile(Everything)")
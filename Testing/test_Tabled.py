@@ -0,0 +1,65 @@
+from Testing.TestingSuper import Testing
+
+
+class TabledTest(Testing):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        data = """
+
+        import Math;
+        import Inspect;
+        import Dynamic;
+
+        set Edge
+            case a, b
+            case b, c
+            case c, a
+            case c, d;
+
+        set Path as tabled
+            case ?x, ?z then Path(?x, ?y) & Edge(?y, ?z)
+            case ?x, ?y then Edge(?x, ?y);
+
+        set Even as tabled
+            case ?x, ?x
+            case ?x, ?z then Odd(?x, ?y) & Edge(?y, ?z);
+
+        set Odd as tabled
+            case ?x, ?z then Even(?x, ?y) & Edge(?y, ?z);
+
+        set Fib as tabled
+            case 0, 0
+            case 1, 1
+            case ?n, ?f then GT(?n, 1) & Sub(?n, 1, ?a) & Sub(?n, 2, ?b) & Fib(?a, ?fa) & Fib(?b, ?fb) & Add(?fa, ?fb, ?f);
+
+        """
+
+        cls.interpreter = cls.upload(data)
+
+    def test_LeftRecursion(self):
+
+        self.multipleSolved("Path(a,?y)", y=("b", "c", "a", "d"))
+        self.multipleSolved("Path(?x,a)", x=("a", "b", "c"))
+        self.noSolution("Path(d,?y)")
+        self.isTrue("Path(b,d)")
+
+    def test_MutualRecursion(self):
+
+        self.multipleSolved("Odd(a,?y)", y=("b", "a", "d", "c"))
+        self.multipleSolved("Even(d,?y)", y=("d",))
+
+    def test_Repeated(self):
+
+        self.singleSolved("Fib(60,?f)", f="1548008755920")
+
+    def test_Tables(self):
+
+        self.solved("ShowTables(Path)")
+        self.isTrue("ClearTables(ALL)")
+
+        self.isTrue("AssertFE(Edge(d,e))")
+        self.multipleSolved("Path(c,?y)", y=("a", "d", "b", "c", "e"))
+        self.isTrue("DeleteF(Edge(d,e))")
+        self.multipleSolved("Path(c,?y)", y=("a", "d", "b", "c"))
@@ -0,0 +1,213 @@
+"""
+
+Batch
+
+Runs queries without the console (and without tkinter): loads .lcl files, reads queries (one per line) from a file or
+from the standard input, and writes the results as JSON lines, as they are found:
+
+    {"query": ..., "solution": {"?x": "5"}, "stats": {...}}     a solution (unprocessed, variables -> values)
+    {"query": ..., "print": "..."}                              printed text
+    {"query": ..., "done": true, "status": ..., "solutions": n, "time": seconds, "stats": {...}, "errors": [...]}
+
+The status is "complete" (all the solutions were found), "limit" (the solution limit was reached), "timeout",
+"inferences" or "bindings" (the query used all of its time or inferences, or held too many bindings, see Budget.py),
+"input" (the query asked for input) or "error". The stats are what the query used until then (see Budget.statistics).
+
+    python batch.py program.lcl [more.lcl ...] [--queries queries.txt] [--time-limit 10] [--solutions 100]
+                    [--inferences 1000000] [--bindings 1000000]
+
+With --profile, the searches of all the queries are profiled (see Profiler.py), and the profile is written after the
+results: as a JSON line ({"profile": ...}, by default), or as a table or a call graph to the standard error.
+
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import Cache
+import Lexer
+from Budget import Budget
+from Interpreter import Interpreter
+from Profiler import Profiler
+from main import version, time_limit, recursion_limit, imports
+from util import processQuery, processParen
+
+
+# Loads a file to an interpreter
+def load(interpreter, filename, cache=True):
+    """
+    Reads an .lcl file into an interpreter.
+
+    :param interpreter: Interpreter
+    :param filename: str
+    :param cache: bool (restore the first file of the interpreter from its cache, see Cache.py)
+    :return: list[str] (errors, empty if the file was loaded)
+    """
+    try:
+        with open(filename, "r") as f:
+            data = f.read()
+    except OSError:
+        return [f"Error: File {filename} Not Found"]
+    interpreter.setFilePath(os.path.dirname(os.path.abspath(filename)).replace("\\", "/"))
+
+    if cache and Cache.restore(interpreter, filename, data):
+        return []
+
+    lexer = Lexer.build()
+    lexer.input(data)
+    tokens = []
+    while True:
+        tok = lexer.token()
+        if not tok:
+            break  # No more input
+        tokens.append(tok)
+
+    if len(Lexer.SyntaxErrors) != 0:
+        errors = list(Lexer.SyntaxErrors)
+        Lexer.SyntaxErrors = []
+        return errors
+
+    interpreter.read(tokens)
+    errors = list(interpreter.errorLoad)
+    if cache and not errors:
+        Cache.store(interpreter, filename, data)
+    interpreter.clearErrors()
+    return errors
+
+
+# Runs a single query
+def run(interpreter, query, limit, solutions_limit, depth, inferences=None, bindings=None):
+    """
+    Searches for the solutions of a query, and generates its results (see the formats above).
+
+    :param interpreter: Interpreter
+    :param query: str
+    :param limit: float (seconds, for the whole query)
+    :param solutions_limit: int, None (most solutions to find)
+    :param depth: int
+    :param inferences: int, None (most inferences, for the whole query)
+    :param bindings: int, None (most bindings the search holds at once)
+    :return: generator[dict]
+    """
+    start = time.time()
+    found = 0
+    status = "complete"
+    interpreter.clearErrors()
+
+    processed = processQuery(query)
+    text_query = processed and processParen(processed[1])
+    if not text_query:
+        yield {"query": query, "done": True, "status": "error", "solutions": 0, "time": 0.0, "stats": {},
+               "errors": ["Illegal Query"]}
+        return
+    type_query = processed[0]
+
+    if not interpreter.save_added:
+        interpreter.clearState()
+    budget = Budget(depth, inferences, limit, bindings)
+    solutions = interpreter.mixed_query(text_query, type_query, budget, True)
+    while solutions_limit is None or found < solutions_limit:
+        try:
+            sol = next(solutions, 0)
+        except RecursionError:
+            sol = 3
+
+        for message in interpreter.messageLoad:
+            yield {"query": query, "print": message}
+        interpreter.messageLoad = []
+        if interpreter.errorLoad:
+            status = "error"
+            break
+
+        if sol == "Print":
+            continue
+        if sol == "Request":
+            status = "input"
+            break
+        if sol == 0:
+            if budget.exhausted:
+                status = "timeout" if budget.exhausted == "time" else budget.exhausted
+            break
+        if sol == 3:
+            interpreter.raiseError("Error: Recursion Error")
+            status = "error"
+            break
+
+        found += 1
+        budget.count = depth
+        yield {"query": query, "solution": sol, "stats": budget.statistics()}
+    else:
+        status = "limit"
+    solutions.close()
+
+    yield {"query": query, "done": True, "status": status, "solutions": found,
+           "time": round(time.time() - start, 6), "stats": budget.statistics(), "errors": list(interpreter.errorLoad)}
+    interpreter.clearErrors()
+
+
+# Reads queries
+def queries(stream):
+    """
+    The queries of a stream, one per line (empty lines are skipped).
+
+    :param stream: file
+    :return: generator[str]
+    """
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=f"Local {version} - runs queries and writes the results as JSON lines.")
+    parser.add_argument("files", nargs="+", help=".lcl files to load")
+    parser.add_argument("--queries", "-q", help="file of queries, one per line (the standard input by default)")
+    parser.add_argument("--time-limit", "-t", type=float, default=time_limit, help="seconds for every query")
+    parser.add_argument("--solutions", "-n", type=int, default=None, help="most solutions for every query")
+    parser.add_argument("--inferences", type=int, default=None, help="most inferences for every query")
+    parser.add_argument("--bindings", type=int, default=None, help="most bindings the search of a query holds at once")
+    parser.add_argument("--depth", type=int, default=recursion_limit, help="recursion limit of the searches")
+    parser.add_argument("--workers", type=int, default=1, help="processes of or-parallel searches (AllSolutions)")
+    parser.add_argument("--no-cache", action="store_true", help="do not use or write the cache of compiled programs")
+    parser.add_argument("--profile", nargs="?", const="json", choices=["json", "table", "graph"],
+                        help="profile the searches of the predicates")
+    args = parser.parse_args(arguments)
+
+    sys.setrecursionlimit(200000)
+
+    interpreter = Interpreter(args.time_limit, imports)
+    interpreter.workers = max(args.workers, 1)
+    for filename in args.files:
+        errors = load(interpreter, filename, not args.no_cache)
+        if errors:
+            print(json.dumps({"file": filename, "errors": errors}), flush=True)
+            return 1
+
+    if args.profile:
+        interpreter.profiler = Profiler()
+
+    stream = open(args.queries, "r") if args.queries else sys.stdin
+    try:
+        for query in queries(stream):
+            for result in run(interpreter, query, args.time_limit, args.solutions, args.depth, args.inferences,
+                              args.bindings):
+                print(json.dumps(result), flush=True)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    if args.profile == "json":
+        print(json.dumps({"profile": interpreter.profiler.report()}), flush=True)
+    elif args.profile == "table":
+        print(interpreter.profiler.table(), file=sys.stderr)
+    elif args.profile == "graph":
+        print(interpreter.profiler.graph(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
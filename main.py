@@ -7,8 +7,8 @@ Runs the design and includes the version, recursion limit, and time limit.
 """
 
 
-import Design
 import sys
+import threading
 
 version = '1.8'
 time_limit = 3000
@@ -33,7 +33,12 @@ imports = [
     ]
 
 if __name__ == "__main__":
+    # Imported here, so the libraries list can be imported without tkinter (see batch.py)
+    import Design
+
     sys.setrecursionlimit(200000)
+    # Queries are searched in the threads of the console, deep searches need a large stack
+    threading.stack_size(512 * 1024 * 1024)
 
     C = Design.Console(version, time_limit, recursion_limit, imports)
 
@@ -0,0 +1,167 @@
+"""
+
+Server
+
+Serves queries over HTTP on localhost, from a pool of processes that loaded the program once (warm interpreters).
+Every request is searched by a copy of the loaded interpreter (see Interpreter.clone), so the state a query leaves
+behind (references, memory, datasets, changes to the predicates) never leaks to other requests. The processes do not
+share the variables of the matching (see MatchDictionary), so queries are searched concurrently in separate processes.
+
+    python server.py program.lcl [more.lcl ...] [--port 8765] [--workers 4]
+
+    POST /query   {"query": "Father(?x, ?y)", "time_limit": 10, "solutions": 100, "inferences": 100000}
+                  -> JSON lines, in the formats of batch.py
+    GET /health   -> {"status": "ok", "workers": 4, "files": [...]}
+
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Interpreter import Interpreter
+from batch import load, run
+from main import time_limit, recursion_limit, imports
+
+
+loaded = None  # The interpreter of this process, as loaded (copied for every request)
+
+
+# Loads the program in a process of the pool
+def warm(files, limit):
+    """
+    Loads the program once, in a process of the pool (the initializer of the processes).
+
+    :param files: list[str]
+    :param limit: float
+    :return: None
+    """
+    global loaded
+    sys.setrecursionlimit(200000)
+    loaded = Interpreter(limit, imports)
+    for filename in files:
+        load(loaded, filename)
+
+
+# Whether a process is ready
+def ready():
+    """
+    Returns once the process loaded the program (used to start the processes before the first request).
+
+    :return: bool
+    """
+    return loaded is not None
+
+
+# Answers a request in a process of the pool
+def answer(query, limit, solutions_limit, depth, inferences=None, bindings=None):
+    """
+    Searches a query with a copy of the loaded interpreter.
+
+    :param query: str
+    :param limit: float
+    :param solutions_limit: int, None
+    :param depth: int
+    :param inferences: int, None
+    :param bindings: int, None
+    :return: list[dict] (the results, see batch.run)
+    """
+    return list(run(loaded.clone(), query, limit, solutions_limit, depth, inferences, bindings))
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Requests of the server (see above).
+    """
+
+    pool = None  # ProcessPoolExecutor
+    settings = {}  # files, workers, time_limit, depth
+
+    def send(self, code, lines):
+        """
+        Sends JSON lines.
+
+        :param code: int
+        :param lines: list[dict]
+        :return: None
+        """
+        body = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self.send(404, [{"error": f"Unknown path {self.path}"}])
+            return
+        self.send(200, [{"status": "ok", "workers": self.settings["workers"], "files": self.settings["files"]}])
+
+    def do_POST(self):
+        if self.path != "/query":
+            self.send(404, [{"error": f"Unknown path {self.path}"}])
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            query = request["query"]
+            limit = float(request.get("time_limit", self.settings["time_limit"]))
+            solutions_limit, inferences, bindings = [None if request.get(name, None) is None else int(request[name])
+                                                     for name in ("solutions", "inferences", "bindings")]
+        except (ValueError, KeyError, TypeError) as e:
+            self.send(400, [{"error": f"Illegal request ({e})"}])
+            return
+        try:
+            results = self.pool.submit(answer, query, limit, solutions_limit, self.settings["depth"], inferences,
+                                       bindings).result()
+        except Exception as e:
+            self.send(500, [{"query": query, "done": True, "status": "error", "errors": [f"Error: {e}"]}])
+            return
+        self.send(200, results)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Serves queries of a program over HTTP on localhost.")
+    parser.add_argument("files", nargs="+", help=".lcl files to load")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes that answer queries")
+    parser.add_argument("--time-limit", "-t", type=float, default=time_limit, help="seconds for every query")
+    parser.add_argument("--depth", type=int, default=recursion_limit, help="recursion limit of the searches")
+    args = parser.parse_args(arguments)
+
+    # The program is checked once here, before starting the processes
+    files = [os.path.abspath(filename) for filename in args.files]
+    interpreter = Interpreter(args.time_limit, imports)
+    for filename in files:
+        errors = load(interpreter, filename)
+        if errors:
+            print(json.dumps({"file": filename, "errors": errors}), flush=True)
+            return 1
+
+    workers = max(args.workers, 1)
+    pool = ProcessPoolExecutor(workers, initializer=warm, initargs=(files, args.time_limit))
+    for future in [pool.submit(ready) for _ in range(workers)]:
+        future.result()
+
+    Handler.pool = pool
+    Handler.settings = {"files": files, "workers": workers, "time_limit": args.time_limit, "depth": args.depth}
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    print(json.dumps({"status": "serving", "port": server.server_address[1], "workers": workers}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.shutdown(cancel_futures=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,6 @@ includes a lot of different functions used in the project
 
 """
 
-from func_timeout import func_timeout, FunctionTimedOut
 from types import GeneratorType
 import re
 
@@ -341,6 +340,8 @@ def processHead(string: str):
     if mt == "pack":
         return string
     if mt == 'list':
+        if "*" not in string:
+            return string
         string = string[1:-1]
         components = splitWithoutParen(string, ',')
         processed_comps = []
@@ -435,6 +436,47 @@ def independent(string):
     return outString(string, "?")
 
 
+# Variables of a pattern, in order of appearance
+def ordered_variables(string):
+    """
+    All the variables of a pattern, each once, in the order they first appear in.
+
+    >>> ordered_variables("?y,[?x * ?y]")
+    ['?y', '?x']
+
+    :param string: str
+    :return: list
+    """
+    return list(dict.fromkeys(re.findall(r"\?[^?).,\]*({}^\">\s'!%&|$:/]+", string)))
+
+
+# Renames the variables of a pattern canonically
+def variant(string, prefix):
+    """
+    Renames the variables of a pattern to ?@<prefix>1, ?@<prefix>2, ... in order of appearance.
+    Two patterns are variants of each other (equal up to variable renaming) iff their variants are equal.
+
+    :param string: str
+    :param prefix: str
+    :return: str
+    """
+    renaming = {var: f"?@{prefix}{i}" for i, var in enumerate(ordered_variables(string), 1)}
+    if not renaming:
+        return string
+    return smart_replace(string, renaming)
+
+
+# Hashable key of a solution
+def solution_key(solution):
+    """
+    A hashable key of a solution, equal for equal solutions (used to drop repeated solutions in constant time).
+
+    :param solution: dict[str, str]
+    :return: frozenset
+    """
+    return frozenset(solution.items())
+
+
 # Processes solution and makes into a string
 def processSolutionDict(sol_dict):
     """
@@ -519,36 +561,38 @@ def smartUpdate(d1, d2):
     """
 
     d = {}
-    for key in d1:
-        d[key] = smart_replace(d1[key], d2)
+    replace_all = "..." in d2
+    for key, value in d1.items():
+        d[key] = smart_replace(value, d2) if "?" in value or replace_all else value
 
     d.update(d2)
     return d
 
 
 # generates next solution given a generator, with time limit
-def next_solution(solution_gen, limit):
+def next_solution(solution_gen, limit, budget=None):
     """
-    Finds next solution of generator within time limit
+    Finds next solution of generator within time limit. The limit is checked by the search itself, through the budget
+    the generator searches with (see Budget.py), without it there is no limit.
 
     :param solution_gen: generator
     :param limit: number
-    :return: dict
+    :param budget: Budget, None
+    :return: dict (0 if there are no more solutions, 1 on timeout, 3 on recursion error, 4 if the search was stopped)
     """
     if type(solution_gen) != GeneratorType:
         return 0
+    if budget is not None:
+        budget.limit(limit)
     try:
-        sol = func_timeout(limit, next, (solution_gen,), {})
-        return sol
+        return next(solution_gen)
     except StopIteration:
-        return 0
-    except FunctionTimedOut:
-        return 1
+        if budget is None or budget.exhausted is None:
+            return 0
+        return 1 if budget.exhausted == "time" else 4
     except RecursionError:
         return 3
 
-    return 2
-
 
 # Formats for printing in console
 def formatPrint(x:str):